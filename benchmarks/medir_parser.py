@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Mede CPU e memória por página de cada backend de parsing (lxml x html.parser),
+com a árvore completa e com o filtro parcial de cada etapa.
+
+Uso:
+    python benchmarks/medir_parser.py pagina1.html pagina2.html --filtro lotes
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapping.parser import backends_disponiveis, criar_soup, filtros
+
+
+def pagina_exemplo(lotes=300):
+    """Página de ofertas sintética, parecida com a do LeilaoVip"""
+    opcoes = ''.join(f'<option value="imovel-{i}">{i}</option>' for i in range(lotes))
+    cards = ''.join(
+        f'<div class="card lote"><h3>Apartamento {i}</h3><p>Avaliação: R$ {i}00.000,00</p>'
+        f'<a href="/evento/anuncio/imovel-{i}">Ver lote</a></div>'
+        for i in range(lotes)
+    )
+    return f'<html><head><script>var x = 1;</script></head><body><select>{opcoes}</select>{cards}</body></html>'.encode()
+
+
+def medir(conteudo, filtro, backend, repeticoes):
+    """Retorna (ms de CPU por página, pico de memória em KB)"""
+    inicio = time.process_time()
+    for _ in range(repeticoes):
+        criar_soup(conteudo, filtro, backend)
+    cpu_ms = (time.process_time() - inicio) * 1000 / repeticoes
+
+    tracemalloc.start()
+    soup = criar_soup(conteudo, filtro, backend)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del soup
+
+    return cpu_ms, pico / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara backends de parsing por página")
+    parser.add_argument('arquivos', nargs='*', help="Páginas HTML salvas (padrão: página sintética)")
+    parser.add_argument('--filtro', choices=sorted(filtros), default='lotes')
+    parser.add_argument('--repeticoes', type=int, default=20)
+    args = parser.parse_args()
+
+    paginas = [(caminho, open(caminho, 'rb').read()) for caminho in args.arquivos]
+    if not paginas:
+        paginas = [('(página sintética)', pagina_exemplo())]
+
+    print(f"{'página':<30} {'backend':<12} {'árvore':<10} {'CPU ms':>10} {'memória KB':>12}")
+    print("-" * 78)
+    for nome, conteudo in paginas:
+        for backend in backends_disponiveis:
+            for filtro in (None, args.filtro):
+                cpu_ms, memoria_kb = medir(conteudo, filtro, backend, args.repeticoes)
+                arvore = filtro or 'completa'
+                print(f"{os.path.basename(nome)[:30]:<30} {backend:<12} {arvore:<10} {cpu_ms:>10.2f} {memoria_kb:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Mede páginas/s, PDFs/s, CPU por página e pico de memória do LeilaoVipScraper
+contra o servidor local (benchmarks/servidor_local.py), sem acessar o site.
+
+O servidor roda em um processo à parte para que a CPU medida seja só a do
+scraper (incluindo os processos de análise do pipeline). Cada execução usa
+um diretório temporário novo: sem cache, fronteira nem PDFs anteriores.
+
+Com --gravar, todas as trocas HTTP vão para um arquivo (scrapping/gravacao.py);
+com --reproduzir, o scraper roda só com esse arquivo, sem rede nem servidor,
+e com --resultados os PDFs extraídos (URL, SHA-256) vão para um JSON que pode
+ser comparado com o de outra execução.
+
+Uso:
+    python benchmarks/medir_scraper.py --leiloes 30 --lotes 10 --latencia 0.05 --workers 8
+    python benchmarks/medir_scraper.py --workers 4 --processos-analise 2 --json
+    python benchmarks/medir_scraper.py --workers 2 --trabalhadores 3
+    python benchmarks/medir_scraper.py --site --gravar leilaovip.jsonl.gz
+    python benchmarks/medir_scraper.py --reproduzir leilaovip.jsonl.gz --resultados depois.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import resource
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+diretorio_benchmarks = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(diretorio_benchmarks))
+
+from benchmarks.servidor_local import adicionar_argumentos
+from scrapping.catalogo import limite_pagina
+from scrapping.gravacao import GravadorHTTP, ReprodutorHTTP, ler_gravacao
+
+# Endereço do site nas URLs dos comitentes em comitentes.json
+url_site = 'https://www.leilaovip.com.br'
+
+
+def porta_livre():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def subir_servidor(opcoes):
+    """Inicia o servidor local em outro processo e espera ele responder"""
+    porta = porta_livre()
+    comando = [sys.executable, os.path.join(diretorio_benchmarks, 'servidor_local.py'), '--porta', str(porta)]
+    for opcao, valor in sorted(opcoes.items()):
+        comando += [f"--{opcao.replace('_', '-')}", str(valor)]
+    processo = subprocess.Popen(comando, stdout=subprocess.DEVNULL)
+
+    url_base = f"http://127.0.0.1:{porta}"
+    limite = time.monotonic() + 10
+    while time.monotonic() < limite:
+        try:
+            requests.get(f"{url_base}/_estatisticas", timeout=1)
+            return processo, url_base
+        except requests.ConnectionError:
+            time.sleep(0.05)
+    processo.kill()
+    raise RuntimeError("Servidor local não respondeu em 10s")
+
+
+def cpu_total(quem):
+    uso = resource.getrusage(quem)
+    return uso.ru_utime + uso.ru_stime
+
+
+def url_base_da_gravacao(caminho):
+    """Esquema e host da primeira troca gravada"""
+    for registro in ler_gravacao(caminho):
+        return '/'.join(registro['url'].split('/')[:3])
+    raise RuntimeError(f"Gravação vazia: {caminho}")
+
+
+class ContadorRespostas:
+    """Hook de resposta da sessão: páginas HTML, PDFs e erros 5xx recebidos"""
+
+    def __init__(self):
+        self.contagem = {'requisicoes': 0, 'paginas': 0, 'pdfs': 0, 'erros': 0}
+        self._lock = threading.Lock()
+
+    def __call__(self, response, *args, **kwargs):
+        tipo = response.headers.get('Content-Type', '')
+        with self._lock:
+            self.contagem['requisicoes'] += 1
+            if response.status_code >= 500:
+                self.contagem['erros'] += 1
+            elif 'html' in tipo and response.status_code == 200:
+                self.contagem['paginas'] += 1
+            elif 'pdf' in tipo:
+                self.contagem['pdfs'] += 1
+
+
+def contagem_do_servidor(por_tipo):
+    """Contagem de ContadorRespostas a partir do servidor local, quando as requisições saem de outros processos"""
+    paginas = sum(por_tipo.get(tipo, 0) for tipo in ('agenda', 'listagem', 'leilao', 'lotes', 'lote'))
+    erros = por_tipo.get('erros', 0)
+    return {
+        'requisicoes': sum(total for tipo, total in por_tipo.items() if tipo != 'erros'),
+        'paginas': paginas - erros,
+        'pdfs': por_tipo.get('pdf', 0),
+        'erros': erros,
+    }
+
+
+def exportar_resultados(catalogo, caminho):
+    """PDFs extraídos em ordem estável, para comparar duas execuções com diff"""
+    pdfs, cursor = catalogo.listar(limite=limite_pagina)
+    while cursor:
+        pagina, cursor = catalogo.listar(cursor=cursor, limite=limite_pagina)
+        pdfs.extend(pagina)
+    resultados = sorted(
+        ({campo: pdf[campo] for campo in ('banco', 'lote_id', 'url', 'tamanho_bytes', 'sha256')} for pdf in pdfs),
+        key=lambda pdf: (pdf['banco'], pdf['lote_id'])
+    )
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(resultados, f, indent=2, ensure_ascii=False)
+
+
+def medir(args, url_base, gravacao=None, estatisticas_servidor=None):
+    """Executa o scraper contra url_base (ou a gravação) e retorna as métricas
+
+    Com trabalhadores, as respostas chegam a outros processos; a contagem
+    vem então de `estatisticas_servidor()`, o /_estatisticas do servidor local.
+    """
+    import scrapping.vip as vip
+    from scrapping.comitentes import RegistroComitentes
+    from scrapping.limitador import LimitadorTaxa
+
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+    comitentes = RegistroComitentes()
+    for comitente in comitentes:
+        comitente.url = comitente.url.replace(url_site, url_base)
+
+    # Sem limite de taxa efetivo: o que se mede é o scraper, não o limitador
+    limitador = LimitadorTaxa(taxa_inicial=args.taxa, taxa_maxima=args.taxa, capacidade=max(2, args.workers))
+    scraper = vip.LeilaoVipScraper(
+        max_workers=args.workers, limitador_taxa=limitador, usar_cache=args.cache,
+        backend_html=args.backend, processos_analise=args.processos_analise, gravacao=gravacao,
+        comitentes=comitentes, trabalhadores=args.trabalhadores
+    )
+    contador = ContadorRespostas()
+    scraper.session.hooks['response'].append(contador)
+
+    cpu_inicio = cpu_total(resource.RUSAGE_SELF)
+    cpu_filhos_inicio = cpu_total(resource.RUSAGE_CHILDREN)
+    inicio = time.perf_counter()
+    pdfs = scraper.executar_scraping()
+    decorrido = time.perf_counter() - inicio
+    # Processos de análise e trabalhadores já terminaram e entram em RUSAGE_CHILDREN; o servidor ainda não
+    cpu = cpu_total(resource.RUSAGE_SELF) - cpu_inicio
+    cpu_filhos = cpu_total(resource.RUSAGE_CHILDREN) - cpu_filhos_inicio
+    # Fecha a gravação, se houver
+    scraper.session.close()
+
+    if args.resultados:
+        exportar_resultados(scraper.catalogo, args.resultados)
+
+    contagem = contador.contagem
+    if args.trabalhadores and estatisticas_servidor:
+        contagem = contagem_do_servidor(estatisticas_servidor())
+    paginas = contagem['paginas']
+    return {
+        'segundos': round(decorrido, 3),
+        'requisicoes': contagem['requisicoes'],
+        'paginas': paginas,
+        'pdfs': len(pdfs),
+        'erros_servidor': contagem['erros'],
+        'paginas_por_segundo': round(paginas / decorrido, 2),
+        'pdfs_por_segundo': round(len(pdfs) / decorrido, 2),
+        'cpu_segundos': round(cpu + cpu_filhos, 3),
+        'cpu_ms_por_pagina': round((cpu + cpu_filhos) * 1000 / max(paginas, 1), 2),
+        # ru_maxrss vem em KB no Linux
+        'pico_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'pico_rss_analise_mb': round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+    }
+
+
+def imprimir(metricas):
+    print(f"⏱️  {metricas['segundos']}s, {metricas['requisicoes']} requisições ({metricas['erros_servidor']} com 503)")
+    print(f"📄 Páginas:  {metricas['paginas']:>6}  ({metricas['paginas_por_segundo']}/s)")
+    print(f"📥 PDFs:     {metricas['pdfs']:>6}  ({metricas['pdfs_por_segundo']}/s)")
+    print(f"🧮 CPU:      {metricas['cpu_segundos']}s ({metricas['cpu_ms_por_pagina']} ms por página)")
+    print(f"🧠 Pico RSS: {metricas['pico_rss_mb']} MB (processos de análise: {metricas['pico_rss_analise_mb']} MB)")
+    if 'por_tipo' in metricas:
+        print(f"📊 Por tipo: {metricas['por_tipo']}")
+
+
+def main():
+    parser_servidor = argparse.ArgumentParser(add_help=False)
+    adicionar_argumentos(parser_servidor)
+    parser = argparse.ArgumentParser(
+        description="Benchmark do LeilaoVipScraper contra o servidor local", parents=[parser_servidor]
+    )
+    parser.add_argument('--workers', type=int, default=1, help="max_workers do scraper")
+    parser.add_argument('--processos-analise', type=int, default=0, help="> 0 usa o pipeline")
+    parser.add_argument('--trabalhadores', type=int, default=0, help="> 0 usa processos trabalhadores com reservas")
+    parser.add_argument('--backend', choices=['lxml', 'html.parser'], default=None)
+    parser.add_argument('--taxa', type=float, default=1000.0, help="Requisições/s por host liberadas pelo limitador")
+    parser.add_argument('--cache', action='store_true', help="Liga o cache HTTP (vazio no início)")
+    parser.add_argument('--json', action='store_true', help="Imprime as métricas em JSON")
+    parser.add_argument('--verbose', action='store_true', help="Mantém o log INFO do scraper")
+    parser.add_argument('--site', action='store_true', help="Usa o LeilaoVip de verdade em vez do servidor local")
+    parser.add_argument('--gravar', metavar='ARQUIVO', help="Grava todas as trocas HTTP (.jsonl.gz)")
+    parser.add_argument('--reproduzir', metavar='ARQUIVO', help="Roda sem rede, com as trocas de uma gravação")
+    parser.add_argument('--resultados', metavar='ARQUIVO', help="Grava os PDFs extraídos (URL, SHA-256) em JSON")
+    args = parser.parse_args()
+    if args.trabalhadores and (args.gravar or args.reproduzir or args.site):
+        parser.error("--trabalhadores só funciona contra o servidor local, sem gravação")
+    # O scraper roda em um diretório temporário; caminhos do usuário são relativos ao atual
+    for opcao in ('gravar', 'reproduzir', 'resultados'):
+        if getattr(args, opcao):
+            setattr(args, opcao, os.path.abspath(getattr(args, opcao)))
+
+    processo = None
+    if args.reproduzir:
+        url_base = url_base_da_gravacao(args.reproduzir)
+        gravacao = ReprodutorHTTP(args.reproduzir)
+    else:
+        if args.site:
+            url_base = url_site
+        else:
+            opcoes_servidor = vars(parser_servidor.parse_args([]))
+            processo, url_base = subir_servidor({opcao: getattr(args, opcao) for opcao in opcoes_servidor})
+        gravacao = GravadorHTTP(args.gravar, max_conexoes=args.workers) if args.gravar else None
+
+    diretorio_original = os.getcwd()
+    diretorio_execucao = tempfile.mkdtemp(prefix='bench_leilaovip_')
+    try:
+        os.chdir(diretorio_execucao)
+        def estatisticas_servidor():
+            return requests.get(f"{url_base}/_estatisticas", timeout=5).json()
+
+        metricas = medir(args, url_base, gravacao, estatisticas_servidor if processo else None)
+        if processo:
+            metricas['por_tipo'] = estatisticas_servidor()
+    finally:
+        os.chdir(diretorio_original)
+        shutil.rmtree(diretorio_execucao, ignore_errors=True)
+        if processo:
+            processo.terminate()
+            processo.wait()
+
+    if args.json:
+        print(json.dumps(metricas, indent=2))
+    else:
+        imprimir(metricas)
+
+
+if __name__ == "__main__":
+    main()
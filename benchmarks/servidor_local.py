@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Servidor local que imita o LeilaoVip para medições offline
+
+Serve agenda, listagem AJAX (GET e POST, paginada), leilão, ofertas
+(redirecionamento), lotes, página do lote e PDF da matrícula a partir das
+fixtures em benchmarks/fixtures, com latência, taxa de erro e tamanho do
+catálogo configuráveis. GET /_estatisticas devolve as requisições atendidas
+por tipo de página.
+
+Uso:
+    python benchmarks/servidor_local.py --porta 8001 --leiloes 30 --lotes 10 --latencia 0.05
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+from urllib.parse import parse_qs, urlparse
+
+diretorio_fixtures = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Caminhos do site → tipo de página (a ordem importa: /evento/lotes antes de /evento/)
+rotas = [
+    (re.compile(r'^/agenda/?$'), 'agenda'),
+    (re.compile(r'^/agenda/pesquisarEventos$', re.IGNORECASE), 'listagem'),
+    (re.compile(r'^/evento/detalhes/([^/]+)$'), 'leilao'),
+    (re.compile(r'^/evento/ofertas/([^/]+)$'), 'ofertas'),
+    (re.compile(r'^/evento/lotes/([^/]+)$'), 'lotes'),
+    (re.compile(r'^/evento/anuncio/([^/]+)$'), 'lote'),
+    (re.compile(r'^/documentos/([^/]+)/matricula\.pdf$'), 'pdf'),
+]
+
+
+class ConfiguracaoServidor:
+    """Tamanho do catálogo simulado e comportamento da rede"""
+
+    def __init__(self, leiloes=12, lotes=8, cards_por_pagina=6, latencia=0.0, taxa_erro=0.0,
+                 tamanho_pdf=200 * 1024, fracao_extrajudicial=0.75, recheio=20, semente=0,
+                 fixtures=diretorio_fixtures):
+        # Leilões por comitente e lotes por leilão
+        self.leiloes = leiloes
+        self.lotes = lotes
+        self.cards_por_pagina = cards_por_pagina
+        # Segundos de espera antes de cada resposta
+        self.latencia = latencia
+        # Fração das requisições respondidas com 503
+        self.taxa_erro = taxa_erro
+        self.tamanho_pdf = tamanho_pdf
+        # Fração dos lotes com a palavra-chave (os demais são descartados pelo filtro)
+        self.fracao_extrajudicial = fracao_extrajudicial
+        # Repetições do bloco institucional, para as páginas terem tamanho realista
+        self.recheio = recheio
+        self.semente = semente
+        self.fixtures = fixtures
+
+
+class ServidorLeilaoVip(ThreadingHTTPServer):
+    """Servidor HTTP/1.1 com keep-alive que responde como o LeilaoVip"""
+
+    daemon_threads = True
+
+    def __init__(self, endereco, configuracao=None):
+        super().__init__(endereco, ManipuladorLeilaoVip)
+        self.configuracao = configuracao or ConfiguracaoServidor()
+        self.modelos = self._carregar_modelos(self.configuracao.fixtures)
+        self.recheio = self.modelos.pop('recheio').template * self.configuracao.recheio
+        self.pdf = self._gerar_pdf(self.configuracao.tamanho_pdf)
+        self.etag_pdf = f'"{hashlib.sha1(self.pdf).hexdigest()[:16]}"'
+        self.aleatorio = random.Random(self.configuracao.semente)
+        self.contadores = {}
+        self._lock = threading.Lock()
+
+    @property
+    def url_base(self):
+        host, porta = self.server_address[:2]
+        return f"http://{host}:{porta}"
+
+    def _carregar_modelos(self, diretorio):
+        modelos = {}
+        for nome in os.listdir(diretorio):
+            if nome.endswith('.html'):
+                with open(os.path.join(diretorio, nome), 'r', encoding='utf-8') as f:
+                    modelos[nome[:-len('.html')]] = Template(f.read())
+        return modelos
+
+    def _gerar_pdf(self, tamanho):
+        cabecalho, rodape = b"%PDF-1.4\n", b"\n%%EOF\n"
+        return cabecalho + b"0" * max(0, tamanho - len(cabecalho) - len(rodape)) + rodape
+
+    def contar(self, tipo):
+        with self._lock:
+            self.contadores[tipo] = self.contadores.get(tipo, 0) + 1
+
+    def sortear_erro(self):
+        with self._lock:
+            return self.aleatorio.random() < self.configuracao.taxa_erro
+
+    def estatisticas(self):
+        with self._lock:
+            return dict(self.contadores)
+
+    def renderizar(self, modelo, **valores):
+        return self.modelos[modelo].substitute(recheio=self.recheio, **valores).encode('utf-8')
+
+    def extrajudicial(self, slug):
+        """Decisão estável por lote: o mesmo slug sempre tem a mesma modalidade"""
+        sorteio = random.Random(f"{self.configuracao.semente}:{slug}").random()
+        return sorteio < self.configuracao.fracao_extrajudicial
+
+
+class ManipuladorLeilaoVip(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, formato, *args):
+        pass
+
+    def do_GET(self):
+        self.atender({})
+
+    def do_HEAD(self):
+        self.atender({})
+
+    def do_POST(self):
+        tamanho = int(self.headers.get('Content-Length') or 0)
+        self.atender(parse_qs(self.rfile.read(tamanho).decode('utf-8')))
+
+    def responder(self, status, corpo=b'', tipo='text/html; charset=utf-8', cabecalhos=None):
+        self.send_response(status)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(corpo)))
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(corpo)
+
+    def atender(self, formulario):
+        servidor = self.server
+        url = urlparse(self.path)
+
+        if url.path == '/_estatisticas':
+            return self.responder(200, json.dumps(servidor.estatisticas()).encode(), 'application/json')
+
+        for padrao, tipo in rotas:
+            casamento = padrao.match(url.path)
+            if casamento:
+                break
+        else:
+            servidor.contar('nao_encontrado')
+            return self.responder(404, b'<html><body>Not Found</body></html>')
+
+        if servidor.configuracao.latencia:
+            time.sleep(servidor.configuracao.latencia)
+        servidor.contar(tipo)
+        if servidor.sortear_erro():
+            servidor.contar('erros')
+            return self.responder(503, b'<html><body>Service Unavailable</body></html>')
+
+        parametros = parse_qs(url.query)
+        parametros.update(formulario)
+        getattr(self, f'pagina_{tipo}')(parametros, *casamento.groups())
+
+    def pagina_agenda(self, parametros):
+        servidor = self.server
+        comitente = parametros.get('Filtro.ComitenteId', [''])[0]
+        etag = f'"agenda-{comitente[:8]}"'
+        if self.headers.get('If-None-Match') == etag:
+            return self.responder(304, cabecalhos={'ETag': etag})
+        corpo = servidor.renderizar('agenda', comitente=comitente, ajax_url='/agenda/pesquisarEventos?ajax=true')
+        self.responder(200, corpo, cabecalhos={'ETag': etag})
+
+    def pagina_listagem(self, parametros):
+        servidor = self.server
+        configuracao = servidor.configuracao
+        comitente = parametros.get('Filtro.ComitenteId', [''])[0][:8] or 'todos'
+        pagina = int(parametros.get('Filtro.CurrentPage', ['1'])[0] or 1)
+        total_paginas = max(1, -(-configuracao.leiloes // configuracao.cards_por_pagina))
+
+        inicio = (pagina - 1) * configuracao.cards_por_pagina
+        cards = ''.join(
+            servidor.modelos['card_leilao'].substitute(
+                leilao=f"{comitente}-leilao-{numero}", titulo=numero,
+                data=f"{numero % 28 + 1:02d}/11/2026", valor=f"{100 + numero}.000,00"
+            )
+            for numero in range(inicio, min(inicio + configuracao.cards_por_pagina, configuracao.leiloes))
+        )
+        paginacao = ''.join(
+            f'<li class="page-item"><a class="page-link" href="#" data-page="{numero}">{numero}</a></li>'
+            for numero in range(1, total_paginas + 1)
+        )
+        self.responder(200, servidor.renderizar('pesquisar_eventos', cards=cards, paginacao=paginacao))
+
+    def pagina_leilao(self, parametros, leilao):
+        numero = int(leilao.rsplit('-', 1)[-1]) if leilao.rsplit('-', 1)[-1].isdigit() else 0
+        self.responder(200, self.server.renderizar('leilao', leilao=leilao, data=f"{numero % 28 + 1:02d}/11/2026"))
+
+    def pagina_ofertas(self, parametros, leilao):
+        self.responder(302, cabecalhos={'Location': f'/evento/lotes/{leilao}'})
+
+    def pagina_lotes(self, parametros, leilao):
+        opcoes = '\n'.join(
+            f'            <option value="{leilao}-lote-{numero}">{numero + 1}</option>'
+            for numero in range(self.server.configuracao.lotes)
+        )
+        self.responder(200, self.server.renderizar('lotes', leilao=leilao, opcoes=opcoes))
+
+    def pagina_lote(self, parametros, slug):
+        modalidade = 'Extrajudicial' if self.server.extrajudicial(slug) else 'Judicial'
+        self.responder(200, self.server.renderizar('lote', slug=slug, modalidade=modalidade))
+
+    def pagina_pdf(self, parametros, slug):
+        pdf = self.server.pdf
+        cabecalhos = {'ETag': self.server.etag_pdf, 'Accept-Ranges': 'bytes'}
+        intervalo = re.match(r'bytes=(\d+)-', self.headers.get('Range') or '')
+        if intervalo and int(intervalo.group(1)) < len(pdf):
+            inicio = int(intervalo.group(1))
+            cabecalhos['Content-Range'] = f"bytes {inicio}-{len(pdf) - 1}/{len(pdf)}"
+            return self.responder(206, pdf[inicio:], 'application/pdf', cabecalhos)
+        self.responder(200, pdf, 'application/pdf', cabecalhos)
+
+
+def iniciar_servidor(configuracao=None, host='127.0.0.1', porta=0):
+    """Sobe o servidor em uma thread daemon; porta 0 escolhe uma porta livre"""
+    servidor = ServidorLeilaoVip((host, porta), configuracao)
+    threading.Thread(target=servidor.serve_forever, name='servidor-local', daemon=True).start()
+    return servidor
+
+
+def adicionar_argumentos(parser):
+    """Opções de ConfiguracaoServidor, compartilhadas com benchmarks/medir_scraper.py"""
+    parser.add_argument('--leiloes', type=int, default=12, help="Leilões por comitente")
+    parser.add_argument('--lotes', type=int, default=8, help="Lotes por leilão")
+    parser.add_argument('--cards-por-pagina', type=int, default=6)
+    parser.add_argument('--latencia', type=float, default=0.0, help="Segundos antes de cada resposta")
+    parser.add_argument('--taxa-erro', type=float, default=0.0, help="Fração de respostas 503")
+    parser.add_argument('--tamanho-pdf', type=int, default=200 * 1024, help="Bytes de cada matrícula")
+    parser.add_argument('--fracao-extrajudicial', type=float, default=0.75)
+    parser.add_argument('--recheio', type=int, default=20, help="Repetições do HTML institucional por página")
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--fixtures', default=diretorio_fixtures)
+
+
+def configuracao_dos_argumentos(args):
+    return ConfiguracaoServidor(
+        leiloes=args.leiloes, lotes=args.lotes, cards_por_pagina=args.cards_por_pagina,
+        latencia=args.latencia, taxa_erro=args.taxa_erro, tamanho_pdf=args.tamanho_pdf,
+        fracao_extrajudicial=args.fracao_extrajudicial, recheio=args.recheio,
+        semente=args.semente, fixtures=args.fixtures
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local que imita o LeilaoVip")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=8001)
+    adicionar_argumentos(parser)
+    args = parser.parse_args()
+
+    servidor = ServidorLeilaoVip((args.host, args.porta), configuracao_dos_argumentos(args))
+    print(f"🌐 LeilaoVip local em {servidor.url_base}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
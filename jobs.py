@@ -0,0 +1,119 @@
+"""
+Execução do scraping em segundo plano para a API
+"""
+
+import cProfile
+import io
+import logging
+import marshal
+import pstats
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Quantos jobs finalizados ficam disponíveis para consulta
+max_jobs_historico = 100
+
+
+class Job:
+    """Um scraping submetido pela API"""
+
+    def __init__(self, scraper, perfilar=False):
+        self.id = uuid.uuid4().hex
+        self.scraper = scraper
+        # perfilar=True executa o scraping sob o cProfile; o perfil fica em self.perfil
+        self.perfilar = perfilar
+        self.perfil = None
+        self.estado = "pendente"
+        self.criado_em = datetime.now()
+        self.iniciado_em = None
+        self.finalizado_em = None
+        self.resultado = None
+        self.erro = None
+
+    def para_dict(self):
+        return {
+            "job_id": self.id,
+            "estado": self.estado,
+            "criado_em": self.criado_em.isoformat(),
+            "iniciado_em": self.iniciado_em.isoformat() if self.iniciado_em else None,
+            "finalizado_em": self.finalizado_em.isoformat() if self.finalizado_em else None,
+            "progresso": dict(self.scraper.progresso),
+            "total_pdfs": len(self.resultado) if self.resultado is not None else None,
+            "pdfs_baixados": self.resultado,
+            "erro": self.erro,
+        }
+
+    def perfil_texto(self, ordenar='cumulative', limite=50):
+        """Funções mais custosas do perfil, no formato do pstats"""
+        saida = io.StringIO()
+        pstats.Stats(self.perfil, stream=saida).sort_stats(ordenar).print_stats(limite)
+        return saida.getvalue()
+
+    def perfil_binario(self):
+        """Perfil no formato de `pstats.dump_stats`, para snakeviz, gprof2dot etc."""
+        return marshal.dumps(pstats.Stats(self.perfil).stats)
+
+
+class GerenciadorJobs:
+    """Fila de jobs de scraping executados em threads de um pool
+
+    O scraping roda fora do event loop do uvicorn, então a API continua
+    respondendo enquanto ele acontece.
+    """
+
+    def __init__(self, max_jobs_simultaneos=1):
+        self._executor = ThreadPoolExecutor(max_workers=max_jobs_simultaneos, thread_name_prefix="job-scraping")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submeter(self, scraper, perfilar=False):
+        """Enfileira o scraping e devolve o job imediatamente"""
+        job = Job(scraper, perfilar)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._descartar_antigos()
+        self._executor.submit(self._executar, job)
+        logger.info(f"📥 Job {job.id} enfileirado")
+        return job
+
+    def _executar(self, job):
+        job.estado = "executando"
+        job.iniciado_em = datetime.now()
+        try:
+            if job.perfilar:
+                # O cProfile só enxerga a thread em que foi ativado
+                perfil = cProfile.Profile()
+                try:
+                    job.resultado = perfil.runcall(job.scraper.executar_scraping)
+                finally:
+                    job.perfil = perfil
+            else:
+                job.resultado = job.scraper.executar_scraping()
+            job.estado = "concluido"
+        except Exception as e:
+            logger.error(f"❌ Job {job.id} falhou: {e}")
+            job.erro = str(e)
+            job.estado = "erro"
+            job.scraper.emitir('erro_job', erro=job.erro)
+        finally:
+            job.finalizado_em = datetime.now()
+            # Libera os clientes que acompanham os eventos do job
+            job.scraper.eventos.encerrar()
+
+    def _descartar_antigos(self):
+        finalizados = [job_id for job_id, job in self._jobs.items() if job.estado in ("concluido", "erro")]
+        for job_id in finalizados[:max(0, len(finalizados) - max_jobs_historico)]:
+            del self._jobs[job_id]
+
+    def obter(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def listar(self):
+        with self._lock:
+            return list(self._jobs.values())
@@ -1,14 +1,64 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
-from scrapping.vip import iniciar_scraping_vip, testar_um_banco
-import uvicorn
-from datetime import datetime
 import os
+from contextlib import asynccontextmanager
+from typing import List
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from scrapping import metricas
+from scrapping.catalogo import CatalogoPDFs, limite_pagina
+from scrapping.comitentes import RegistroComitentes
+from scrapping.eventos import formatar_sse
+from scrapping.fronteira import FronteiraCrawl
+from scrapping.indice import diretorio_pdfs
+from scrapping.rastreamento import Rastreador
+from scrapping.recoleta import AgendaRecoleta, AgendadorRecoleta, arquivo_fronteira_recoleta
+from scrapping.vip import LeilaoVipScraper, testar_um_banco
+from jobs import GerenciadorJobs
+import uvicorn
+from datetime import date, datetime
+
+# Scrapings rodam em segundo plano; a API só enfileira e consulta
+gerenciador_jobs = GerenciadorJobs()
+
+# Metadados dos PDFs baixados, preenchido pelo scraper a cada download
+catalogo_pdfs = CatalogoPDFs()
+
+# Comitentes de comitentes.json, com a última coleta de cada um
+comitentes = RegistroComitentes()
+
+# Data de cada leilão e a próxima recoleta, preenchida pelos scrapings
+agenda_recoleta = AgendaRecoleta()
+
+# Fronteira dos jobs do agendador, reaproveitada entre as rodadas (uma rodada não começa com a anterior rodando)
+fronteira_recoleta = FronteiraCrawl(arquivo_fronteira_recoleta)
+
+def criar_scraper_recoleta(bancos, leiloes):
+    return LeilaoVipScraper(
+        catalogo=catalogo_pdfs, comitentes=comitentes, bancos=bancos, leiloes=leiloes, agenda=agenda_recoleta,
+        fronteira=fronteira_recoleta
+    )
+
+# Enfileira as recoletas vencidas: leilões perto da data com mais frequência e comitentes pelo intervalo.
+# Desligado por padrão: RECOLETA_ATIVA=1 liga, RECOLETA_NUNCA_COLETADOS=1 inclui os comitentes sem coleta
+recoleta_ativa = os.environ.get('RECOLETA_ATIVA') == '1'
+agendador_recoleta = AgendadorRecoleta(
+    gerenciador_jobs, comitentes, agenda_recoleta, criar_scraper_recoleta,
+    coletar_nunca_coletados=os.environ.get('RECOLETA_NUNCA_COLETADOS') == '1'
+)
+
+@asynccontextmanager
+async def lifespan(app):
+    # PDFs baixados antes do catálogo existir entram na primeira inicialização
+    catalogo_pdfs.importar_diretorio(diretorio_pdfs, comitentes.urls())
+    if recoleta_ativa:
+        agendador_recoleta.iniciar()
+    yield
+    agendador_recoleta.parar()
 
 app = FastAPI(
     title="Sistema de Scraping de Leilões",
     description="API para realizar scraping de leilões extrajudiciais",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 @app.get("/")
@@ -19,27 +69,32 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "scraping_vip": "/scraping/vip",
+            "jobs": "/jobs/{job_id}",
+            "eventos_job": "/jobs/{job_id}/eventos",
             "test_banco": "/test/{banco}",
+            "comitentes": "/comitentes",
+            "recoletas": "/recoletas",
             "status": "/status",
-            "pdfs": "/pdfs"
+            "pdfs": "/pdfs",
+            "metrics": "/metrics"
         }
     }
 
 @app.get("/test/{banco}")
-async def testar_banco_especifico(banco: str):
+def testar_banco_especifico(banco: str):
     """Testa scraping de um banco específico com debug detalhado"""
+    bancos_validos = comitentes.nomes()
+    
+    if banco not in bancos_validos:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Banco '{banco}' não é válido. Use: {', '.join(bancos_validos)}"
+        )
+    
     try:
-        bancos_validos = ["bradesco", "banco_pan", "bv"]
-        
-        if banco not in bancos_validos:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Banco '{banco}' não é válido. Use: {', '.join(bancos_validos)}"
-            )
-        
         print(f"🧪 Testando banco {banco} via API...")
         
-        links_encontrados = testar_um_banco(banco)
+        links_encontrados = testar_um_banco(banco, comitentes)
         
         return JSONResponse(
             status_code=200,
@@ -64,21 +119,44 @@ async def testar_banco_especifico(banco: str):
         )
 
 @app.post("/scraping/vip")
-async def executar_scraping_vip():
-    """Executa o scraping do LeilaoVip"""
+def executar_scraping_vip(max_workers: int = 1, retomar: bool = False, processos_analise: int = 0,
+                          rastrear: bool = False, perfilar: bool = False, bancos: List[str] = Query(None),
+                          trabalhadores: int = 0):
+    """Enfileira o scraping do LeilaoVip e retorna o id do job
+    
+    Sem `bancos`, coleta todos os comitentes ativos. `trabalhadores` divide a
+    coleta entre processos que reivindicam as unidades da fronteira. `rastrear` grava os spans da execução (GET /jobs/{job_id}/rastro) e `perfilar`
+    roda o scraping sob o cProfile (GET /jobs/{job_id}/perfil), no modo sequencial.
+    """
+    desconhecidos = [nome for nome in bancos or [] if nome not in comitentes]
+    if desconhecidos:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Comitentes desconhecidos: {', '.join(desconhecidos)}. Use: {', '.join(comitentes.nomes())}"
+        )
+    
     try:
-        print("🚀 Iniciando scraping do LeilaoVip via API...")
+        print("🚀 Enfileirando scraping do LeilaoVip via API...")
         
-        pdfs_baixados = iniciar_scraping_vip()
+        # O cProfile só vê a thread do job: perfilando, todo o trabalho precisa passar por ela
+        if perfilar:
+            max_workers, processos_analise, trabalhadores = 1, 0, 0
+        
+        scraper = LeilaoVipScraper(
+            max_workers=max_workers, retomar=retomar, catalogo=catalogo_pdfs, processos_analise=processos_analise,
+            rastreador=Rastreador() if rastrear else None, comitentes=comitentes, bancos=bancos,
+            trabalhadores=trabalhadores, agenda=agenda_recoleta
+        )
+        job = gerenciador_jobs.submeter(scraper, perfilar=perfilar)
         
         return JSONResponse(
-            status_code=200,
+            status_code=202,
             content={
-                "status": "sucesso",
-                "message": "Scraping concluído com sucesso!",
+                "status": "aceito",
+                "message": "Scraping enfileirado. Acompanhe em /jobs/{job_id}",
                 "timestamp": datetime.now().isoformat(),
-                "total_pdfs": len(pdfs_baixados),
-                "pdfs_baixados": pdfs_baixados
+                "job_id": job.id,
+                "estado": job.estado
             }
         )
         
@@ -92,6 +170,125 @@ async def executar_scraping_vip():
             }
         )
 
+@app.get("/comitentes")
+def listar_comitentes():
+    """Comitentes acompanhados, com prioridade, vagas, intervalo e última/próxima coleta"""
+    return {
+        "status": "sucesso",
+        "total": len(comitentes),
+        "comitentes": [comitentes.para_dict(nome) for nome in comitentes.urls()]
+    }
+
+@app.get("/recoletas")
+def listar_recoletas(limite: int = Query(100, ge=1, le=limite_pagina)):
+    """Estado do agendador e as próximas recoletas de leilões, da mais próxima para a mais distante"""
+    return {
+        "status": "sucesso",
+        "agendador": agendador_recoleta.estado(),
+        "proximas": agenda_recoleta.listar(limite)
+    }
+
+@app.get("/jobs")
+def listar_jobs():
+    """Lista os jobs de scraping recentes"""
+    return {
+        "status": "sucesso",
+        "jobs": [
+            {"job_id": job.id, "estado": job.estado, "criado_em": job.criado_em.isoformat()}
+            for job in gerenciador_jobs.listar()
+        ]
+    }
+
+@app.get("/jobs/{job_id}")
+def consultar_job(job_id: str):
+    """Estado, progresso e resultado de um job de scraping"""
+    job = gerenciador_jobs.obter(job_id)
+    
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Job '{job_id}' não encontrado"
+        )
+    
+    return job.para_dict()
+
+@app.get("/jobs/{job_id}/rastro")
+def obter_rastro_job(job_id: str):
+    """Spans da execução no formato Chrome Trace (chrome://tracing, Perfetto, speedscope)"""
+    job = gerenciador_jobs.obter(job_id)
+    
+    if job is None or not isinstance(job.scraper.rastreador, Rastreador):
+        raise HTTPException(
+            status_code=404,
+            detail=f"Job '{job_id}' não encontrado ou executado sem rastrear=true"
+        )
+    
+    return job.scraper.rastreador.exportar_chrome()
+
+@app.get("/jobs/{job_id}/perfil")
+def obter_perfil_job(job_id: str, ordenar: str = "cumulative", limite: int = 50, formato: str = "texto"):
+    """Perfil do cProfile de um job executado com perfilar=true (texto ou binário do pstats)"""
+    job = gerenciador_jobs.obter(job_id)
+    
+    if job is None or not job.perfilar:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Job '{job_id}' não encontrado ou executado sem perfilar=true"
+        )
+    
+    if job.perfil is None:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Job '{job_id}' ainda em execução ({job.estado})"
+        )
+    
+    if formato == "pstats":
+        return Response(
+            job.perfil_binario(),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="{job_id}.prof"'}
+        )
+    
+    try:
+        return PlainTextResponse(job.perfil_texto(ordenar, limite))
+    except KeyError:
+        raise HTTPException(status_code=400, detail=f"Ordenação '{ordenar}' inválida")
+
+# Segundos sem eventos até o comentário de keepalive (e a próxima verificação de desconexão)
+intervalo_keepalive = 5
+
+@app.get("/jobs/{job_id}/eventos")
+async def transmitir_eventos_job(job_id: str, request: Request, last_event_id: int = Header(0)):
+    """Transmite os eventos do job via Server-Sent Events até o fim da execução
+
+    A espera pelos eventos acontece no event loop: conexões abertas não ocupam o pool de threads
+    dos endpoints síncronos.
+    """
+    job = gerenciador_jobs.obter(job_id)
+    
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Job '{job_id}' não encontrado"
+        )
+    
+    eventos = job.scraper.eventos
+    
+    async def gerar():
+        # Last-Event-ID permite ao cliente retomar de onde parou
+        seq = last_event_id
+        while not await request.is_disconnected():
+            novos = await eventos.aguardar_async(seq, timeout=intervalo_keepalive)
+            for evento in novos:
+                seq = evento['seq']
+                yield formatar_sse(evento)
+            if not novos:
+                if eventos.encerrado:
+                    return
+                yield ": keepalive\n\n"
+    
+    return StreamingResponse(gerar(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 @app.get("/status")
 async def verificar_status():
     """Verifica o status da aplicação"""
@@ -101,38 +298,43 @@ async def verificar_status():
         "message": "API funcionando normalmente"
     }
 
+@app.get("/metrics")
+def exportar_metricas():
+    """Contadores e histogramas do scraper no formato texto do Prometheus"""
+    return PlainTextResponse(metricas.registro.exportar(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+def formatar_pdf(pdf):
+    """Item do catálogo na resposta de /pdfs, com os campos de antes do catálogo (data_criacao)"""
+    return {**pdf, "data_criacao": pdf["baixado_em"]}
+
 @app.get("/pdfs")
-async def listar_pdfs():
-    """Lista todos os PDFs baixados"""
+def listar_pdfs(
+    banco: str = None,
+    desde: date = None,
+    ate: date = None,
+    cursor: int = None,
+    limite: int = Query(100, ge=1, le=limite_pagina)
+):
+    """Lista os PDFs baixados, paginados por cursor e filtrados por banco e data"""
     try:
-        pdfs_dir = "pdfs"
+        total = catalogo_pdfs.contar(banco, desde, ate)
         
-        if not os.path.exists(pdfs_dir):
+        if total == 0:
             return {
                 "status": "vazio",
                 "message": "Nenhum PDF encontrado",
                 "total": 0,
-                "pdfs": []
+                "pdfs": [],
+                "proximo_cursor": None
             }
         
-        arquivos_pdf = [f for f in os.listdir(pdfs_dir) if f.endswith('.pdf')]
-        
-        pdfs_info = []
-        for pdf in arquivos_pdf:
-            caminho_completo = os.path.join(pdfs_dir, pdf)
-            stat = os.stat(caminho_completo)
-            
-            pdfs_info.append({
-                "nome": pdf,
-                "caminho": caminho_completo,
-                "tamanho_bytes": stat.st_size,
-                "data_criacao": datetime.fromtimestamp(stat.st_ctime).isoformat()
-            })
+        pdfs, proximo_cursor = catalogo_pdfs.listar(banco, desde, ate, cursor, limite)
         
         return {
             "status": "sucesso",
-            "total": len(pdfs_info),
-            "pdfs": pdfs_info
+            "total": total,
+            "pdfs": [formatar_pdf(pdf) for pdf in pdfs],
+            "proximo_cursor": proximo_cursor
         }
         
     except Exception as e:
@@ -0,0 +1,205 @@
+"""
+Análise das páginas de leilão e de lote, sem acesso à rede
+
+São funções puras (bytes da página → dados extraídos) para poderem rodar
+em outro processo: o pipeline as executa em um ProcessPoolExecutor e os
+modos sequencial/concorrente as chamam direto.
+"""
+
+import re
+from datetime import datetime, timedelta
+from urllib.parse import urljoin
+
+from scrapping.deduplicacao import canonizar_url
+from scrapping.parser import criar_soup
+from scrapping.regras import (
+    regra_ajax_lotes, regra_classes_card, regra_exemplos_lotes, regra_ofertas, regra_paginacao, regras_cards_lote,
+    regras_lotes, regras_matricula
+)
+
+# Número de página em href/onclick (CurrentPage=3, page=3, pagina(3))
+re_numero_pagina = re.compile(r'(?:CurrentPage|page|pagina)\W{0,2}(\d+)', re.IGNORECASE)
+
+# Data (e hora, se houver) de uma praça no texto do card: "1º Leilão: 10/11/2026 às 10:00"
+re_data_leilao = re.compile(r'\b(\d{1,2})/(\d{1,2})/(\d{4})(?:\D{1,6}?(\d{1,2})[:h](\d{2}))?')
+
+
+def url_base(url):
+    """https://www.leilaovip.com.br a partir de qualquer URL do site"""
+    return '/'.join(url.split('/')[:3])
+
+
+def detectar_total_paginas(soup):
+    """Maior número de página citado na paginação da listagem, ou None se não houver paginação"""
+    numeros = []
+    for paginacao in soup.find_all(class_=regra_paginacao.casa):
+        for elemento in paginacao.find_all(['a', 'li', 'button', 'span']):
+            texto = elemento.get_text(strip=True)
+            if texto.isdigit():
+                numeros.append(int(texto))
+            for atributo in ('data-page', 'href', 'onclick'):
+                valor = elemento.get(atributo) or ''
+                if valor.isdigit():
+                    numeros.append(int(valor))
+                numeros.extend(int(numero) for numero in re_numero_pagina.findall(valor))
+    return max(numeros) if numeros else None
+
+
+def extrair_data_leilao(texto, agora=None):
+    """Data da próxima praça citada no texto do card, ou da última se todas já passaram
+
+    Retorna None quando o texto não traz nenhuma data válida.
+    """
+    datas = []
+    for dia, mes, ano, hora, minuto in re_data_leilao.findall(texto or ''):
+        try:
+            datas.append(datetime(int(ano), int(mes), int(dia), int(hora or 0), int(minuto or 0)))
+        except ValueError:
+            continue
+    if not datas:
+        return None
+    # Uma praça do dia ainda conta até o fim dele
+    referencia = (agora or datetime.now()) - timedelta(days=1)
+    futuras = [data for data in datas if data >= referencia]
+    return min(futuras) if futuras else max(datas)
+
+
+def analisar_leilao(conteudo, url_leilao, seguir_ofertas=True, backend=None):
+    """Lotes candidatos da página do leilão (ou da página de ofertas)
+
+    Se `seguir_ofertas` e a página tiver o link "aberto para ofertas", só ele
+    é retornado em 'ofertas': os lotes estão na página de destino.
+    Os lotes vêm como (url, descrição) na ordem da página, ainda sem
+    descartar os já processados.
+    """
+    soup = criar_soup(conteudo, 'lotes', backend)
+    base_url = url_base(url_leilao)
+    canonica_leilao = canonizar_url(url_leilao)
+
+    if seguir_ofertas:
+        link_ofertas = soup.find('a', href=regra_ofertas.casa)
+        if link_ofertas:
+            return {'ofertas': urljoin(base_url, link_ofertas.get('href'))}
+
+    todos_links = soup.find_all('a', href=True)
+    lotes = []
+    opcoes = None
+
+    # Estratégia principal: <select> com options de lotes
+    select_lotes = soup.find('select')
+    if select_lotes:
+        options = select_lotes.find_all('option')
+        opcoes = len(options)
+        for option in options:
+            value = option.get('value', '')
+            if value and value != '#':  # Ignora valores vazios ou #
+                # O value geralmente é o slug do lote (ex: apartamento-com-7275-m-imbui-12667)
+                lotes.append((urljoin(base_url, f'/evento/anuncio/{value}'), f"Lote #{option.get_text(strip=True)}: {value}"))
+
+    sem_lotes_no_select = not lotes
+    exemplos = []
+
+    # Uma única passada: exemplos para debug e links diretos de lotes
+    for link in todos_links:
+        href = link.get('href', '')
+
+        if sem_lotes_no_select and regra_exemplos_lotes.casa(href):
+            exemplos.append((href, link.get_text(strip=True)[:40]))
+
+        # Padrões: /lote/, /item/, /imovel/; links do próprio evento só se forem de lote
+        if regras_lotes.link_candidato(href) and ('/evento/' not in href or '/lote' in href):
+            link_completo = urljoin(base_url, href)
+            if canonizar_url(link_completo) != canonica_leilao:
+                lotes.append((link_completo, f"Lote encontrado: {link.get_text(strip=True)[:30]} -> {href}"))
+
+    # Elementos que podem carregar lotes via AJAX, para quando nada acima servir
+    ajax = [
+        elem.get('data-ajax-url') for elem in soup.find_all(attrs={'data-ajax-url': True})
+        if regra_ajax_lotes.casa(elem.get('data-ajax-url'))
+    ]
+
+    return {
+        'ofertas': None,
+        'total_links': len(todos_links),
+        'opcoes': opcoes,
+        'lotes': lotes,
+        'exemplos': exemplos if sem_lotes_no_select else None,
+        'ajax': ajax,
+    }
+
+
+def analisar_links_ajax(conteudo, base_url, backend=None):
+    """Lotes candidatos em uma resposta AJAX, como (url, href)"""
+    soup = criar_soup(conteudo, 'links', backend)
+    return [
+        (urljoin(base_url, link['href']), link['href'])
+        for link in soup.find_all('a', href=True) if regras_lotes.link_candidato(link['href'])
+    ]
+
+
+def analisar_cards_lotes(conteudo, url_leilao, backend=None):
+    """Busca ampla por cards de lotes na página inteira
+
+    Retorna (quantidade de cards, [(url, texto, href)]).
+    """
+    soup = criar_soup(conteudo, None, backend)
+    base_url = url_base(url_leilao)
+    # O próprio leilão aparece nos cards com outra grafia (/detalhe/, barra no fim)
+    canonica_leilao = canonizar_url(url_leilao)
+    cards_possiveis = soup.find_all(['div', 'article', 'section'], class_=lambda x: x and regra_classes_card.casa(str(x)))
+    lotes = []
+
+    for card in cards_possiveis:
+        links_no_card = card.find_all('a', href=True)
+
+        # Indicadores de lotes (valores, metragem, endereços) no texto do card,
+        # que já inclui o texto de cada link; avaliado uma vez por card
+        if not links_no_card or not regras_cards_lote.contexto_valido(card.get_text()):
+            continue
+
+        for link in links_no_card:
+            href = link.get('href', '')
+
+            # Evita links de navegação
+            if regras_cards_lote.link_candidato(href):
+                link_completo = urljoin(base_url, href)
+                if canonizar_url(link_completo) != canonica_leilao:
+                    lotes.append((link_completo, link.get_text(strip=True).lower(), href))
+
+    return len(cards_possiveis), lotes
+
+
+def analisar_lote(conteudo, encoding, url_lote, filtro_palavras, backend=None):
+    """Filtro de palavras-chave e escolha do link da matrícula na página do lote"""
+    # Verifica a palavra-chave nos bytes, antes de qualquer parsing
+    if not filtro_palavras.verificar_bytes(conteudo, encoding):
+        return {'palavra_chave': False}
+
+    # Só os links interessam daqui em diante
+    soup = criar_soup(conteudo, 'ancoras', backend)
+    todos_links = soup.find_all('a')
+    links_com_href = [link for link in todos_links if link.get('href') is not None]
+
+    # Links que podem ser documentos, para debug (entre os primeiros 15)
+    documentos = []
+    for link in links_com_href[:15]:
+        href = link.get('href', '')
+        texto = link.get_text(strip=True)
+        if regras_matricula.documento.casa(href) or regras_matricula.documento.casa(texto):
+            documentos.append((texto[:40], href))
+
+    # Todas as estratégias avaliadas em uma passada
+    link_matricula, rank = regras_matricula.melhor_link(todos_links)
+    pdf_url = texto_link = None
+    if link_matricula and link_matricula.get('href'):
+        pdf_url = urljoin(url_lote, link_matricula['href'])
+        texto_link = link_matricula.get_text(strip=True)
+
+    return {
+        'palavra_chave': True,
+        'total_links': len(links_com_href),
+        'documentos': documentos,
+        'rank': rank,
+        'pdf_url': pdf_url,
+        'texto_link': texto_link,
+    }
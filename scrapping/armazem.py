@@ -0,0 +1,86 @@
+import json
+import logging
+import os
+import threading
+
+from scrapping.indice import diretorio_pdfs
+
+logger = logging.getLogger(__name__)
+
+
+class ArmazemPDFs:
+    """Armazém de PDFs endereçado pelo SHA-256 do conteúdo
+
+    Cada documento é guardado uma única vez em objetos/<aa>/<sha256>.pdf e
+    os nomes {banco}_{lote_id}.pdf são hardlinks para ele. O armazém também
+    lembra o SHA-256 de cada URL de origem, para que uma matrícula já baixada
+    não seja buscada nem gravada de novo quando aparece em outro lote.
+    """
+
+    def __init__(self, diretorio=diretorio_pdfs):
+        self.diretorio = diretorio
+        self.diretorio_objetos = os.path.join(diretorio, 'objetos')
+        self.diretorio_recebendo = os.path.join(self.diretorio_objetos, 'recebendo')
+        self.caminho_urls = os.path.join(self.diretorio_objetos, 'urls.jsonl')
+        self._urls = {}
+        self._lock = threading.Lock()
+        self._carregar_urls()
+
+    def _carregar_urls(self):
+        if not os.path.exists(self.caminho_urls):
+            return
+        with open(self.caminho_urls, 'r', encoding='utf-8') as f:
+            for linha in f:
+                try:
+                    registro = json.loads(linha)
+                except ValueError:
+                    continue
+                self._urls[registro['url']] = registro['sha256']
+
+    def caminho_objeto(self, sha256):
+        return os.path.join(self.diretorio_objetos, sha256[:2], f"{sha256}.pdf")
+
+    def caminho_recebimento(self, nome_arquivo):
+        """Onde o download fica até o hash ser conhecido"""
+        return os.path.join(self.diretorio_recebendo, nome_arquivo)
+
+    def contem(self, sha256):
+        return os.path.exists(self.caminho_objeto(sha256))
+
+    def sha_da_url(self, url):
+        """SHA-256 já armazenado para a URL, se o objeto ainda existir"""
+        with self._lock:
+            sha256 = self._urls.get(url)
+        if sha256 and self.contem(sha256):
+            return sha256
+        return None
+
+    def armazenar(self, caminho_baixado, sha256, url):
+        """Move o arquivo baixado para o armazém; descarta se o conteúdo já existe"""
+        caminho_objeto = self.caminho_objeto(sha256)
+        if os.path.exists(caminho_objeto):
+            os.remove(caminho_baixado)
+            logger.info(f"♻️  Conteúdo duplicado, reaproveitando objeto {sha256[:12]}")
+        else:
+            os.makedirs(os.path.dirname(caminho_objeto), exist_ok=True)
+            os.replace(caminho_baixado, caminho_objeto)
+
+        with self._lock:
+            if self._urls.get(url) != sha256:
+                self._urls[url] = sha256
+                with open(self.caminho_urls, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({'url': url, 'sha256': sha256}) + '\n')
+        return caminho_objeto
+
+    def vincular(self, sha256, destino):
+        """Cria `destino` como hardlink do objeto; retorna False se o sistema não suportar"""
+        temporario = f"{destino}.{threading.get_ident()}.link"
+        try:
+            os.link(self.caminho_objeto(sha256), temporario)
+            os.replace(temporario, destino)
+            return True
+        except OSError as e:
+            logger.warning(f"⚠️  Hardlink indisponível para {destino}, usando apenas o manifesto: {e}")
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            return False
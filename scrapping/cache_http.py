@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import timedelta
+from urllib.parse import urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+diretorio_cache = os.path.join('dados', 'cache_http')
+
+# Validade das respostas sem ETag/Last-Modified (segundos)
+ttl_cache = 15 * 60
+
+# Só páginas e respostas AJAX entram no cache; PDFs ficam de fora
+tipos_cacheaveis = ('text/', 'json', 'xml')
+
+
+class CacheHTTP:
+    """Cache HTTP em disco com revalidação condicional
+
+    Respostas com ETag ou Last-Modified são sempre revalidadas com
+    If-None-Match/If-Modified-Since; um 304 devolve o corpo salvo.
+    Respostas sem validadores são servidas direto do disco enquanto
+    tiverem menos de `ttl` segundos.
+    """
+
+    def __init__(self, diretorio=diretorio_cache, ttl=ttl_cache):
+        self.diretorio = diretorio
+        self.ttl = ttl
+        self.estatisticas = {'hits': 0, 'misses': 0, 'revalidacoes': 0}
+        self._lock = threading.Lock()
+
+    def chave(self, method, url, params=None, data=None):
+        """Identifica a requisição pelo método, URL, query e corpo do formulário"""
+        if isinstance(data, dict):
+            data = urlencode(sorted(data.items()))
+        if isinstance(params, dict):
+            params = urlencode(sorted(params.items()), doseq=True)
+        bruto = '\n'.join([method.upper(), url, str(params or ''), str(data or '')])
+        return hashlib.sha256(bruto.encode('utf-8')).hexdigest()
+
+    def _caminhos(self, chave):
+        pasta = os.path.join(self.diretorio, chave[:2])
+        return os.path.join(pasta, f"{chave}.json"), os.path.join(pasta, f"{chave}.body")
+
+    def buscar(self, chave):
+        """Retorna a entrada salva (metadados + corpo) ou None"""
+        caminho_meta, caminho_corpo = self._caminhos(chave)
+        try:
+            with open(caminho_meta, 'r', encoding='utf-8') as f:
+                entrada = json.load(f)
+            with open(caminho_corpo, 'rb') as f:
+                entrada['corpo'] = f.read()
+            return entrada
+        except (OSError, ValueError):
+            return None
+
+    def fresca(self, entrada):
+        """Entradas sem validadores valem até expirar o TTL"""
+        headers = entrada['headers']
+        if 'ETag' in headers or 'Last-Modified' in headers:
+            return False
+        return time.time() - entrada['salvo_em'] < self.ttl
+
+    def headers_condicionais(self, entrada):
+        headers = {}
+        if 'ETag' in entrada['headers']:
+            headers['If-None-Match'] = entrada['headers']['ETag']
+        if 'Last-Modified' in entrada['headers']:
+            headers['If-Modified-Since'] = entrada['headers']['Last-Modified']
+        return headers
+
+    def cacheavel(self, response):
+        if response.status_code != 200:
+            return False
+        if 'no-store' in response.headers.get('Cache-Control', '').lower():
+            return False
+        content_type = response.headers.get('Content-Type', '').lower()
+        return any(tipo in content_type for tipo in tipos_cacheaveis)
+
+    def salvar(self, chave, response):
+        """Grava corpo e metadados de forma atômica"""
+        caminho_meta, caminho_corpo = self._caminhos(chave)
+        os.makedirs(os.path.dirname(caminho_meta), exist_ok=True)
+
+        headers = {
+            nome: response.headers[nome]
+            for nome in ('Content-Type', 'ETag', 'Last-Modified')
+            if nome in response.headers
+        }
+        meta = {'url': response.url, 'headers': headers, 'salvo_em': time.time()}
+
+        self._gravar(caminho_corpo, response.content)
+        self._gravar(caminho_meta, json.dumps(meta).encode('utf-8'))
+
+    def renovar(self, chave, entrada):
+        """Atualiza o horário da entrada após um 304"""
+        caminho_meta, _ = self._caminhos(chave)
+        meta = {'url': entrada['url'], 'headers': entrada['headers'], 'salvo_em': time.time()}
+        self._gravar(caminho_meta, json.dumps(meta).encode('utf-8'))
+
+    def _gravar(self, caminho, conteudo):
+        temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporario, 'wb') as f:
+            f.write(conteudo)
+        os.replace(temporario, caminho)
+
+    def resposta(self, entrada, request=None):
+        """Reconstrói um requests.Response a partir da entrada salva"""
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.url = entrada['url']
+        response.headers = CaseInsensitiveDict(entrada['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = entrada['corpo']
+        response.elapsed = timedelta(0)
+        response.request = request
+        return response
+
+    def contar(self, evento):
+        with self._lock:
+            self.estatisticas[evento] += 1
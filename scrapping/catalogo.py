@@ -0,0 +1,185 @@
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+from scrapping.indice import arquivo_manifesto, ler_manifesto, par_do_arquivo
+
+logger = logging.getLogger(__name__)
+
+arquivo_catalogo = os.path.join('dados', 'catalogo_pdfs.sqlite3')
+
+# Tamanho máximo de uma página de GET /pdfs
+limite_pagina = 1000
+
+# Chave das contagens agregadas (todos os bancos / todas as datas)
+todos = '*'
+
+esquema = """
+CREATE TABLE IF NOT EXISTS pdfs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    banco TEXT NOT NULL,
+    lote_id TEXT NOT NULL,
+    nome TEXT NOT NULL,
+    caminho TEXT NOT NULL,
+    url TEXT,
+    tamanho_bytes INTEGER NOT NULL,
+    sha256 TEXT,
+    baixado_em TEXT NOT NULL,
+    UNIQUE (banco, lote_id)
+);
+CREATE INDEX IF NOT EXISTS idx_pdfs_banco ON pdfs (banco, id);
+CREATE INDEX IF NOT EXISTS idx_pdfs_baixado_em ON pdfs (baixado_em, id);
+
+-- Contagens por banco e por dia, mantidas pelos gatilhos abaixo
+CREATE TABLE IF NOT EXISTS contagens (
+    banco TEXT NOT NULL,
+    dia TEXT NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (banco, dia)
+);
+
+CREATE TRIGGER IF NOT EXISTS pdfs_contar_insercao AFTER INSERT ON pdfs
+BEGIN
+    INSERT INTO contagens (banco, dia, total) VALUES
+        (NEW.banco, substr(NEW.baixado_em, 1, 10), 1),
+        (NEW.banco, '*', 1),
+        ('*', substr(NEW.baixado_em, 1, 10), 1),
+        ('*', '*', 1)
+    ON CONFLICT (banco, dia) DO UPDATE SET total = total + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS pdfs_contar_remocao AFTER DELETE ON pdfs
+BEGIN
+    UPDATE contagens SET total = total - 1
+    WHERE banco IN (OLD.banco, '*') AND dia IN (substr(OLD.baixado_em, 1, 10), '*');
+END;
+"""
+
+
+class CatalogoPDFs:
+    """Catálogo em SQLite das matrículas baixadas
+
+    Cada PDF é registrado no momento em que é gravado (banco, lote, URL de
+    origem, tamanho, hash e data), e a listagem da API lê daqui em vez de
+    percorrer o diretório. As contagens por banco ficam prontas na tabela
+    `contagens`; com filtro de datas, somam-se só os dias do intervalo.
+    """
+
+    def __init__(self, caminho=arquivo_catalogo):
+        self.caminho = caminho
+        diretorio = os.path.dirname(caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self._conexao.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conexao:
+            self._conexao.execute("PRAGMA journal_mode=WAL")
+            self._conexao.executescript(esquema)
+
+    def registrar(self, banco, lote_id, caminho_arquivo, url=None, tamanho_bytes=0, sha256=None, baixado_em=None):
+        """Registra (ou atualiza) o PDF de um lote; a data do primeiro registro é mantida"""
+        baixado_em = baixado_em or datetime.now()
+        with self._lock, self._conexao:
+            self._conexao.execute(
+                """
+                INSERT INTO pdfs (banco, lote_id, nome, caminho, url, tamanho_bytes, sha256, baixado_em)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (banco, lote_id) DO UPDATE SET
+                    nome = excluded.nome, caminho = excluded.caminho, url = COALESCE(excluded.url, url),
+                    tamanho_bytes = excluded.tamanho_bytes, sha256 = COALESCE(excluded.sha256, sha256)
+                """,
+                (banco, lote_id, os.path.basename(caminho_arquivo), caminho_arquivo, url,
+                 tamanho_bytes, sha256, baixado_em.isoformat(timespec='seconds'))
+            )
+
+    def importar_diretorio(self, diretorio, bancos_conhecidos=()):
+        """Cataloga os PDFs baixados antes do catálogo existir (manifesto e arquivos soltos)
+
+        Só roda com o catálogo vazio, para não varrer o diretório a cada inicialização.
+        """
+        if len(self) or not os.path.isdir(diretorio):
+            return 0
+
+        arquivos = {entrada.name: entrada.path for entrada in os.scandir(diretorio) if entrada.name.endswith('.pdf')}
+        registros = []
+
+        for registro in ler_manifesto(os.path.join(diretorio, arquivo_manifesto)):
+            caminho = arquivos.pop(registro.get('arquivo'), None)
+            if caminho is None and registro.get('objeto'):
+                caminho = os.path.join(diretorio, registro['objeto'])
+            if caminho and os.path.exists(caminho):
+                registros.append((registro['banco'], registro['lote_id'], caminho, registro.get('sha256')))
+
+        for nome_arquivo, caminho in arquivos.items():
+            par = par_do_arquivo(nome_arquivo, bancos_conhecidos)
+            if par:
+                registros.append((*par, caminho, None))
+
+        for banco, lote_id, caminho, sha256 in registros:
+            stat = os.stat(caminho)
+            self.registrar(banco, lote_id, caminho, None, stat.st_size, sha256, datetime.fromtimestamp(stat.st_mtime))
+
+        logger.info(f"🗃️  Catálogo de PDFs importado do disco: {len(registros)} PDFs")
+        return len(registros)
+
+    def _filtros(self, banco=None, desde=None, ate=None):
+        condicoes, parametros = [], []
+        if banco:
+            condicoes.append("banco = ?")
+            parametros.append(banco)
+        if desde:
+            condicoes.append("baixado_em >= ?")
+            parametros.append(desde.isoformat())
+        if ate:
+            # `ate` é inclusivo: vale até o fim do dia
+            condicoes.append("baixado_em < ?")
+            parametros.append((ate + timedelta(days=1)).isoformat())
+        return condicoes, parametros
+
+    def listar(self, banco=None, desde=None, ate=None, cursor=None, limite=100):
+        """Página de PDFs, dos mais recentes para os mais antigos
+
+        Retorna (pdfs, proximo_cursor); `cursor` é o id do último PDF da
+        página anterior e `proximo_cursor` é None na última página.
+        """
+        limite = max(1, min(limite, limite_pagina))
+        condicoes, parametros = self._filtros(banco, desde, ate)
+        if cursor:
+            condicoes.append("id < ?")
+            parametros.append(cursor)
+        where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+
+        with self._lock:
+            linhas = self._conexao.execute(
+                f"SELECT * FROM pdfs {where} ORDER BY id DESC LIMIT ?", (*parametros, limite + 1)
+            ).fetchall()
+
+        pdfs = [dict(linha) for linha in linhas[:limite]]
+        proximo_cursor = pdfs[-1]['id'] if len(linhas) > limite else None
+        return pdfs, proximo_cursor
+
+    def contar(self, banco=None, desde=None, ate=None):
+        """Total de PDFs pelos filtros, lido da tabela de contagens"""
+        banco = banco or todos
+        with self._lock:
+            if not desde and not ate:
+                linha = self._conexao.execute(
+                    "SELECT total FROM contagens WHERE banco = ? AND dia = ?", (banco, todos)
+                ).fetchone()
+                return linha[0] if linha else 0
+
+            linha = self._conexao.execute(
+                "SELECT COALESCE(SUM(total), 0) FROM contagens WHERE banco = ? AND dia != ? AND dia >= ? AND dia <= ?",
+                (banco, todos, desde.isoformat() if desde else '', ate.isoformat() if ate else '9999-12-31')
+            ).fetchone()
+            return linha[0]
+
+    def __len__(self):
+        return self.contar()
+
+    def fechar(self):
+        with self._lock:
+            self._conexao.close()
@@ -0,0 +1,247 @@
+"""
+Registro dos comitentes acompanhados e escalonador justo entre eles
+
+Os comitentes ficam em `comitentes.json`, na raiz do projeto: nome, URL da
+agenda (ou só o id do comitente no LeilaoVip), prioridade, quantas unidades
+dele podem estar em processamento ao mesmo tempo e o intervalo mínimo entre
+duas coletas. A data da última coleta de cada um fica em `dados/`.
+"""
+
+import json
+import logging
+import os
+import threading
+from collections import Counter, deque
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+arquivo_comitentes = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'comitentes.json')
+arquivo_coletas = os.path.join('dados', 'coletas_comitentes.json')
+
+# Agenda de um comitente do LeilaoVip a partir do id
+url_agenda = 'https://www.leilaovip.com.br/agenda?Filtro.ComitenteId={comitente_id}'
+
+# Valores de quem não define os seus, nem na seção "padrao" do arquivo
+padrao_comitente = {'prioridade': 1, 'max_concorrencia': 4, 'intervalo_horas': 24, 'ativo': True}
+
+
+class Comitente:
+    """Um comitente acompanhado e seus limites de coleta"""
+
+    def __init__(self, nome, url, prioridade=1, max_concorrencia=4, intervalo_horas=24, ativo=True):
+        if prioridade <= 0:
+            raise ValueError(f"Comitente {nome}: a prioridade precisa ser positiva")
+        if max_concorrencia < 1:
+            raise ValueError(f"Comitente {nome}: max_concorrencia precisa ser pelo menos 1")
+        self.nome = nome
+        self.url = url
+        # Peso no escalonador: prioridade 2 recebe o dobro das vagas da prioridade 1
+        self.prioridade = prioridade
+        # Unidades (agenda, leilões, lotes) do comitente em processamento ao mesmo tempo
+        self.max_concorrencia = max_concorrencia
+        # Intervalo mínimo entre duas coletas, em horas
+        self.intervalo_horas = intervalo_horas
+        self.ativo = ativo
+
+    @classmethod
+    def de_dict(cls, dados, padrao=padrao_comitente):
+        """Monta o comitente de uma entrada do arquivo, completando com os valores padrão"""
+        dados = {**padrao_comitente, **padrao, **dados}
+        nome = dados.get('nome')
+        if not nome:
+            raise ValueError(f"Comitente sem nome: {dados}")
+        url = dados.get('url')
+        if not url:
+            if not dados.get('comitente_id'):
+                raise ValueError(f"Comitente {nome}: informe 'url' ou 'comitente_id'")
+            url = url_agenda.format(comitente_id=dados['comitente_id'])
+        return cls(
+            nome, url, prioridade=dados['prioridade'], max_concorrencia=dados['max_concorrencia'],
+            intervalo_horas=dados['intervalo_horas'], ativo=dados['ativo']
+        )
+
+    def para_dict(self):
+        return {
+            'nome': self.nome,
+            'url': self.url,
+            'prioridade': self.prioridade,
+            'max_concorrencia': self.max_concorrencia,
+            'intervalo_horas': self.intervalo_horas,
+            'ativo': self.ativo,
+        }
+
+
+class RegistroComitentes:
+    """Comitentes do arquivo de configuração e a última coleta de cada um"""
+
+    def __init__(self, caminho=arquivo_comitentes, arquivo_coletas=arquivo_coletas):
+        self.caminho = caminho
+        self.arquivo_coletas = arquivo_coletas
+        self._lock = threading.Lock()
+        self._comitentes = self._carregar()
+        self._coletas = self._carregar_coletas()
+
+    def _carregar(self):
+        with open(self.caminho, 'r', encoding='utf-8') as f:
+            configuracao = json.load(f)
+        padrao = configuracao.get('padrao', {})
+        comitentes = {}
+        for dados in configuracao.get('comitentes', []):
+            comitente = Comitente.de_dict(dados, padrao)
+            if comitente.nome in comitentes:
+                raise ValueError(f"Comitente {comitente.nome} repetido em {self.caminho}")
+            comitentes[comitente.nome] = comitente
+        logger.info(f"🏛️  {len(comitentes)} comitentes carregados de {self.caminho}")
+        return comitentes
+
+    def _carregar_coletas(self):
+        try:
+            with open(self.arquivo_coletas, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _salvar_coletas(self):
+        diretorio = os.path.dirname(self.arquivo_coletas)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        temporario = f"{self.arquivo_coletas}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(self._coletas, f, indent=2)
+        os.replace(temporario, self.arquivo_coletas)
+
+    def __iter__(self):
+        """Comitentes ativos, na ordem do arquivo"""
+        return (comitente for comitente in self._comitentes.values() if comitente.ativo)
+
+    def __contains__(self, nome):
+        return nome in self._comitentes
+
+    def __len__(self):
+        return len(self._comitentes)
+
+    def obter(self, nome):
+        return self._comitentes.get(nome)
+
+    def nomes(self):
+        """Nomes dos comitentes ativos"""
+        return [comitente.nome for comitente in self]
+
+    def urls(self):
+        """Nome → URL da agenda de todos os comitentes, inclusive os inativos (PDFs antigos continuam deles)"""
+        return {nome: comitente.url for nome, comitente in self._comitentes.items()}
+
+    def ultima_coleta(self, nome):
+        with self._lock:
+            registrada = self._coletas.get(nome)
+        return datetime.fromisoformat(registrada) if registrada else None
+
+    def proxima_coleta(self, nome):
+        """Quando o intervalo do comitente vence; None se ele nunca foi coletado"""
+        ultima = self.ultima_coleta(nome)
+        if ultima is None:
+            return None
+        return ultima + timedelta(hours=self._comitentes[nome].intervalo_horas)
+
+    def devidos(self, agora=None, nunca_coletados=False):
+        """Comitentes ativos cujo intervalo desde a última coleta já passou
+
+        Os que nunca foram coletados só entram com `nunca_coletados`.
+        """
+        agora = agora or datetime.now()
+        devidos = []
+        for comitente in self:
+            proxima = self.proxima_coleta(comitente.nome)
+            if proxima is None:
+                if nunca_coletados:
+                    devidos.append(comitente)
+            elif proxima <= agora:
+                devidos.append(comitente)
+            else:
+                logger.debug(f"⏭️  {comitente.nome}: próxima coleta em {proxima.isoformat(timespec='minutes')}")
+        return devidos
+
+    def registrar_coleta(self, nomes, quando=None):
+        quando = (quando or datetime.now()).isoformat()
+        with self._lock:
+            for nome in nomes:
+                self._coletas[nome] = quando
+            self._salvar_coletas()
+
+    def para_dict(self, nome):
+        """Configuração do comitente com a última e a próxima coleta, para a API"""
+        ultima, proxima = self.ultima_coleta(nome), self.proxima_coleta(nome)
+        return {
+            **self._comitentes[nome].para_dict(),
+            'ultima_coleta': ultima and ultima.isoformat(),
+            'proxima_coleta': proxima and proxima.isoformat(),
+        }
+
+
+class EscalonadorComitentes:
+    """Fila das unidades a iniciar, repartida com justiça entre os comitentes
+
+    Cada comitente tem a própria pilha (um leilão e seus lotes terminam
+    antes de outro leilão dele começar). A próxima unidade vem do comitente
+    com vagas livres que menos recebeu até agora em proporção à prioridade
+    (stride scheduling): um comitente com milhares de lotes anda no mesmo
+    ritmo dos outros em vez de ocupar todos os workers. Um comitente que
+    volta a ter trabalho entra no ritmo atual, sem crédito acumulado.
+
+    Usado só pela thread que coordena o motor.
+    """
+
+    def __init__(self, comitentes=None):
+        self.comitentes = comitentes
+        self._pilhas = {}
+        self._passo = {}
+        self._tempo_virtual = 0.0
+        self._em_andamento = Counter()
+        # Unidades entregues por comitente, para o relatório do fim da execução
+        self.despachadas = Counter()
+
+    def _limites(self, banco):
+        comitente = self.comitentes.obter(banco) if self.comitentes else None
+        if comitente is None:
+            return padrao_comitente['prioridade'], padrao_comitente['max_concorrencia']
+        return comitente.prioridade, comitente.max_concorrencia
+
+    def adicionar(self, unidades):
+        """Empilha as unidades (tipo, url, banco); a primeira da lista é a próxima do seu comitente"""
+        for unidade in reversed(unidades):
+            banco = unidade[2]
+            pilha = self._pilhas.setdefault(banco, deque())
+            if not pilha and not self._em_andamento[banco]:
+                self._passo[banco] = max(self._passo.get(banco, 0.0), self._tempo_virtual)
+            pilha.append(unidade)
+
+    def proxima(self):
+        """Próxima unidade a iniciar, ou None se os comitentes com trabalho estão no limite de vagas"""
+        candidatos = [
+            banco for banco, pilha in self._pilhas.items()
+            if pilha and self._em_andamento[banco] < self._limites(banco)[1]
+        ]
+        if not candidatos:
+            return None
+        banco = min(candidatos, key=lambda banco: (self._passo[banco], banco))
+        prioridade, _ = self._limites(banco)
+        self._tempo_virtual = self._passo[banco]
+        self._passo[banco] += 1 / prioridade
+        self._em_andamento[banco] += 1
+        self.despachadas[banco] += 1
+        return self._pilhas[banco].pop()
+
+    def concluir(self, unidade):
+        """Libera a vaga do comitente da unidade"""
+        self._em_andamento[unidade[2]] -= 1
+
+    def __len__(self):
+        return sum(len(pilha) for pilha in self._pilhas.values())
+
+    def __bool__(self):
+        return any(self._pilhas.values())
+
+    def registrar_estatisticas(self):
+        for banco, quantidade in self.despachadas.most_common():
+            logger.info(f"⚖️  {banco}: {quantidade} unidades processadas")
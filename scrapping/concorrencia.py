@@ -0,0 +1,32 @@
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+# Limites padrão do motor concorrente
+concorrencia_global = 8
+concorrencia_por_host = 4
+
+
+class LimitadorConcorrencia:
+    """Limita requisições simultâneas no total e por host"""
+
+    def __init__(self, max_global=concorrencia_global, max_por_host=concorrencia_por_host):
+        self.max_global = max_global
+        self.max_por_host = max_por_host
+        self._global = threading.BoundedSemaphore(max_global)
+        self._por_host = {}
+        self._lock = threading.Lock()
+
+    def _semaforo_host(self, host):
+        with self._lock:
+            if host not in self._por_host:
+                self._por_host[host] = threading.BoundedSemaphore(self.max_por_host)
+            return self._por_host[host]
+
+    @contextmanager
+    def slot(self, url):
+        """Reserva uma vaga global e uma vaga do host da URL"""
+        semaforo_host = self._semaforo_host(urlparse(url).netloc)
+        with self._global:
+            with semaforo_host:
+                yield
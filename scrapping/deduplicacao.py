@@ -0,0 +1,200 @@
+"""
+Deduplicação de links: URL canônica, impressão de 64 bits e conjuntos compactos
+
+O mesmo lote aparece com a query em outra ordem, parâmetros de rastreamento,
+barra no fim ou `/detalhe/` no lugar de `/detalhes/`. canonizar_url reduz as
+variantes a uma forma só, e impressao_url a resume em um inteiro de 64 bits:
+o scraper guarda as impressões, não as URLs. ConjuntoImpressoes é exato e
+ocupa cerca de 8 bytes por link; FiltroBloom tem memória fixa, pode ser salvo
+em disco e, em troca, descarta uma fração pequena (`taxa_falsos_positivos`) de
+links nunca vistos.
+"""
+
+import hashlib
+import heapq
+import logging
+import math
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from urllib.parse import parse_qsl, quote, unquote, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+arquivo_bloom = os.path.join('dados', 'links_vistos.bloom')
+
+# Parâmetros que só identificam a origem da visita, não a página
+parametros_rastreamento = frozenset(('fbclid', 'gclid', 'msclkid', 'mc_cid', 'mc_eid', '_ga', '_gl'))
+prefixos_rastreamento = ('utm_',)
+
+# Segmentos de caminho que o site aceita com outro nome para a mesma página
+aliases_segmentos = {'detalhe': 'detalhes'}
+
+portas_padrao = {'http': 80, 'https': 443}
+
+# Caracteres que ficam literais no caminho; o resto é codificado em %XX maiúsculo
+caracteres_caminho = "/:@!$&'()*+,;=-._~"
+
+
+def canonizar_url(url):
+    """Forma canônica da URL, usada só para comparar links (a requisição usa a URL original)
+
+    Esquema e host em minúsculas, sem porta padrão nem fragmento; caminho com
+    a codificação normalizada, sem barras repetidas ou final e com os aliases
+    de `aliases_segmentos`; query sem parâmetros de rastreamento, em ordem.
+    """
+    partes = urlsplit(url.strip())
+    esquema = partes.scheme.lower()
+
+    host = (partes.hostname or '').lower()
+    if partes.port and partes.port != portas_padrao.get(esquema):
+        host = f"{host}:{partes.port}"
+    if partes.username:
+        host = f"{partes.username}@{host}"
+
+    segmentos = [segmento for segmento in unquote(partes.path).split('/') if segmento]
+    caminho = '/' + '/'.join(aliases_segmentos.get(segmento, segmento) for segmento in segmentos)
+
+    parametros = sorted(
+        (chave, valor) for chave, valor in parse_qsl(partes.query, keep_blank_values=True)
+        if chave.lower() not in parametros_rastreamento and not chave.lower().startswith(prefixos_rastreamento)
+    )
+    return urlunsplit((esquema, host, quote(caminho, safe=caracteres_caminho), urlencode(parametros), ''))
+
+
+def impressao_url(url):
+    """Impressão de 64 bits da URL canônica; colisões são desprezíveis até bilhões de links"""
+    digest = hashlib.blake2b(canonizar_url(url).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+class ConjuntoImpressoes:
+    """Conjunto exato de impressões de 64 bits, num array ordenado
+
+    As impressões novas ficam num set pequeno e são fundidas ao array quando
+    ele passa de 1/8 do array (ou de `limite_recentes`): a memória fica perto
+    de 8 bytes por link, contra uma centena de uma URL num set. Não é
+    thread-safe; o scraper o usa sob o próprio lock.
+    """
+
+    def __init__(self, limite_recentes=4096):
+        self.limite_recentes = limite_recentes
+        self._ordenadas = array('Q')
+        self._recentes = set()
+
+    def __contains__(self, impressao):
+        if impressao in self._recentes:
+            return True
+        posicao = bisect_left(self._ordenadas, impressao)
+        return posicao < len(self._ordenadas) and self._ordenadas[posicao] == impressao
+
+    def __len__(self):
+        return len(self._ordenadas) + len(self._recentes)
+
+    def adicionar(self, impressao):
+        """Inclui a impressão; retorna False se ela já estava no conjunto"""
+        if impressao in self:
+            return False
+        self._recentes.add(impressao)
+        if len(self._recentes) >= max(self.limite_recentes, len(self._ordenadas) // 8):
+            self._fundir()
+        return True
+
+    def _fundir(self):
+        self._ordenadas = array('Q', heapq.merge(self._ordenadas, sorted(self._recentes)))
+        self._recentes.clear()
+
+    def limpar(self):
+        self._ordenadas = array('Q')
+        self._recentes.clear()
+
+    def memoria(self):
+        """Bytes ocupados pelo array e pelo set de recentes (sem os inteiros do set)"""
+        return self._ordenadas.buffer_info()[1] * self._ordenadas.itemsize + sys.getsizeof(self._recentes)
+
+
+class FiltroBloom:
+    """Filtro de Bloom sobre as impressões, com memória fixa e salvo em disco
+
+    Dimensionado por `capacidade` e `taxa_falsos_positivos`: 10 milhões de
+    links a 0,1% ocupam cerca de 17 MiB. Um falso positivo faz o scraper
+    tratar um link novo como visto. O arquivo guarda os parâmetros; um arquivo
+    de outro tamanho é ignorado. Ele serve para retomar a mesma coleta: limpar()
+    o apaga, e o scraper limpa o filtro em toda execução sem `retomar`.
+    """
+
+    cabecalho = struct.Struct('<4sQQI')
+    assinatura = b'BLM1'
+
+    def __init__(self, capacidade=10_000_000, taxa_falsos_positivos=0.001, caminho=None):
+        self.capacidade = capacidade
+        self.taxa_falsos_positivos = taxa_falsos_positivos
+        self.caminho = caminho
+        self.total_bits = max(8, math.ceil(-capacidade * math.log(taxa_falsos_positivos) / math.log(2) ** 2))
+        self.funcoes = max(1, round(self.total_bits / capacidade * math.log(2)))
+        self._bits = bytearray((self.total_bits + 7) // 8)
+        self._itens = 0
+        if caminho:
+            self.carregar()
+
+    def _posicoes(self, impressao):
+        # Hash duplo (Kirsch-Mitzenmacher): a segunda função sai da própria impressão, misturada
+        segundo = ((impressao ^ (impressao >> 31)) * 0x9E3779B97F4A7C15 & 0xFFFFFFFFFFFFFFFF) | 1
+        return [(impressao + i * segundo) % self.total_bits for i in range(self.funcoes)]
+
+    def __contains__(self, impressao):
+        return all(self._bits[posicao >> 3] & (1 << (posicao & 7)) for posicao in self._posicoes(impressao))
+
+    def __len__(self):
+        """Impressões incluídas (as descartadas como falso positivo não contam)"""
+        return self._itens
+
+    def adicionar(self, impressao):
+        """Inclui a impressão; retorna False se ela já estava (ou parecia estar) no filtro"""
+        nova = False
+        for posicao in self._posicoes(impressao):
+            byte, bit = posicao >> 3, 1 << (posicao & 7)
+            if not self._bits[byte] & bit:
+                self._bits[byte] |= bit
+                nova = True
+        if nova:
+            self._itens += 1
+        return nova
+
+    def limpar(self):
+        self._bits = bytearray(len(self._bits))
+        self._itens = 0
+        if self.caminho and os.path.exists(self.caminho):
+            os.remove(self.caminho)
+
+    def memoria(self):
+        return len(self._bits)
+
+    def carregar(self):
+        try:
+            with open(self.caminho, 'rb') as f:
+                assinatura, total_bits, itens, funcoes = self.cabecalho.unpack(f.read(self.cabecalho.size))
+                bits = f.read()
+        except (OSError, struct.error):
+            return
+        if assinatura != self.assinatura or total_bits != self.total_bits or funcoes != self.funcoes \
+                or len(bits) != len(self._bits):
+            logger.warning(f"⚠️  Filtro de links em {self.caminho} tem outro tamanho; começando vazio")
+            return
+        self._bits = bytearray(bits)
+        self._itens = itens
+        logger.info(f"🔗 Filtro de links carregado de {self.caminho} ({itens} links)")
+
+    def salvar(self):
+        if not self.caminho:
+            return
+        diretorio = os.path.dirname(self.caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        temporario = f"{self.caminho}.{os.getpid()}.tmp"
+        with open(temporario, 'wb') as f:
+            f.write(self.cabecalho.pack(self.assinatura, self.total_bits, self._itens, self.funcoes))
+            f.write(self._bits)
+        os.replace(temporario, self.caminho)
@@ -0,0 +1,273 @@
+"""
+Coleta distribuída: trabalhadores em vários processos reivindicando unidades da fronteira
+
+A fronteira (FronteiraCrawl) é a fila compartilhada. Cada trabalhador
+reserva unidades por `lease` segundos, renova as reservas com batimentos
+enquanto as processa e devolve as que falham; se o processo morre, as
+reservas vencem e outro trabalhador retoma as unidades. Com a fronteira em
+SQLite os trabalhadores precisam estar no mesmo host; outra implementação de
+FilaTrabalho (um broker de rede) leva os mesmos trabalhadores para outras
+máquinas.
+
+Os trabalhadores iniciados pelo scraper (executar_trabalhadores_locais)
+relatam eventos, progresso, métricas e spans ao processo principal por uma
+fila, para o SSE, o /metrics e o rastro do job mostrarem a coleta inteira.
+
+Uso, com trabalhadores iniciados à mão (em terminais ou hosts diferentes):
+    python -m scrapping.distribuicao semear
+    python -m scrapping.distribuicao trabalhar --max-workers 4 --dividir-taxa 3
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+
+from scrapping import metricas
+from scrapping.fronteira import FronteiraCrawl, arquivo_fronteira, duracao_lease
+from scrapping.limitador import LimitadorTaxa
+from scrapping.rastreamento import Rastreador
+
+logger = logging.getLogger(__name__)
+
+# Espera (segundos) entre consultas à fila quando não há unidade livre
+intervalo_consulta = 1.0
+
+# Intervalo (segundos) entre os relatos de progresso e métricas de um trabalhador ao processo principal
+intervalo_relato = 1.0
+
+
+def identificador_trabalhador():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class TrabalhadorDistribuido:
+    """Processa unidades reivindicadas da fila até ela esvaziar
+
+    Roda até `max_workers` unidades ao mesmo tempo com o scraper dado; uma
+    thread de batimentos renova as reservas a cada terço do `lease`. O
+    trabalhador termina quando não há unidades pendentes nem reservadas em
+    nenhum trabalhador (uma reserva em andamento ainda pode gerar filhas).
+    """
+
+    def __init__(self, scraper, fila=None, max_workers=4, lease=duracao_lease, limites=None, identificador=None):
+        self.scraper = scraper
+        self.fila = fila or scraper.fronteira
+        self.max_workers = max_workers
+        self.lease = lease
+        # banco → (prioridade, max_concorrencia), somando todos os trabalhadores
+        self.limites = limites
+        self.id = identificador or identificador_trabalhador()
+        self.processadas = 0
+        self._parar = threading.Event()
+
+    def _batimentos(self):
+        while not self._parar.wait(self.lease / 3):
+            self.fila.renovar(self.id, self.lease)
+
+    def executar(self):
+        """Processa unidades até a fila esvaziar; retorna os PDFs baixados por este trabalhador"""
+        logger.info(f"👷 Trabalhador {self.id} iniciado ({self.max_workers} workers, reservas de {self.lease}s)")
+        batimentos = threading.Thread(target=self._batimentos, name=f"batimentos-{self.id}", daemon=True)
+        batimentos.start()
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                em_execucao = {}
+                while True:
+                    vagas = self.max_workers - len(em_execucao)
+                    if vagas:
+                        for unidade in self.fila.reivindicar(self.id, vagas, self.lease, self.limites):
+                            em_execucao[executor.submit(self.scraper.processar_unidade, *unidade)] = unidade
+
+                    if not em_execucao:
+                        if not self.fila.ativas():
+                            break
+                        time.sleep(intervalo_consulta)
+                        continue
+
+                    concluidos, _ = wait(em_execucao, timeout=intervalo_consulta, return_when=FIRST_COMPLETED)
+                    for futuro in concluidos:
+                        _, url, _ = em_execucao.pop(futuro)
+                        self.processadas += 1
+                        erro = futuro.exception()
+                        if erro:
+                            logger.error(f"❌ Erro ao processar {url}: {erro}")
+                            self.fila.liberar(url, self.id, erro)
+        finally:
+            self._parar.set()
+            # Interrompido (Ctrl+C, erro): o que ficou reservado volta para a fila na hora
+            self.fila.liberar_todas(self.id)
+
+        logger.info(
+            f"🏁 Trabalhador {self.id}: {self.processadas} unidades, {len(self.scraper.pdfs_baixados)} PDFs baixados"
+        )
+        return self.scraper.pdfs_baixados
+
+
+class RelatorTrabalhador:
+    """Leva ao processo principal o andamento de um trabalhador em outro processo
+
+    Faz o papel do BarramentoEventos no scraper do trabalhador: cada evento
+    vai na hora para a fila de relatos. O progresso e as métricas vão como
+    diferenças a cada `intervalo`, e os spans (com rastreamento) no fim.
+    """
+
+    def __init__(self, fila, intervalo=intervalo_relato):
+        self.fila = fila
+        self.intervalo = intervalo
+        self.scraper = None
+        self._progresso = {}
+        self._metricas = {}
+        self._parar = threading.Event()
+        self._thread = None
+
+    def publicar(self, tipo, **dados):
+        self.fila.put(('evento', tipo, dados))
+
+    def acompanhar(self, scraper):
+        self.scraper = scraper
+        self._progresso = dict(scraper.progresso)
+        self._metricas = metricas.registro.instantaneo()
+        self._thread = threading.Thread(target=self._executar, name='relator-trabalhador', daemon=True)
+        self._thread.start()
+
+    def _executar(self):
+        while not self._parar.wait(self.intervalo):
+            self.relatar_andamento()
+
+    def relatar_andamento(self):
+        progresso = dict(self.scraper.progresso)
+        diferencas = {
+            campo: valor - self._progresso.get(campo, 0) for campo, valor in progresso.items()
+            if valor != self._progresso.get(campo, 0)
+        }
+        instantaneo = metricas.registro.instantaneo()
+        mudancas = metricas.registro.diferenca(instantaneo, self._metricas)
+        self._progresso, self._metricas = progresso, instantaneo
+        if diferencas or mudancas:
+            self.fila.put(('andamento', diferencas, mudancas))
+
+    def encerrar(self):
+        self._parar.set()
+        if self._thread:
+            self._thread.join()
+        self.relatar_andamento()
+        rastreador = self.scraper.rastreador
+        if isinstance(rastreador, Rastreador):
+            self.fila.put(('rastro', rastreador.exportar_chrome()['traceEvents'], rastreador.inicio_epoch))
+
+
+def aplicar_relatos(fila, scraper):
+    """Repassa ao scraper principal os relatos dos trabalhadores, até receber None"""
+    while True:
+        relato = fila.get()
+        if relato is None:
+            return
+        try:
+            if relato[0] == 'evento':
+                scraper.emitir(relato[1], **relato[2])
+            elif relato[0] == 'andamento':
+                for campo, quantidade in relato[1].items():
+                    scraper.contar(campo, quantidade)
+                metricas.registro.somar(relato[2])
+            elif relato[0] == 'rastro':
+                scraper.rastreador.importar(relato[1], relato[2])
+        except Exception as e:
+            logger.warning(f"⚠️  Relato de trabalhador ignorado ({relato[0]}): {e}")
+
+
+def executar_trabalhador(caminho_fronteira=arquivo_fronteira, max_workers=4, lease=duracao_lease, limites=None,
+                         opcoes=None, relatos=None):
+    """Ponto de entrada de um processo trabalhador
+
+    `opcoes` vão para o LeilaoVipScraper; 'limitador_taxa' vem como os
+    parâmetros do limitador (LimitadorTaxa.dividir) e 'rastreador' como um
+    booleano, porque os objetos não atravessam processos. Com a fila
+    `relatos`, o andamento vai para o processo principal (RelatorTrabalhador).
+    """
+    from scrapping.vip import LeilaoVipScraper
+
+    opcoes = dict(opcoes or {})
+    if opcoes.get('limitador_taxa'):
+        opcoes['limitador_taxa'] = LimitadorTaxa(**opcoes['limitador_taxa'])
+    opcoes['rastreador'] = Rastreador() if opcoes.get('rastreador') else None
+    relator = RelatorTrabalhador(relatos) if relatos is not None else None
+    scraper = LeilaoVipScraper(
+        max_workers=max_workers, fronteira=FronteiraCrawl(caminho_fronteira), eventos=relator, **opcoes
+    )
+    trabalhador = TrabalhadorDistribuido(scraper, max_workers=max_workers, lease=lease, limites=limites)
+    if relator is None:
+        return trabalhador.executar()
+    relator.acompanhar(scraper)
+    try:
+        return trabalhador.executar()
+    finally:
+        relator.encerrar()
+
+
+def executar_trabalhadores_locais(quantidade, caminho_fronteira=arquivo_fronteira, max_workers=4, lease=duracao_lease,
+                                  limites=None, opcoes=None, scraper=None):
+    """Inicia `quantidade` processos trabalhadores na fronteira já semeada e junta os PDFs de todos
+
+    Com `scraper`, os eventos, o progresso, as métricas e os spans dos
+    trabalhadores chegam a ele (e ao registro de métricas deste processo)
+    enquanto a coleta anda.
+    """
+    # spawn: processos novos, sem herdar locks das threads em execução
+    contexto = multiprocessing.get_context('spawn')
+    with contexto.Manager() if scraper is not None else nullcontext() as gerenciador:
+        relatos = gerenciador.Queue() if gerenciador is not None else None
+        if relatos is not None:
+            receptor = threading.Thread(target=aplicar_relatos, args=(relatos, scraper), name='relatos', daemon=True)
+            receptor.start()
+        try:
+            with ProcessPoolExecutor(quantidade, mp_context=contexto) as executor:
+                futuros = [
+                    executor.submit(executar_trabalhador, caminho_fronteira, max_workers, lease, limites, opcoes, relatos)
+                    for _ in range(quantidade)
+                ]
+                return [pdf for futuro in futuros for pdf in futuro.result()]
+        finally:
+            if relatos is not None:
+                relatos.put(None)
+                receptor.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coleta distribuída do LeilaoVip sobre a fronteira compartilhada")
+    parser.add_argument('comando', choices=['semear', 'trabalhar'])
+    parser.add_argument('--fronteira', default=arquivo_fronteira, help="Arquivo SQLite da fronteira")
+    parser.add_argument('--bancos', nargs='*', help="semear: comitentes a coletar (padrão: todos os ativos)")
+    parser.add_argument('--retomar', action='store_true', help="semear: mantém o que ficou da coleta anterior")
+    parser.add_argument('--max-workers', type=int, default=4, help="trabalhar: unidades simultâneas")
+    parser.add_argument('--lease', type=float, default=duracao_lease, help="trabalhar: duração das reservas (s)")
+    parser.add_argument(
+        '--dividir-taxa', type=int, default=1, metavar='N',
+        help="trabalhar: usa 1/N da taxa por host (N = trabalhadores no total)"
+    )
+    args = parser.parse_args()
+
+    from scrapping.vip import LeilaoVipScraper
+
+    scraper = LeilaoVipScraper(
+        max_workers=args.max_workers, fronteira=FronteiraCrawl(args.fronteira), retomar=args.retomar, bancos=args.bancos,
+        limitador_taxa=LimitadorTaxa(**LimitadorTaxa().dividir(args.dividir_taxa))
+    )
+    if args.comando == 'semear':
+        unidades = scraper.unidades_iniciais()
+        logger.info(f"🌱 Fronteira semeada com {len(unidades)} unidades: {', '.join(scraper.bancos_execucao)}")
+    else:
+        TrabalhadorDistribuido(
+            scraper, max_workers=args.max_workers, lease=args.lease, limites=scraper.limites_comitentes()
+        ).executar()
+        # Os comitentes vêm da fronteira: quem semeou não sabe se a listagem vai dar certo
+        scraper.comitentes.registrar_coleta(scraper.fronteira.bancos_concluidos())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import hashlib
+import logging
+import os
+
+import requests
+
+from scrapping.transporte import CircuitoAbertoError
+
+logger = logging.getLogger(__name__)
+
+tamanho_chunk = 64 * 1024
+
+
+class DownloadIncompletoError(Exception):
+    """O arquivo recebido não bate com o tamanho anunciado pelo servidor"""
+
+
+def tamanho_total(response, inicio):
+    """Tamanho final do arquivo segundo Content-Range (206) ou Content-Length (200)"""
+    if response.status_code == 206:
+        content_range = response.headers.get('Content-Range', '')
+        total = content_range.rsplit('/', 1)[-1]
+        return int(total) if total.isdigit() else None
+
+    content_length = response.headers.get('Content-Length')
+    return int(content_length) if content_length and content_length.isdigit() else None
+
+
+def hash_do_parcial(parcial):
+    """SHA-256 dos bytes já gravados, para continuar o hash ao retomar"""
+    hash_sha256 = hashlib.sha256()
+    with open(parcial, 'rb') as f:
+        for chunk in iter(lambda: f.read(tamanho_chunk), b''):
+            hash_sha256.update(chunk)
+    return hash_sha256
+
+
+def baixar_arquivo(session, url, destino, tentativas=3):
+    """Baixa `url` em streaming para `destino`, com retomada e escrita atômica
+
+    Os bytes vão para `destino + '.part'`; se esse arquivo já existe (de uma
+    execução interrompida) o download continua com um header Range. O arquivo
+    só é renomeado para `destino` depois de conferido com o tamanho anunciado.
+    O SHA-256 é calculado durante o streaming.
+    Retorna (tamanho_em_bytes, content_type, sha256).
+    """
+    parcial = destino + '.part'
+    os.makedirs(os.path.dirname(destino) or '.', exist_ok=True)
+
+    for tentativa in range(1, tentativas + 1):
+        inicio = os.path.getsize(parcial) if os.path.exists(parcial) else 0
+        # Sem compressão, para o Content-Length corresponder aos bytes gravados
+        headers = {'Accept-Encoding': 'identity'}
+        if inicio:
+            headers['Range'] = f'bytes={inicio}-'
+            logger.info(f"↩️  Retomando download a partir de {inicio} bytes: {url}")
+
+        try:
+            with session.get(url, headers=headers, stream=True) as response:
+                if response.status_code == 416:
+                    # O parcial não corresponde mais ao arquivo remoto; recomeça do zero
+                    os.remove(parcial)
+                    continue
+                response.raise_for_status()
+
+                content_type = response.headers.get('Content-Type', '')
+                total = tamanho_total(response, inicio)
+                modo = 'ab' if response.status_code == 206 else 'wb'
+                hash_sha256 = hash_do_parcial(parcial) if modo == 'ab' else hashlib.sha256()
+
+                with open(parcial, modo) as f:
+                    for chunk in response.iter_content(chunk_size=tamanho_chunk):
+                        hash_sha256.update(chunk)
+                        f.write(chunk)
+                    f.flush()
+                    os.fsync(f.fileno())
+
+        except CircuitoAbertoError:
+            raise
+        except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+            logger.warning(f"⚠️  Download interrompido ({tentativa}/{tentativas}) {url}: {e}")
+            continue
+
+        tamanho = os.path.getsize(parcial)
+        if total is not None and tamanho < total:
+            logger.warning(f"⚠️  Download incompleto ({tamanho}/{total} bytes), retomando: {url}")
+            continue
+        if total is not None and tamanho > total:
+            os.remove(parcial)
+            raise DownloadIncompletoError(f"{url}: {tamanho} bytes recebidos, {total} esperados")
+
+        os.replace(parcial, destino)
+        return tamanho, content_type, hash_sha256.hexdigest()
+
+    raise DownloadIncompletoError(f"{url}: download não concluído após {tentativas} tentativas")
@@ -0,0 +1,89 @@
+import json
+import logging
+import os
+import threading
+import time
+
+from scrapping import metricas
+
+logger = logging.getLogger(__name__)
+
+arquivo_estrategias = os.path.join('dados', 'estrategias_listagem.json')
+
+# Sem acertos por esse tempo (segundos), a ordem padrão das estratégias volta a ser testada
+ttl_estrategias = 7 * 24 * 3600
+
+
+class MemoriaEstrategias:
+    """Estratégia de listagem que funcionou por host/comitente, persistida com TTL
+
+    Junto com o nome da estratégia fica quantas requisições as alternativas
+    anteriores a ela gastaram na descoberta; é o que se economiza a cada vez
+    que a estratégia memorizada acerta de primeira.
+    """
+
+    def __init__(self, caminho=arquivo_estrategias, ttl=ttl_estrategias):
+        self.caminho = caminho
+        self.ttl = ttl
+        self.estatisticas = {'acertos': 0, 'erros': 0, 'requisicoes_economizadas': 0}
+        self._lock = threading.Lock()
+        self._entradas = self._carregar()
+
+    def _carregar(self):
+        try:
+            with open(self.caminho, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _salvar(self):
+        diretorio = os.path.dirname(self.caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        temporario = f"{self.caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(self._entradas, f, indent=2)
+        os.replace(temporario, self.caminho)
+
+    def preferida(self, chave):
+        """Nome da estratégia memorizada para a chave, ou None se não houver ou tiver expirado"""
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada and time.time() - entrada['registrada_em'] < self.ttl:
+                return entrada['estrategia']
+            return None
+
+    def registrar(self, chave, estrategia, requisicoes_alternativas=0):
+        with self._lock:
+            self._entradas[chave] = {
+                'estrategia': estrategia,
+                'registrada_em': time.time(),
+                'requisicoes_alternativas': requisicoes_alternativas,
+            }
+            self._salvar()
+        logger.info(f"🧠 Estratégia memorizada para {chave}: {estrategia}")
+
+    def acertou(self, chave):
+        """A estratégia memorizada funcionou de primeira; retorna as requisições economizadas
+
+        O acerto renova o TTL: só expira a estratégia que deixou de ser confirmada.
+        """
+        with self._lock:
+            entrada = self._entradas.get(chave, {})
+            economizadas = entrada.get('requisicoes_alternativas', 0)
+            self.estatisticas['acertos'] += 1
+            self.estatisticas['requisicoes_economizadas'] += economizadas
+            if entrada:
+                entrada['registrada_em'] = time.time()
+                self._salvar()
+        # A chave é "host|id do comitente" (LeilaoVipScraper.extrair_cards_leiloes)
+        host, _, comitente = chave.partition('|')
+        metricas.requisicoes_economizadas.inc(economizadas, host=host, comitente=comitente)
+        return economizadas
+
+    def errou(self, chave):
+        """A estratégia memorizada não trouxe resultados; a chave é esquecida"""
+        with self._lock:
+            self.estatisticas['erros'] += 1
+            if self._entradas.pop(chave, None) is not None:
+                self._salvar()
@@ -0,0 +1,85 @@
+import asyncio
+import json
+import threading
+from collections import deque
+from datetime import datetime
+
+# Eventos guardados por execução, para clientes que conectam no meio do scraping
+max_eventos_historico = 10000
+
+
+class BarramentoEventos:
+    """Eventos estruturados de uma execução do scraper
+
+    O scraper publica de qualquer thread; os consumidores leem a partir de um
+    número de sequência e esperam pelos próximos: em uma thread (aguardar) ou
+    no event loop, sem ocupar thread nenhuma (aguardar_async, usado pelo
+    endpoint SSE da API).
+    """
+
+    def __init__(self, max_historico=max_eventos_historico):
+        self._eventos = deque(maxlen=max_historico)
+        self._sequencia = 0
+        self._condicao = threading.Condition()
+        # (loop, asyncio.Event) dos consumidores assíncronos esperando o próximo evento
+        self._assinantes = set()
+        self.encerrado = False
+
+    def publicar(self, tipo, **dados):
+        with self._condicao:
+            self._sequencia += 1
+            evento = {'seq': self._sequencia, 'tipo': tipo, 'timestamp': datetime.now().isoformat(), **dados}
+            self._eventos.append(evento)
+            self._notificar()
+        return evento
+
+    def _notificar(self):
+        """Acorda as threads e os consumidores assíncronos; chamado com a condição adquirida"""
+        self._condicao.notify_all()
+        for loop, sinal in self._assinantes:
+            try:
+                loop.call_soon_threadsafe(sinal.set)
+            except RuntimeError:
+                pass  # Loop já fechado: o consumidor foi embora
+
+    def encerrar(self):
+        """Marca o fim da execução; consumidores saem depois do último evento"""
+        with self._condicao:
+            self.encerrado = True
+            self._notificar()
+
+    def eventos_desde(self, seq=0):
+        with self._condicao:
+            return [evento for evento in self._eventos if evento['seq'] > seq]
+
+    def aguardar(self, seq=0, timeout=None):
+        """Eventos posteriores a `seq`, esperando até `timeout` se ainda não houver
+
+        Retorna lista vazia no timeout ou quando a execução já terminou.
+        """
+        with self._condicao:
+            self._condicao.wait_for(lambda: self._sequencia > seq or self.encerrado, timeout)
+            return [evento for evento in self._eventos if evento['seq'] > seq]
+
+    async def aguardar_async(self, seq=0, timeout=None):
+        """Como aguardar, mas esperando no event loop em vez de bloquear uma thread"""
+        sinal = asyncio.Event()
+        assinatura = (asyncio.get_running_loop(), sinal)
+        with self._condicao:
+            if self._sequencia > seq or self.encerrado:
+                return [evento for evento in self._eventos if evento['seq'] > seq]
+            self._assinantes.add(assinatura)
+        try:
+            await asyncio.wait_for(sinal.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._condicao:
+                self._assinantes.discard(assinatura)
+        return self.eventos_desde(seq)
+
+
+def formatar_sse(evento):
+    """Serializa o evento no formato Server-Sent Events"""
+    dados = json.dumps(evento, ensure_ascii=False)
+    return f"id: {evento['seq']}\nevent: {evento['tipo']}\ndata: {dados}\n\n"
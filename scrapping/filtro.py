@@ -0,0 +1,60 @@
+import html
+import re
+import unicodedata
+
+# Trechos que o get_text() do BeautifulSoup não considera texto da página
+re_invisiveis = re.compile(r'<!--.*?-->|<(script|style|template)\b[^>]*>.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+re_tags = re.compile(r'<[^>]*>')
+
+
+def normalizar(texto):
+    """Minúsculas e sem acentos, para comparar 'Extrajudicial' com 'EXTRAJUDICIAL' ou 'extrajudícial'"""
+    if not texto.isascii():
+        # NFKD separa os acentos das letras; o encode descarta os acentos
+        texto = unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('ascii')
+    return texto.lower()
+
+
+def decodificar(conteudo, encoding=None):
+    """UTF-8 quando válido; senão o encoding declarado (ou latin-1)"""
+    try:
+        return conteudo.decode('utf-8')
+    except UnicodeDecodeError:
+        return conteudo.decode(encoding or 'latin-1', errors='replace')
+
+
+class FiltroPalavrasChave:
+    """Filtro de palavras-chave aplicado nos bytes da página, antes do parsing
+
+    `modo` 'ou' aceita a página com qualquer uma das palavras; 'e' exige todas.
+    A comparação ignora caixa, acentos e entidades HTML.
+    """
+
+    def __init__(self, palavras, modo='ou'):
+        if modo not in ('ou', 'e'):
+            raise ValueError(f"Modo '{modo}' inválido. Use 'ou' ou 'e'")
+        self.palavras = list(palavras)
+        self.modo = modo
+        self._normalizadas = [normalizar(palavra) for palavra in self.palavras]
+
+    def descricao(self):
+        separador = ' E ' if self.modo == 'e' else ' OU '
+        return separador.join(f"'{palavra}'" for palavra in self.palavras)
+
+    def verificar_texto(self, texto):
+        """Aplica o filtro a um texto já extraído"""
+        texto = normalizar(texto)
+        encontradas = (palavra in texto for palavra in self._normalizadas)
+        return all(encontradas) if self.modo == 'e' else any(encontradas)
+
+    def verificar_bytes(self, conteudo, encoding=None):
+        """Aplica o filtro ao HTML bruto, sem montar a árvore
+
+        Tags, comentários e scripts são removidos por regex, o que deixa o
+        mesmo texto que o get_text() do BeautifulSoup por uma fração do custo.
+        """
+        texto = decodificar(conteudo, encoding)
+        visivel = re_tags.sub('', re_invisiveis.sub('', texto))
+        if '&' in visivel:
+            visivel = html.unescape(visivel)
+        return self.verificar_texto(visivel)
@@ -0,0 +1,328 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+arquivo_fronteira = os.path.join('dados', 'fronteira.sqlite3')
+
+# Falhas com menos tentativas que isso voltam para a fila ao retomar (ou ao reivindicar, após a espera)
+max_tentativas = 3
+
+# Espera (segundos) antes de um trabalhador repetir uma falha; dobra a cada tentativa gasta
+espera_repeticao = 10
+
+estados = ('pendente', 'em_andamento', 'concluido', 'falhou')
+
+# Duração padrão (segundos) da reserva de uma unidade por um trabalhador, renovada pelos batimentos
+duracao_lease = 60
+
+
+class FilaTrabalho(ABC):
+    """Interface da fila de unidades compartilhada pelos trabalhadores distribuídos
+
+    Além das operações da fronteira usadas pelo scraper (adicionar, iniciar,
+    concluir, falhar), a fila empresta unidades por tempo limitado: quem
+    reivindica renova a reserva com batimentos e, se morrer, a unidade volta
+    para a fila quando a reserva vence. A FronteiraCrawl implementa a fila em
+    SQLite, para trabalhadores no mesmo host; um broker de rede (Redis, um
+    serviço HTTP) implementa os mesmos métodos.
+    """
+
+    @abstractmethod
+    def adicionar(self, url, tipo, banco, origem=None):
+        pass
+
+    @abstractmethod
+    def iniciar(self, url):
+        pass
+
+    @abstractmethod
+    def concluir(self, url):
+        pass
+
+    @abstractmethod
+    def falhar(self, url, erro):
+        pass
+
+    @abstractmethod
+    def reivindicar(self, trabalhador, quantidade=1, lease=duracao_lease, limites=None):
+        """Reserva até `quantidade` unidades pendentes; retorna [(tipo, url, banco)]
+
+        `limites` mapeia banco → (prioridade, max_concorrencia), respeitados
+        somando as reservas de todos os trabalhadores. Falhas com tentativas
+        restantes voltam a ser reservadas depois de uma espera.
+        """
+
+    @abstractmethod
+    def renovar(self, trabalhador, lease=duracao_lease):
+        """Batimento: estende as reservas em andamento do trabalhador"""
+
+    @abstractmethod
+    def liberar(self, url, trabalhador, erro=None):
+        """Devolve a unidade à fila (ou a marca como falha, sem tentativas restantes)"""
+
+    @abstractmethod
+    def liberar_todas(self, trabalhador):
+        """Devolve à fila tudo o que o trabalhador ainda tem reservado, ao encerrar"""
+
+    @abstractmethod
+    def ativas(self):
+        """Unidades pendentes, reservadas ou falhas a repetir; zero quando a coleta acabou"""
+
+    @abstractmethod
+    def bancos_concluidos(self):
+        """Bancos cuja listagem de leilões terminou sem falha"""
+
+    @abstractmethod
+    def estado(self, url):
+        """Estado da URL na fronteira, ou None se ela não foi registrada"""
+
+
+class FronteiraCrawl(FilaTrabalho):
+    """Fronteira do crawl em SQLite: URLs descobertas e o estado de cada uma
+
+    Cada unidade (página de banco, leilão ou lote) passa por pendente →
+    em_andamento → concluido/falhou. Os filhos são gravados antes do pai ser
+    concluído, então uma execução interrompida pode ser retomada sem perder
+    nem repetir trabalho concluído.
+
+    Também serve de fila para trabalhadores em vários processos do mesmo
+    host (scrapping/distribuicao.py): cada reserva grava o dono e o prazo
+    (`lease_ate`) na linha, dentro de uma transação IMMEDIATE.
+    """
+
+    def __init__(self, caminho=arquivo_fronteira):
+        self.caminho = caminho
+        diretorio = os.path.dirname(caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        # Outros processos podem estar escrevendo; espera o lock em vez de falhar
+        self._conexao = sqlite3.connect(caminho, timeout=30, check_same_thread=False)
+        self._conexao.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conexao:
+            self._conexao.execute("PRAGMA journal_mode=WAL")
+            self._conexao.execute("""
+                CREATE TABLE IF NOT EXISTS urls (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    url TEXT NOT NULL UNIQUE,
+                    tipo TEXT NOT NULL,
+                    banco TEXT NOT NULL,
+                    origem TEXT,
+                    estado TEXT NOT NULL DEFAULT 'pendente',
+                    tentativas INTEGER NOT NULL DEFAULT 0,
+                    ultimo_erro TEXT,
+                    atualizado_em TEXT NOT NULL,
+                    dono TEXT,
+                    lease_ate REAL
+                )
+            """)
+            # Fronteiras criadas antes das reservas
+            colunas = {linha['name'] for linha in self._conexao.execute("PRAGMA table_info(urls)")}
+            for coluna, tipo in (('dono', 'TEXT'), ('lease_ate', 'REAL')):
+                if coluna not in colunas:
+                    self._conexao.execute(f"ALTER TABLE urls ADD COLUMN {coluna} {tipo}")
+            self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_urls_estado ON urls (estado)")
+            self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_urls_banco ON urls (banco, estado, id)")
+
+    def _executar(self, sql, parametros=()):
+        with self._lock, self._conexao:
+            return self._conexao.execute(sql, parametros)
+
+    def limpar(self):
+        """Esvazia a fronteira para uma execução do zero"""
+        self._executar("DELETE FROM urls")
+
+    def adicionar(self, url, tipo, banco, origem=None):
+        """Registra uma URL pendente; retorna False se ela já estava na fronteira"""
+        cursor = self._executar(
+            "INSERT OR IGNORE INTO urls (url, tipo, banco, origem, atualizado_em) VALUES (?, ?, ?, ?, ?)",
+            (url, tipo, banco, origem, datetime.now().isoformat())
+        )
+        return cursor.rowcount == 1
+
+    def iniciar(self, url):
+        self._executar(
+            "UPDATE urls SET estado = 'em_andamento', tentativas = tentativas + 1, atualizado_em = ? WHERE url = ?",
+            (datetime.now().isoformat(), url)
+        )
+
+    def concluir(self, url):
+        """Conclui a URL, a menos que ela tenha sido marcada como falha durante o processamento
+
+        Nos dois casos a reserva acaba: a falha fica livre para ser repetida depois da espera.
+        """
+        self._executar(
+            "UPDATE urls SET estado = CASE WHEN estado = 'em_andamento' THEN 'concluido' ELSE estado END, "
+            "dono = NULL, lease_ate = NULL, atualizado_em = ? WHERE url = ? AND estado IN ('em_andamento', 'falhou')",
+            (datetime.now().isoformat(), url)
+        )
+
+    def falhar(self, url, erro):
+        self._executar(
+            "UPDATE urls SET estado = 'falhou', ultimo_erro = ?, atualizado_em = ? WHERE url = ?",
+            (str(erro), datetime.now().isoformat(), url)
+        )
+
+    def retomar(self, max_tentativas=max_tentativas):
+        """Devolve à fila o que ficou em andamento e as falhas com tentativas restantes"""
+        agora = datetime.now().isoformat()
+        interrompidas = self._executar(
+            "UPDATE urls SET estado = 'pendente', atualizado_em = ? WHERE estado = 'em_andamento'", (agora,)
+        ).rowcount
+        repetidas = self._executar(
+            "UPDATE urls SET estado = 'pendente', atualizado_em = ? WHERE estado = 'falhou' AND tentativas < ?",
+            (agora, max_tentativas)
+        ).rowcount
+        logger.info(f"🔁 Retomando fronteira: {interrompidas} interrompidas, {repetidas} falhas para repetir")
+
+    def pendentes(self):
+        """Unidades pendentes, na ordem em que foram descobertas"""
+        with self._lock:
+            linhas = self._conexao.execute(
+                "SELECT tipo, url, banco FROM urls WHERE estado = 'pendente' ORDER BY id"
+            ).fetchall()
+        return [(linha['tipo'], linha['url'], linha['banco']) for linha in linhas]
+
+    def reivindicar(self, trabalhador, quantidade=1, lease=duracao_lease, limites=None, max_tentativas=max_tentativas,
+                    espera=espera_repeticao):
+        """Reserva unidades pendentes, alternando entre os bancos
+
+        Antes, as reservas vencidas (trabalhador que morreu) voltam para a
+        fila, ou viram falha se já gastaram `max_tentativas`, e as falhas com
+        tentativas restantes voltam depois de `espera` segundos, dobrados a
+        cada tentativa gasta. Cada vaga vai
+        para o banco com menos reservas em andamento em proporção à
+        prioridade; dentro do banco, a unidade descoberta por último, para
+        terminar um leilão antes de abrir outro.
+        """
+        limites = limites or {}
+        agora = time.time()
+        with self._lock, self._conexao:
+            self._conexao.execute("BEGIN IMMEDIATE")
+            self._conexao.execute(
+                "UPDATE urls SET estado = 'falhou', ultimo_erro = 'Reserva vencida', dono = NULL, lease_ate = NULL, "
+                "atualizado_em = ? WHERE estado = 'em_andamento' AND lease_ate < ? AND tentativas >= ?",
+                (datetime.now().isoformat(), agora, max_tentativas)
+            )
+            vencidas = self._conexao.execute(
+                "UPDATE urls SET estado = 'pendente', dono = NULL, lease_ate = NULL, atualizado_em = ? "
+                "WHERE estado = 'em_andamento' AND lease_ate < ?",
+                (datetime.now().isoformat(), agora)
+            ).rowcount
+            if vencidas:
+                logger.warning(f"⏰ {vencidas} reservas vencidas voltaram para a fila")
+
+            repetir = [
+                linha['id'] for linha in self._conexao.execute(
+                    # Uma falha marcada no meio da unidade segue reservada enquanto o dono a processa
+                    "SELECT id, tentativas, atualizado_em FROM urls WHERE estado = 'falhou' AND tentativas < ? "
+                    "AND (lease_ate IS NULL OR lease_ate < ?)",
+                    (max_tentativas, agora)
+                )
+                if datetime.fromisoformat(linha['atualizado_em'])
+                + timedelta(seconds=espera * 2 ** max(linha['tentativas'] - 1, 0)) <= datetime.now()
+            ]
+            self._conexao.executemany(
+                "UPDATE urls SET estado = 'pendente', dono = NULL, lease_ate = NULL, atualizado_em = ? WHERE id = ?",
+                [(datetime.now().isoformat(), id_) for id_ in repetir]
+            )
+            if repetir:
+                logger.info(f"🔁 {len(repetir)} falhas voltaram para a fila")
+
+            em_andamento = dict(self._conexao.execute(
+                "SELECT banco, COUNT(*) FROM urls WHERE estado = 'em_andamento' AND lease_ate IS NOT NULL GROUP BY banco"
+            ).fetchall())
+            pendentes = dict(self._conexao.execute(
+                "SELECT banco, COUNT(*) FROM urls WHERE estado = 'pendente' GROUP BY banco"
+            ).fetchall())
+
+            # Bancos sem limites informados: prioridade 1 e vagas à vontade
+            def prioridade(banco):
+                return limites[banco][0] if banco in limites else 1
+
+            def tem_vaga(banco):
+                return banco not in limites or em_andamento.get(banco, 0) < limites[banco][1]
+
+            escolhidos = {}
+            for _ in range(quantidade):
+                candidatos = [banco for banco, total in pendentes.items() if total and tem_vaga(banco)]
+                if not candidatos:
+                    break
+                banco = min(candidatos, key=lambda banco: (em_andamento.get(banco, 0) / prioridade(banco), banco))
+                em_andamento[banco] = em_andamento.get(banco, 0) + 1
+                pendentes[banco] -= 1
+                escolhidos[banco] = escolhidos.get(banco, 0) + 1
+
+            unidades = []
+            for banco, total in escolhidos.items():
+                unidades.extend(self._conexao.execute(
+                    "SELECT id, tipo, url, banco FROM urls WHERE banco = ? AND estado = 'pendente' ORDER BY id DESC LIMIT ?",
+                    (banco, total)
+                ).fetchall())
+            self._conexao.executemany(
+                "UPDATE urls SET estado = 'em_andamento', dono = ?, lease_ate = ?, atualizado_em = ? WHERE id = ?",
+                [(trabalhador, agora + lease, datetime.now().isoformat(), linha['id']) for linha in unidades]
+            )
+        return [(linha['tipo'], linha['url'], linha['banco']) for linha in unidades]
+
+    def renovar(self, trabalhador, lease=duracao_lease):
+        return self._executar(
+            "UPDATE urls SET lease_ate = ? WHERE dono = ? AND estado IN ('em_andamento', 'falhou')",
+            (time.time() + lease, trabalhador)
+        ).rowcount
+
+    def liberar(self, url, trabalhador, erro=None, max_tentativas=max_tentativas):
+        self._executar(
+            "UPDATE urls SET estado = CASE WHEN estado = 'em_andamento' AND tentativas < ? THEN 'pendente' ELSE 'falhou' END, "
+            "ultimo_erro = COALESCE(?, ultimo_erro), dono = NULL, lease_ate = NULL, atualizado_em = ? "
+            "WHERE url = ? AND dono = ? AND estado IN ('em_andamento', 'falhou')",
+            (max_tentativas, erro and str(erro), datetime.now().isoformat(), url, trabalhador)
+        )
+
+    def liberar_todas(self, trabalhador):
+        liberadas = self._executar(
+            "UPDATE urls SET estado = 'pendente', dono = NULL, lease_ate = NULL, atualizado_em = ? "
+            "WHERE dono = ? AND estado = 'em_andamento'",
+            (datetime.now().isoformat(), trabalhador)
+        ).rowcount
+        if liberadas:
+            logger.info(f"↩️  {liberadas} unidades de {trabalhador} devolvidas à fila")
+
+    def ativas(self, max_tentativas=max_tentativas):
+        # Falhas com tentativas restantes seguram os trabalhadores até serem repetidas
+        with self._lock:
+            return self._conexao.execute(
+                "SELECT COUNT(*) FROM urls WHERE estado = 'pendente' OR (estado = 'em_andamento' AND lease_ate IS NOT NULL) "
+                "OR (estado = 'falhou' AND tentativas < ?)",
+                (max_tentativas,)
+            ).fetchone()[0]
+
+    def estado(self, url):
+        with self._lock:
+            linha = self._conexao.execute("SELECT estado FROM urls WHERE url = ?", (url,)).fetchone()
+        return linha and linha['estado']
+
+    def bancos_concluidos(self):
+        with self._lock:
+            linhas = self._conexao.execute(
+                "SELECT banco FROM urls WHERE tipo = 'banco' AND estado = 'concluido'"
+            ).fetchall()
+        return [linha['banco'] for linha in linhas]
+
+    def contagem(self):
+        """Quantidade de URLs em cada estado"""
+        with self._lock:
+            linhas = self._conexao.execute("SELECT estado, COUNT(*) FROM urls GROUP BY estado").fetchall()
+        contagem = dict.fromkeys(estados, 0)
+        contagem.update({estado: total for estado, total in linhas})
+        return contagem
+
+    def fechar(self):
+        with self._lock:
+            self._conexao.close()
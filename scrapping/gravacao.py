@@ -0,0 +1,250 @@
+import base64
+import gzip
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import timedelta
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from scrapping.transporte import criar_adaptador
+
+logger = logging.getLogger(__name__)
+
+# Arquivo padrão das gravações: JSON Lines comprimido, uma troca (requisição + resposta) por linha
+arquivo_gravacao = 'dados/gravacao.jsonl.gz'
+
+# Cabeçalhos da requisição que mudam a resposta e por isso entram na chave
+cabecalhos_chave = ('Range', 'If-None-Match', 'If-Modified-Since')
+
+# O corpo é gravado já decodificado; esses cabeçalhos não valem mais para ele
+cabecalhos_descartados = ('Content-Encoding', 'Transfer-Encoding', 'Content-Length', 'Connection', 'Keep-Alive')
+
+tipos_texto = ('text/', 'json', 'xml', 'javascript')
+
+# Bytes lidos por vez ao copiar um corpo em streaming para a gravação (múltiplo de 3: base64 sem preenchimento no meio)
+bloco_base64 = 3 * 64 * 1024
+
+
+class RequisicaoNaoGravadaError(requests.RequestException):
+    """A requisição não aparece na gravação; na reprodução nada vai à rede"""
+
+
+def texto_do_corpo(corpo):
+    if corpo is None:
+        return None
+    if isinstance(corpo, bytes):
+        return corpo.decode('utf-8', errors='replace')
+    return str(corpo)
+
+
+def chave_troca(metodo, url, corpo=None, cabecalhos=None):
+    """Identifica a requisição: método, URL, corpo do formulário e cabeçalhos de `cabecalhos_chave`"""
+    extras = tuple((nome, cabecalhos[nome]) for nome in cabecalhos_chave if cabecalhos and cabecalhos.get(nome))
+    return metodo.upper(), url, corpo or '', extras
+
+
+def ler_gravacao(caminho):
+    """Registros do arquivo, na ordem em que foram gravados
+
+    Uma gravação interrompida (sem o final do gzip) é lida até a última
+    linha completa.
+    """
+    with gzip.open(caminho, 'rt', encoding='utf-8') as f:
+        try:
+            for linha in f:
+                if linha.endswith('\n'):
+                    yield json.loads(linha)
+        except EOFError:
+            logger.warning(f"⚠️  Gravação {caminho} incompleta; usando as trocas lidas até aqui")
+
+
+class CorpoEmGravacao:
+    """Corpo de uma resposta em streaming, copiado para um arquivo temporário enquanto é consumido
+
+    Envolve o `raw` da resposta: o consumidor (baixar_arquivo) continua lendo
+    em blocos, sem o corpo inteiro na memória. Quando o corpo termina, a
+    cópia vai para `ao_terminar`; um corpo abandonado no meio não é gravado.
+    """
+
+    def __init__(self, raw, ao_terminar):
+        self._raw = raw
+        self._ao_terminar = ao_terminar
+        self._copia = tempfile.TemporaryFile()
+
+    def stream(self, amt=2 ** 16, decode_content=None):
+        for chunk in self._raw.stream(amt, decode_content=decode_content):
+            self._copia.write(chunk)
+            yield chunk
+        self._copia.seek(0)
+        try:
+            self._ao_terminar(self._copia)
+        finally:
+            self._copia.close()
+
+    def close(self):
+        self._copia.close()
+        self._raw.close()
+
+    def __getattr__(self, nome):
+        return getattr(self._raw, nome)
+
+
+class GravadorHTTP(BaseAdapter):
+    """Adaptador que repassa as requisições à rede e grava cada troca no arquivo
+
+    Cada tentativa e cada passo de redirecionamento vira uma linha, com o
+    corpo da resposta (texto como texto, binários em base64). Páginas são
+    lidas por inteiro; downloads em streaming (PDFs) são copiados para um
+    arquivo temporário enquanto o scraper os consome e gravados ao terminar.
+    Conexões que falham não são gravadas. Cada linha é descarregada no
+    arquivo assim que gravada; `session.close()` fecha o gzip.
+    """
+
+    def __init__(self, caminho=arquivo_gravacao, max_conexoes=10):
+        super().__init__()
+        self.caminho = caminho
+        # Pool dimensionado como o da sessão sem gravação
+        self.rede = criar_adaptador(max_conexoes)
+        self.gravadas = 0
+        self._lock = threading.Lock()
+        self._arquivo = None
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        inicio = time.monotonic()
+        response = self.rede.send(request, stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+        if stream:
+            response.raw = CorpoEmGravacao(
+                response.raw, lambda copia: self.gravar(request, response, copia, time.monotonic() - inicio)
+            )
+            return response
+        # Lê o corpo aqui para gravá-lo; iter_content passa a servir a cópia em memória
+        corpo = response.content
+        self.gravar(request, response, corpo, time.monotonic() - inicio)
+        return response
+
+    def gravar(self, request, response, corpo, segundos):
+        """Grava a troca; `corpo` são os bytes da resposta ou um arquivo com eles (streaming)"""
+        tipo = response.headers.get('Content-Type', '').lower()
+        registro = {
+            'metodo': request.method,
+            'url': request.url,
+            'corpo_requisicao': texto_do_corpo(request.body),
+            'cabecalhos_requisicao': {nome: request.headers[nome] for nome in cabecalhos_chave if nome in request.headers},
+            'status': response.status_code,
+            'motivo': response.reason,
+            'cabecalhos': {
+                nome: valor for nome, valor in response.headers.items() if nome.title() not in cabecalhos_descartados
+            },
+            'segundos': round(segundos, 4),
+            'gravado_em': time.time(),
+        }
+        if isinstance(corpo, bytes) and any(texto in tipo for texto in tipos_texto):
+            try:
+                registro['corpo'] = corpo.decode('utf-8')
+            except UnicodeDecodeError:
+                pass
+        if 'corpo' not in registro and isinstance(corpo, bytes):
+            registro['corpo_b64'] = base64.b64encode(corpo).decode('ascii')
+
+        linha = json.dumps(registro, ensure_ascii=False)
+        with self._lock:
+            if self._arquivo is None:
+                os.makedirs(os.path.dirname(self.caminho) or '.', exist_ok=True)
+                self._arquivo = gzip.open(self.caminho, 'ab')
+            if isinstance(corpo, bytes):
+                self._arquivo.write((linha + '\n').encode('utf-8'))
+            else:
+                # Corpo em arquivo: o base64 vai para a linha em blocos, sem o corpo inteiro na memória
+                self._arquivo.write((linha[:-1] + ', "corpo_b64": "').encode('utf-8'))
+                for bloco in iter(lambda: corpo.read(bloco_base64), b''):
+                    self._arquivo.write(base64.b64encode(bloco))
+                self._arquivo.write(b'"}\n')
+            self._arquivo.flush()
+            self.gravadas += 1
+
+    def close(self):
+        with self._lock:
+            if self._arquivo is not None:
+                self._arquivo.close()
+                self._arquivo = None
+                logger.info(f"📼 {self.gravadas} requisições gravadas em {self.caminho}")
+        self.rede.close()
+
+
+class ReprodutorHTTP(BaseAdapter):
+    """Adaptador que responde com as trocas gravadas, sem acessar a rede
+
+    Requisições repetidas recebem as respostas na ordem em que foram
+    gravadas (um 503 seguido do 200 da nova tentativa, por exemplo); a
+    última se repete quando acabam. Uma requisição condicional ou com Range
+    sem gravação própria recebe a resposta completa da mesma URL.
+    """
+
+    # A sessão dispensa o limitador de taxa: não há servidor para proteger
+    sem_rede = True
+
+    def __init__(self, caminho=arquivo_gravacao):
+        super().__init__()
+        self.caminho = caminho
+        self.estatisticas = {'reproduzidas': 0, 'ausentes': 0}
+        self._trocas = defaultdict(deque)
+        self._lock = threading.Lock()
+        self._carregar()
+
+    def _carregar(self):
+        for registro in ler_gravacao(self.caminho):
+            chave = chave_troca(
+                registro['metodo'], registro['url'], registro['corpo_requisicao'], registro['cabecalhos_requisicao']
+            )
+            self._trocas[chave].append(registro)
+        logger.info(f"📼 {sum(map(len, self._trocas.values()))} trocas carregadas de {self.caminho}")
+
+    def _proxima(self, request):
+        corpo = texto_do_corpo(request.body)
+        for chave in (chave_troca(request.method, request.url, corpo, request.headers),
+                      chave_troca(request.method, request.url, corpo)):
+            with self._lock:
+                fila = self._trocas.get(chave)
+                if fila:
+                    registro = fila.popleft() if len(fila) > 1 else fila[0]
+                    self.estatisticas['reproduzidas'] += 1
+                    return registro
+        with self._lock:
+            self.estatisticas['ausentes'] += 1
+        return None
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        registro = self._proxima(request)
+        if registro is None:
+            raise RequisicaoNaoGravadaError(f"Sem gravação para {request.method} {request.url}", request=request)
+
+        if 'corpo' in registro:
+            corpo = registro['corpo'].encode('utf-8')
+        else:
+            corpo = base64.b64decode(registro['corpo_b64'])
+
+        response = requests.Response()
+        response.status_code = registro['status']
+        response.reason = registro['motivo']
+        response.url = request.url
+        response.headers = CaseInsensitiveDict(registro['cabecalhos'])
+        response.headers['Content-Length'] = str(len(corpo))
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = io.BytesIO(corpo)
+        response._content = corpo
+        response.elapsed = timedelta(0)
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
@@ -0,0 +1,92 @@
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+diretorio_pdfs = os.path.join('pdfs', 'leilao_vip')
+arquivo_manifesto = 'manifesto.jsonl'
+
+
+def par_do_arquivo(nome_arquivo, bancos_conhecidos):
+    """Recupera (banco, lote_id) de um nome no formato {banco}_{lote_id}.pdf"""
+    nome = nome_arquivo[:-len('.pdf')]
+    # Nomes mais longos primeiro: "banco_pan_x" não pode ser lido como banco "banco"
+    for banco in sorted(bancos_conhecidos, key=len, reverse=True):
+        if nome.startswith(f"{banco}_"):
+            return banco, nome[len(banco) + 1:]
+    return None
+
+
+def ler_manifesto(caminho_manifesto):
+    """Registros válidos do manifesto, na ordem em que foram gravados"""
+    if not os.path.exists(caminho_manifesto):
+        return
+    with open(caminho_manifesto, 'r', encoding='utf-8') as f:
+        for linha in f:
+            try:
+                yield json.loads(linha)
+            except ValueError:
+                continue  # Linha truncada por uma execução interrompida
+
+
+class IndiceDownloads:
+    """Índice em memória dos pares (banco, lote_id) que já têm PDF salvo
+
+    É montado a partir do diretório de saída e do manifesto gravado a cada
+    download, para que o scraper pule lotes conhecidos sem acessar a rede.
+    """
+
+    def __init__(self, diretorio=diretorio_pdfs, bancos_conhecidos=()):
+        self.diretorio = diretorio
+        self.caminho_manifesto = os.path.join(diretorio, arquivo_manifesto)
+        self.bancos_conhecidos = list(bancos_conhecidos)
+        self._pares = set()
+        self._lock = threading.Lock()
+        self.carregar()
+
+    def carregar(self):
+        """Lê o manifesto e completa com os PDFs presentes no diretório"""
+        if not os.path.isdir(self.diretorio):
+            return
+
+        arquivos = {entrada.name for entrada in os.scandir(self.diretorio) if entrada.name.endswith('.pdf')}
+        pares = set()
+
+        for registro in ler_manifesto(self.caminho_manifesto):
+            # Só vale se o arquivo (ou o objeto do armazém) ainda estiver no disco
+            objeto = registro.get('objeto')
+            if registro.get('arquivo') in arquivos or (objeto and os.path.exists(os.path.join(self.diretorio, objeto))):
+                pares.add((registro['banco'], registro['lote_id']))
+                arquivos.discard(registro.get('arquivo'))
+
+        for nome_arquivo in arquivos:
+            par = par_do_arquivo(nome_arquivo, self.bancos_conhecidos)
+            if par:
+                pares.add(par)
+
+        with self._lock:
+            self._pares = pares
+        logger.info(f"🗂️  Índice de downloads carregado: {len(pares)} lotes já baixados")
+
+    def contem(self, banco, lote_id):
+        with self._lock:
+            return (banco, lote_id) in self._pares
+
+    def registrar(self, banco, lote_id, caminho_arquivo, sha256=None, caminho_objeto=None):
+        """Adiciona o lote ao índice e ao manifesto"""
+        registro = {'banco': banco, 'lote_id': lote_id, 'arquivo': os.path.basename(caminho_arquivo)}
+        if sha256:
+            registro['sha256'] = sha256
+        if caminho_objeto:
+            registro['objeto'] = os.path.relpath(caminho_objeto, self.diretorio)
+        with self._lock:
+            self._pares.add((banco, lote_id))
+            os.makedirs(self.diretorio, exist_ok=True)
+            with open(self.caminho_manifesto, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(registro) + '\n')
+
+    def __len__(self):
+        with self._lock:
+            return len(self._pares)
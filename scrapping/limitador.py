@@ -0,0 +1,152 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+# Parâmetros padrão do limitador (requisições por segundo, por host)
+taxa_inicial = 1.0
+taxa_minima = 0.1
+taxa_maxima = 10.0
+
+
+def segundos_retry_after(valor):
+    """Converte o header Retry-After (segundos ou data HTTP) em segundos"""
+    if not valor:
+        return None
+    valor = valor.strip()
+    if valor.isdigit():
+        return float(valor)
+    try:
+        return max(0.0, parsedate_to_datetime(valor).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class BaldeHost:
+    """Estado do token bucket de um host"""
+
+    def __init__(self, taxa, capacidade):
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self.tokens = capacidade
+        self.ultimo = time.monotonic()
+        self.bloqueado_ate = 0.0
+        # Momento da última redução da taxa; respostas a requisições anteriores a ela não reduzem de novo
+        self.ultima_reducao = float('-inf')
+
+    def reabastecer(self, agora):
+        self.tokens = min(self.capacidade, self.tokens + (agora - self.ultimo) * self.taxa)
+        self.ultimo = agora
+
+
+class LimitadorTaxa:
+    """Token bucket por host com taxa adaptativa (AIMD)
+
+    A taxa cresce de forma aditiva com as respostas rápidas e bem-sucedidas:
+    `incremento` requisições/s a cada `janela` segundos de respostas (cada
+    resposta soma incremento / (taxa × janela), até `incremento`). Cai de
+    forma multiplicativa em 429/5xx, falhas de conexão ou latência alta, no
+    máximo uma vez por janela e só por requisições enviadas depois da última
+    redução: os erros de uma mesma rajada em andamento contam uma vez só.
+    Com uma taxa de erro constante, a taxa se estabiliza em vez de cair até
+    `taxa_minima`. O header Retry-After bloqueia o host pelo tempo pedido
+    pelo servidor.
+    """
+
+    def __init__(self, taxa_inicial=taxa_inicial, taxa_minima=taxa_minima, taxa_maxima=taxa_maxima,
+                 capacidade=2, incremento=1.0, fator_reducao=0.5, fator_latencia=0.9, latencia_alvo=2.0, janela=1.0):
+        self.taxa_inicial = taxa_inicial
+        self.taxa_minima = taxa_minima
+        self.taxa_maxima = taxa_maxima
+        self.capacidade = capacidade
+        self.incremento = incremento
+        self.fator_reducao = fator_reducao
+        self.fator_latencia = fator_latencia
+        self.latencia_alvo = latencia_alvo
+        self.janela = janela
+        self._baldes = {}
+        self._lock = threading.Lock()
+
+    def dividir(self, partes):
+        """Parâmetros de um limitador com 1/partes das taxas, para processos que somam o mesmo total"""
+        return {
+            'taxa_inicial': self.taxa_inicial / partes,
+            'taxa_minima': self.taxa_minima / partes,
+            'taxa_maxima': self.taxa_maxima / partes,
+            'capacidade': self.capacidade,
+            # Cada processo cresce `incremento` por janela: dividido, a soma cresce como um limitador inteiro
+            'incremento': self.incremento / partes,
+            'fator_reducao': self.fator_reducao,
+            'fator_latencia': self.fator_latencia,
+            'latencia_alvo': self.latencia_alvo,
+            'janela': self.janela,
+        }
+
+    def _balde(self, url):
+        host = urlparse(url).netloc
+        if host not in self._baldes:
+            self._baldes[host] = BaldeHost(self.taxa_inicial, self.capacidade)
+        return self._baldes[host]
+
+    def adquirir(self, url):
+        """Bloqueia até existir um token disponível para o host da URL"""
+        with self._lock:
+            balde = self._balde(url)
+            agora = time.monotonic()
+            balde.reabastecer(agora)
+
+            # Reserva o token já agora; o saldo negativo enfileira as próximas chamadas
+            espera = max(0.0, (1 - balde.tokens) / balde.taxa)
+            espera = max(espera, balde.bloqueado_ate - agora)
+            balde.tokens -= 1
+
+        if espera > 0:
+            time.sleep(espera)
+        return espera
+
+    def _reduzir(self, balde, fator, agora, latencia):
+        """Reduz a taxa, salvo se já houve redução na janela ou depois do envio desta requisição"""
+        enviada_em = agora - latencia
+        if enviada_em < balde.ultima_reducao or agora - balde.ultima_reducao < self.janela:
+            return
+        balde.taxa = max(self.taxa_minima, balde.taxa * fator)
+        balde.ultima_reducao = agora
+
+    def registrar_resposta(self, url, status, latencia, retry_after=None):
+        """Ajusta a taxa do host a partir do status, Retry-After e latência"""
+        with self._lock:
+            balde = self._balde(url)
+            agora = time.monotonic()
+            if status == 429 or status >= 500:
+                self._reduzir(balde, self.fator_reducao, agora, latencia)
+                pausa = segundos_retry_after(retry_after)
+                if pausa:
+                    balde.bloqueado_ate = max(balde.bloqueado_ate, agora + pausa)
+            elif latencia > self.latencia_alvo:
+                self._reduzir(balde, self.fator_latencia, agora, latencia)
+            else:
+                balde.taxa = min(self.taxa_maxima, balde.taxa + self.incremento / max(1.0, balde.taxa * self.janela))
+
+    def registrar_falha(self, url, latencia=0.0):
+        """Reduz a taxa após erro de conexão ou timeout"""
+        with self._lock:
+            balde = self._balde(url)
+            self._reduzir(balde, self.fator_reducao, time.monotonic(), latencia)
+
+    def taxa_atual(self, host):
+        """Taxa atual (requisições/s) de um host"""
+        with self._lock:
+            balde = self._baldes.get(host)
+            return balde.taxa if balde else self.taxa_inicial
+
+    def estado(self):
+        """Retorna a taxa e o bloqueio de cada host, para monitoramento"""
+        with self._lock:
+            agora = time.monotonic()
+            return {
+                host: {
+                    'taxa': round(balde.taxa, 3),
+                    'bloqueado_por': round(max(0.0, balde.bloqueado_ate - agora), 3)
+                }
+                for host, balde in self._baldes.items()
+            }
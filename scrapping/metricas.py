@@ -0,0 +1,274 @@
+"""
+Métricas do scraper no formato texto do Prometheus (exposition format 0.0.4)
+
+Registro próprio, sem dependências: contadores, medidores e histogramas com
+rótulos, seguros entre threads, exportados pelo GET /metrics da API. As
+métricas valem para o processo; análises feitas no pool de processos do
+pipeline são cronometradas lá e registradas aqui pelo motor, e os
+trabalhadores da coleta distribuída mandam as diferenças dos seus registros
+(RegistroMetricas.diferenca), somadas aqui com RegistroMetricas.somar.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+# Limites (segundos) dos histogramas de latência, no padrão dos clientes Prometheus
+limites_latencia = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+limites_download = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def escapar_rotulo(valor):
+    return str(valor).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def formatar_rotulos(nomes, valores, extras=()):
+    pares = [*zip(nomes, valores), *extras]
+    if not pares:
+        return ''
+    return '{' + ','.join(f'{nome}="{escapar_rotulo(valor)}"' for nome, valor in pares) + '}'
+
+
+def formatar_numero(valor):
+    if valor == float('inf'):
+        return '+Inf'
+    if float(valor).is_integer():
+        return str(int(valor))
+    return repr(float(valor))
+
+
+class Metrica:
+    """Base das métricas: nome, ajuda, rótulos e uma série por combinação de valores"""
+
+    tipo = None
+
+    def __init__(self, nome, ajuda, rotulos=()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def _chave(self, valores):
+        if set(valores) != set(self.rotulos):
+            raise ValueError(f"{self.nome} espera os rótulos {self.rotulos}, recebeu {tuple(valores)}")
+        return tuple(str(valores[rotulo]) for rotulo in self.rotulos)
+
+    def exportar(self):
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}"]
+        with self._lock:
+            series = sorted((chave, self._copiar(valor)) for chave, valor in self._series.items())
+        for chave, valor in series:
+            linhas.extend(self._linhas(chave, valor))
+        return linhas
+
+    def _copiar(self, valor):
+        return valor
+
+    def _linhas(self, chave, valor):
+        return [f"{self.nome}{formatar_rotulos(self.rotulos, chave)} {formatar_numero(valor)}"]
+
+    def series(self):
+        """Cópia das séries: chave dos rótulos → valor"""
+        with self._lock:
+            return {chave: self._copiar(valor) for chave, valor in self._series.items()}
+
+    def subtrair(self, valor, anterior):
+        """Quanto a série andou desde `anterior` (None se não andou)"""
+        diferenca = valor - (anterior or 0)
+        return diferenca or None
+
+    def somar(self, series):
+        """Soma diferenças de séries (de subtrair) às séries desta métrica"""
+        with self._lock:
+            for chave, diferenca in series.items():
+                self._series[chave] = self._series.get(chave, 0) + diferenca
+
+
+class Contador(Metrica):
+    tipo = 'counter'
+
+    def inc(self, valor=1, **rotulos):
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._series[chave] = self._series.get(chave, 0) + valor
+
+
+class Medidor(Metrica):
+    tipo = 'gauge'
+
+    def inc(self, valor=1, **rotulos):
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._series[chave] = self._series.get(chave, 0) + valor
+
+    def dec(self, valor=1, **rotulos):
+        self.inc(-valor, **rotulos)
+
+    def definir(self, valor, **rotulos):
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._series[chave] = valor
+
+
+class Histograma(Metrica):
+    """Distribuição em faixas cumulativas (`le`), com soma e contagem"""
+
+    tipo = 'histogram'
+
+    def __init__(self, nome, ajuda, rotulos=(), limites=limites_latencia):
+        super().__init__(nome, ajuda, rotulos)
+        self.limites = tuple(sorted(limites)) + (float('inf'),)
+
+    def observar(self, valor, **rotulos):
+        chave = self._chave(rotulos)
+        with self._lock:
+            serie = self._series.get(chave)
+            if serie is None:
+                serie = self._series[chave] = {'faixas': [0] * len(self.limites), 'soma': 0.0, 'contagem': 0}
+            for indice, limite in enumerate(self.limites):
+                if valor <= limite:
+                    serie['faixas'][indice] += 1
+                    break
+            serie['soma'] += valor
+            serie['contagem'] += 1
+
+    @contextmanager
+    def cronometrar(self, **rotulos):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(time.perf_counter() - inicio, **rotulos)
+
+    def _linhas(self, chave, serie):
+        linhas = []
+        acumulado = 0
+        for limite, quantidade in zip(self.limites, serie['faixas']):
+            acumulado += quantidade
+            rotulos = formatar_rotulos(self.rotulos, chave, [('le', formatar_numero(limite))])
+            linhas.append(f"{self.nome}_bucket{rotulos} {acumulado}")
+        rotulos = formatar_rotulos(self.rotulos, chave)
+        linhas.append(f"{self.nome}_sum{rotulos} {formatar_numero(serie['soma'])}")
+        linhas.append(f"{self.nome}_count{rotulos} {serie['contagem']}")
+        return linhas
+
+    def _copiar(self, serie):
+        return {'faixas': list(serie['faixas']), 'soma': serie['soma'], 'contagem': serie['contagem']}
+
+    def subtrair(self, serie, anterior):
+        if anterior is None:
+            return serie
+        if serie['contagem'] == anterior['contagem']:
+            return None
+        return {
+            'faixas': [atual - antes for atual, antes in zip(serie['faixas'], anterior['faixas'])],
+            'soma': serie['soma'] - anterior['soma'],
+            'contagem': serie['contagem'] - anterior['contagem'],
+        }
+
+    def somar(self, series):
+        with self._lock:
+            for chave, diferenca in series.items():
+                serie = self._series.get(chave)
+                if serie is None:
+                    serie = self._series[chave] = {'faixas': [0] * len(self.limites), 'soma': 0.0, 'contagem': 0}
+                serie['faixas'] = [atual + mais for atual, mais in zip(serie['faixas'], diferenca['faixas'])]
+                serie['soma'] += diferenca['soma']
+                serie['contagem'] += diferenca['contagem']
+
+
+class RegistroMetricas:
+    """Conjunto das métricas do processo, na ordem em que foram criadas"""
+
+    def __init__(self):
+        self._metricas = {}
+        self._lock = threading.Lock()
+
+    def _registrar(self, metrica):
+        with self._lock:
+            if metrica.nome in self._metricas:
+                raise ValueError(f"Métrica {metrica.nome} já registrada")
+            self._metricas[metrica.nome] = metrica
+        return metrica
+
+    def contador(self, nome, ajuda, rotulos=()):
+        return self._registrar(Contador(nome, ajuda, rotulos))
+
+    def medidor(self, nome, ajuda, rotulos=()):
+        return self._registrar(Medidor(nome, ajuda, rotulos))
+
+    def histograma(self, nome, ajuda, rotulos=(), limites=limites_latencia):
+        return self._registrar(Histograma(nome, ajuda, rotulos, limites))
+
+    def instantaneo(self):
+        """Séries de todas as métricas: nome → séries"""
+        with self._lock:
+            metricas = list(self._metricas.values())
+        return {metrica.nome: metrica.series() for metrica in metricas}
+
+    def diferenca(self, atual, anterior):
+        """O que mudou entre dois instantâneos, só com as séries que andaram"""
+        with self._lock:
+            metricas = dict(self._metricas)
+        diferencas = {}
+        for nome, series in atual.items():
+            antes = anterior.get(nome, {})
+            mudancas = {}
+            for chave, valor in series.items():
+                mudanca = metricas[nome].subtrair(valor, antes.get(chave))
+                if mudanca is not None:
+                    mudancas[chave] = mudanca
+            if mudancas:
+                diferencas[nome] = mudancas
+        return diferencas
+
+    def somar(self, diferencas):
+        """Soma às métricas deste processo as diferenças vindas de outro (de diferenca)"""
+        with self._lock:
+            metricas = dict(self._metricas)
+        for nome, series in diferencas.items():
+            if nome in metricas:
+                metricas[nome].somar(series)
+
+    def exportar(self):
+        """Todas as métricas no formato texto do Prometheus"""
+        with self._lock:
+            metricas = list(self._metricas.values())
+        linhas = []
+        for metrica in metricas:
+            linhas.extend(metrica.exportar())
+        return '\n'.join(linhas) + '\n'
+
+
+registro = RegistroMetricas()
+
+requisicoes_http = registro.contador(
+    'leilaovip_requisicoes_http_total', "Requisições HTTP enviadas, por host e status (erro = falha de conexão)",
+    ('host', 'status')
+)
+latencia_busca = registro.histograma(
+    'leilaovip_busca_segundos', "Duração de cada requisição HTTP (downloads em streaming: até os cabeçalhos)", ('host',)
+)
+requisicoes_em_andamento = registro.medidor(
+    'leilaovip_requisicoes_em_andamento', "Requisições HTTP em andamento por host", ('host',)
+)
+tempo_analise = registro.histograma(
+    'leilaovip_analise_segundos', "Tempo de parsing e extração por tipo de página", ('tipo',)
+)
+estrategias_listagem = registro.contador(
+    'leilaovip_estrategias_listagem_total', "Tentativas das estratégias de listagem da agenda, por resultado",
+    ('estrategia', 'resultado')
+)
+requisicoes_economizadas = registro.contador(
+    'leilaovip_requisicoes_economizadas_total',
+    "Requisições de descoberta poupadas quando a estratégia de listagem memorizada acerta de primeira",
+    ('host', 'comitente')
+)
+lotes_sem_palavra_chave = registro.contador(
+    'leilaovip_lotes_sem_palavra_chave_total', "Lotes descartados pelo filtro de palavras-chave", ('banco',)
+)
+pdf_bytes = registro.contador('leilaovip_pdf_bytes_total', "Bytes de PDFs baixados", ('banco',))
+duracao_download = registro.histograma(
+    'leilaovip_download_pdf_segundos', "Duração dos downloads de PDF", ('banco',), limites_download
+)
@@ -0,0 +1,53 @@
+import threading
+import time
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# lxml é bem mais rápido; html.parser (da biblioteca padrão) fica como alternativa
+try:
+    import lxml  # noqa: F401
+    backend_padrao = 'lxml'
+except ImportError:
+    backend_padrao = 'html.parser'
+
+backends_disponiveis = ('lxml', 'html.parser') if backend_padrao == 'lxml' else ('html.parser',)
+
+
+def _elementos_agenda(nome, attrs):
+    """Página de agenda: só o placeholder e os elementos com data-ajax-url"""
+    return attrs.get('id') == 'placeholder' or 'data-ajax-url' in attrs
+
+
+def _elementos_lotes(nome, attrs):
+    """Páginas de leilão/ofertas: links, o <select> de lotes e elementos AJAX"""
+    return nome in ('a', 'select', 'option') or 'data-ajax-url' in attrs
+
+
+# Filtros parciais por etapa; None monta a árvore completa
+filtros = {
+    'agenda': SoupStrainer(_elementos_agenda),
+    'lotes': SoupStrainer(_elementos_lotes),
+    'links': SoupStrainer('a', href=True),
+    'ancoras': SoupStrainer('a'),
+}
+
+# Tempo acumulado montando árvores, por thread, para separar o parsing do resto da análise
+_medicao = threading.local()
+
+
+def segundos_parsing():
+    """Segundos gastos em criar_soup pela thread atual desde o início dela"""
+    return getattr(_medicao, 'segundos', 0.0)
+
+
+def criar_soup(conteudo, filtro=None, backend=None):
+    """Monta o BeautifulSoup só com os elementos que a etapa usa
+
+    `filtro` é uma chave de `filtros` (ou None para a página inteira) e
+    `backend` escolhe entre 'lxml' e 'html.parser'.
+    """
+    parse_only = filtros[filtro] if filtro else None
+    inicio = time.perf_counter()
+    soup = BeautifulSoup(conteudo, backend or backend_padrao, parse_only=parse_only)
+    _medicao.segundos = segundos_parsing() + time.perf_counter() - inicio
+    return soup
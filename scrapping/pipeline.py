@@ -0,0 +1,216 @@
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from scrapping import metricas
+from scrapping.parser import segundos_parsing
+
+logger = logging.getLogger(__name__)
+
+# Intervalo entre os relatórios de fila e vazão de cada etapa (segundos)
+intervalo_relatorio = 5
+
+etapas = ('busca', 'analise', 'download')
+
+
+class Passo:
+    """O que um fluxo pede ao motor quando pausa: mudar de etapa ou analisar uma página"""
+
+    def __init__(self, etapa):
+        self.etapa = etapa
+
+    def executar(self):
+        return None
+
+
+class Analise(Passo):
+    """Chamada de uma função de `scrapping.analise`; o resultado volta para o fluxo"""
+
+    def __init__(self, funcao, *args):
+        super().__init__('analise')
+        self.funcao = funcao
+        self.args = args
+        # (rastreador, span do fluxo) quando a execução é rastreada
+        self.rastro = None
+
+    def executar(self):
+        resultado, segundos, segundos_soup = analisar(self.funcao, *self.args)
+        self.registrar(segundos, segundos_soup)
+        return resultado
+
+    def registrar(self, segundos, segundos_soup):
+        # analisar_leilao → 'leilao', analisar_links_ajax → 'links_ajax'
+        tipo = self.funcao.__name__.replace('analisar_', '', 1)
+        metricas.tempo_analise.observar(segundos, tipo=tipo)
+        if self.rastro:
+            rastreador, pai = self.rastro
+            span = rastreador.registrar(f"analise_{tipo}", segundos, pai=pai.id)
+            rastreador.registrar('montar_soup', segundos_soup, pai=span.id, inicio=span.inicio)
+
+
+def analisar(funcao, *args):
+    """Executa a análise e mede quanto ela levou, e quanto disso foi montando a árvore
+
+    Roda também nos processos do pool.
+    """
+    inicio, soup_antes = time.perf_counter(), segundos_parsing()
+    resultado = funcao(*args)
+    return resultado, time.perf_counter() - inicio, segundos_parsing() - soup_antes
+
+
+# O restante do fluxo roda na etapa de download
+para_download = Passo('download')
+
+
+def executar_fluxo(fluxo):
+    """Executa um fluxo inteiro na thread atual, analisando as páginas aqui mesmo"""
+    resultado = None
+    try:
+        while True:
+            resultado = fluxo.send(resultado).executar()
+    except StopIteration as fim:
+        return fim.value
+
+
+def avancar(fluxo, valor=None, excecao=None):
+    """Roda o fluxo até a próxima pausa; retorna (passo, None) ou (None, retorno do fluxo)"""
+    try:
+        passo = fluxo.throw(excecao) if excecao else fluxo.send(valor)
+        return passo, None
+    except StopIteration as fim:
+        return None, fim.value
+
+
+class Pipeline:
+    """Motor em etapas ligadas por filas limitadas: busca → análise → download
+
+    Cada unidade da fronteira vira um fluxo (gerador) que faz as requisições
+    na etapa de busca, entrega o HTML para análise em um pool de processos
+    e termina na etapa de download. As filas de análise e de download têm
+    limite: quando enchem, a busca para de iniciar unidades novas até elas
+    escoarem, o que mantém limitada a memória ocupada por páginas baixadas.
+    """
+
+    def __init__(self, trabalhadores_busca=4, processos_analise=None, trabalhadores_download=4, limite_fila=None):
+        self.capacidade = {
+            'busca': trabalhadores_busca,
+            'analise': processos_analise or os.cpu_count() or 1,
+            'download': trabalhadores_download,
+        }
+        # Páginas à espera de análise (e lotes à espera de download) antes de a busca segurar
+        self.limite_fila = limite_fila or 2 * self.capacidade['analise']
+        self.estatisticas = {}
+
+    def _atualizar_estatisticas(self, filas, em_execucao, concluidos, novas, inicio):
+        decorrido = max(time.monotonic() - inicio, 1e-6)
+        for etapa in etapas:
+            self.estatisticas[etapa] = {
+                'fila': len(filas[etapa]) + (len(novas) if etapa == 'busca' else 0),
+                'em_execucao': sum(1 for etapa_futuro, _ in em_execucao.values() if etapa_futuro == etapa),
+                'concluidos': concluidos[etapa],
+                'por_segundo': round(concluidos[etapa] / decorrido, 2),
+            }
+        return self.estatisticas
+
+    def registrar_estatisticas(self):
+        for etapa, dados in self.estatisticas.items():
+            logger.info(
+                f"📊 {etapa}: {dados['fila']} na fila, {dados['em_execucao']} em execução, "
+                f"{dados['concluidos']} concluídos ({dados['por_segundo']}/s)"
+            )
+
+    def executar(self, novas, criar_fluxo, ao_reportar=None):
+        """Processa as unidades de `novas` e as filhas que cada fluxo retornar
+
+        `novas` é o EscalonadorComitentes com as unidades ainda não
+        iniciadas; `criar_fluxo(unidade)` devolve o gerador da unidade e o
+        valor de retorno do gerador é a lista de unidades filhas.
+        """
+        # Unidade de cada fluxo iniciado, devolvida ao escalonador quando o fluxo termina
+        unidades = {}
+        # Fluxos parados esperando cada etapa
+        filas = {etapa: deque() for etapa in etapas}
+        em_execucao = {}
+        # Passo de cada análise em execução, para registrar o tempo dela ao terminar
+        analises = {}
+        ocupados = dict.fromkeys(etapas, 0)
+        concluidos = dict.fromkeys(etapas, 0)
+        inicio = ultimo_relatorio = time.monotonic()
+
+        # spawn: processos novos, sem herdar locks das threads em execução
+        contexto = multiprocessing.get_context('spawn')
+        with ThreadPoolExecutor(self.capacidade['busca'], thread_name_prefix='busca') as busca, \
+                ProcessPoolExecutor(self.capacidade['analise'], mp_context=contexto) as analise, \
+                ThreadPoolExecutor(self.capacidade['download'], thread_name_prefix='download') as download:
+
+            def iniciar(etapa, futuro, fluxo):
+                em_execucao[futuro] = (etapa, fluxo)
+                ocupados[etapa] += 1
+
+            while novas or em_execucao or any(filas.values()):
+                while filas['download'] and ocupados['download'] < self.capacidade['download']:
+                    fluxo = filas['download'].popleft()
+                    iniciar('download', download.submit(avancar, fluxo), fluxo)
+
+                while filas['analise'] and ocupados['analise'] < self.capacidade['analise']:
+                    fluxo, passo = filas['analise'].popleft()
+                    futuro = analise.submit(analisar, passo.funcao, *passo.args)
+                    analises[futuro] = passo
+                    iniciar('analise', futuro, fluxo)
+
+                # Continuações primeiro; unidades novas só com espaço nas filas seguintes
+                while ocupados['busca'] < self.capacidade['busca']:
+                    if filas['busca']:
+                        fluxo, valor, excecao = filas['busca'].popleft()
+                        iniciar('busca', busca.submit(avancar, fluxo, valor, excecao), fluxo)
+                        continue
+                    unidade = None
+                    if len(filas['analise']) < self.limite_fila and len(filas['download']) < self.limite_fila:
+                        # None também quando os comitentes com trabalho estão no limite de vagas
+                        unidade = novas.proxima()
+                    if unidade is None:
+                        break
+                    fluxo = criar_fluxo(unidade)
+                    unidades[fluxo] = unidade
+                    iniciar('busca', busca.submit(avancar, fluxo), fluxo)
+
+                prontos, _ = wait(list(em_execucao), timeout=intervalo_relatorio, return_when=FIRST_COMPLETED)
+
+                for futuro in prontos:
+                    etapa, fluxo = em_execucao.pop(futuro)
+                    ocupados[etapa] -= 1
+                    concluidos[etapa] += 1
+
+                    if etapa == 'analise':
+                        # O fluxo retoma na busca com o resultado (ou a exceção) da análise
+                        passo = analises.pop(futuro)
+                        excecao = futuro.exception()
+                        resultado = None
+                        if not excecao:
+                            resultado, segundos, segundos_soup = futuro.result()
+                            passo.registrar(segundos, segundos_soup)
+                        filas['busca'].append((fluxo, resultado, excecao))
+                        continue
+
+                    passo, filhas = futuro.result()
+                    if passo is None:
+                        novas.concluir(unidades.pop(fluxo))
+                        novas.adicionar(filhas)
+                    elif passo.etapa == 'analise':
+                        filas['analise'].append((fluxo, passo))
+                    elif passo.etapa == 'download':
+                        filas['download'].append(fluxo)
+                    else:
+                        filas['busca'].append((fluxo, None, None))
+
+                if time.monotonic() - ultimo_relatorio >= intervalo_relatorio:
+                    ultimo_relatorio = time.monotonic()
+                    estatisticas = self._atualizar_estatisticas(filas, em_execucao, concluidos, novas, inicio)
+                    self.registrar_estatisticas()
+                    if ao_reportar:
+                        ao_reportar(estatisticas)
+
+        return self._atualizar_estatisticas(filas, em_execucao, concluidos, novas, inicio)
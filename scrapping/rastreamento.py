@@ -0,0 +1,247 @@
+"""
+Spans de rastreamento de uma execução, exportados no formato Chrome Trace
+
+Cada unidade da fronteira (banco, leilão, lote) vira um span, filho do span
+da unidade que a descobriu; dentro dele ficam as requisições HTTP, as
+estratégias de listagem, o redirecionamento de ofertas, as análises (com o
+tempo de montagem da árvore do BeautifulSoup à parte), o download e a
+gravação do PDF. O JSON abre no chrome://tracing, no Perfetto ou no
+speedscope.
+
+Os fluxos das unidades pausam e retomam em threads diferentes; o
+FluxoRastreado reativa o span da unidade a cada retomada, para que os spans
+criados dentro dele encontrem o pai certo.
+"""
+
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from scrapping.pipeline import Analise
+
+logger = logging.getLogger(__name__)
+
+diretorio_rastros = os.path.join('dados', 'rastros')
+
+
+class Span:
+    """Trecho cronometrado da execução; `pai` é o id do span que o contém"""
+
+    def __init__(self, id, nome, pai, inicio, atributos):
+        self.id = id
+        self.nome = nome
+        self.pai = pai
+        self.inicio = inicio
+        self.fim = None
+        self.thread = threading.get_ident()
+        self.atributos = atributos
+
+
+class Rastreador:
+    """Coleta os spans de uma execução do scraper"""
+
+    def __init__(self, caminho=None):
+        # Sem caminho, salvar() grava em dados/rastros/<data e hora>.json
+        self.caminho = caminho
+        self._spans = []
+        self._ids = itertools.count(1)
+        # Span de quem descobriu cada URL, pai do span da unidade dessa URL
+        self._pais = {}
+        self._threads = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._origem = time.perf_counter()
+        # Mesmo instante no relógio de parede, para alinhar rastros de outros processos
+        self.inicio_epoch = time.time()
+        # Eventos Chrome importados de outros processos (trabalhadores distribuídos)
+        self._externos = []
+
+    def _agora(self):
+        return time.perf_counter() - self._origem
+
+    def _pilha(self):
+        pilha = getattr(self._local, 'pilha', None)
+        if pilha is None:
+            pilha = self._local.pilha = []
+        return pilha
+
+    def atual(self):
+        """Span ativo na thread atual, ou None"""
+        pilha = self._pilha()
+        return pilha[-1] if pilha else None
+
+    def iniciar(self, nome, pai=None, **atributos):
+        """Abre um span sem ativá-lo; o pai padrão é o span ativo na thread"""
+        if pai is None and self.atual():
+            pai = self.atual().id
+        span = Span(next(self._ids), nome, pai, self._agora(), atributos)
+        with self._lock:
+            self._spans.append(span)
+            self._threads.setdefault(span.thread, threading.current_thread().name)
+        return span
+
+    def finalizar(self, span, **atributos):
+        if span.fim is None:
+            span.fim = self._agora()
+        span.atributos.update(atributos)
+
+    def registrar(self, nome, segundos, pai=None, inicio=None, **atributos):
+        """Span já terminado, medido em outro lugar (por exemplo, num processo de análise)"""
+        span = self.iniciar(nome, pai, **atributos)
+        span.inicio = span.inicio - segundos if inicio is None else inicio
+        span.fim = span.inicio + segundos
+        return span
+
+    @contextmanager
+    def ativo(self, span):
+        self._pilha().append(span)
+        try:
+            yield span
+        finally:
+            self._pilha().pop()
+
+    @contextmanager
+    def span(self, nome, pai=None, **atributos):
+        """Span em torno de um bloco sem pausas de fluxo (`yield`) dentro"""
+        span = self.iniciar(nome, pai, **atributos)
+        try:
+            with self.ativo(span):
+                yield span
+        except BaseException as e:
+            span.atributos['erro'] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self.finalizar(span)
+
+    def rastrear_fluxo(self, fluxo, nome, pai=None, **atributos):
+        return FluxoRastreado(self, fluxo, self.iniciar(nome, pai, **atributos))
+
+    def vincular(self, url, span=None):
+        """Marca o span (padrão: o ativo) como pai da unidade que vai processar a URL"""
+        span = span or self.atual()
+        if span:
+            with self._lock:
+                self._pais[url] = span.id
+
+    def pai_de(self, url, padrao=None):
+        with self._lock:
+            return self._pais.pop(url, padrao)
+
+    def importar(self, eventos, inicio_epoch):
+        """Junta ao rastro os eventos Chrome de outro processo, cujo Rastreador começou em `inicio_epoch`"""
+        deslocamento = (inicio_epoch - self.inicio_epoch) * 1e6
+        with self._lock:
+            for evento in eventos:
+                if 'ts' in evento:
+                    evento = {**evento, 'ts': round(evento['ts'] + deslocamento, 1)}
+                self._externos.append(evento)
+
+    def exportar_chrome(self):
+        """Eventos completos ("X") e nomes das threads, em microssegundos"""
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self._spans)
+            threads = dict(self._threads)
+            externos = list(self._externos)
+        agora = self._agora()
+        eventos = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': nome}}
+            for tid, nome in threads.items()
+        ]
+        for span in spans:
+            fim = span.fim if span.fim is not None else agora
+            eventos.append({
+                'name': span.nome,
+                'cat': 'leilaovip',
+                'ph': 'X',
+                'ts': round(span.inicio * 1e6, 1),
+                'dur': round((fim - span.inicio) * 1e6, 1),
+                'pid': pid,
+                'tid': span.thread,
+                'args': {'id': span.id, 'pai': span.pai, **span.atributos},
+            })
+        return {'traceEvents': eventos + externos, 'displayTimeUnit': 'ms'}
+
+    def salvar(self, caminho=None):
+        caminho = caminho or self.caminho or os.path.join(
+            diretorio_rastros, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        )
+        os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump(self.exportar_chrome(), f)
+        logger.info(f"🧵 Rastro da execução salvo em {caminho} ({len(self._spans)} spans)")
+        return caminho
+
+
+class FluxoRastreado:
+    """Fluxo de unidade com o span dela ativo enquanto roda, em qualquer thread
+
+    Repassa send/throw/close ao gerador original; o span termina junto com
+    ele. As análises pedidas pelo fluxo levam o span como pai.
+    """
+
+    def __init__(self, rastreador, fluxo, span):
+        self.rastreador = rastreador
+        self.fluxo = fluxo
+        self.span = span
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self.send(None)
+
+    def send(self, valor):
+        return self._retomar(self.fluxo.send, valor)
+
+    def throw(self, excecao):
+        return self._retomar(self.fluxo.throw, excecao)
+
+    def close(self):
+        self.fluxo.close()
+        self.rastreador.finalizar(self.span)
+
+    def _retomar(self, metodo, argumento):
+        try:
+            with self.rastreador.ativo(self.span):
+                passo = metodo(argumento)
+        except StopIteration:
+            self.rastreador.finalizar(self.span)
+            raise
+        except BaseException as e:
+            self.rastreador.finalizar(self.span, erro=f"{type(e).__name__}: {e}")
+            raise
+        if isinstance(passo, Analise):
+            passo.rastro = (self.rastreador, self.span)
+        return passo
+
+
+class RastreadorInativo:
+    """Mesma interface do Rastreador, sem registrar nada (rastreamento desligado)"""
+
+    def atual(self):
+        return None
+
+    @contextmanager
+    def span(self, nome, pai=None, **atributos):
+        yield Span(0, nome, pai, 0.0, atributos)
+
+    def rastrear_fluxo(self, fluxo, nome, pai=None, **atributos):
+        return fluxo
+
+    def vincular(self, url, span=None):
+        pass
+
+    def pai_de(self, url, padrao=None):
+        return padrao
+
+    def importar(self, eventos, inicio_epoch):
+        pass
+
+    def salvar(self, caminho=None):
+        return None
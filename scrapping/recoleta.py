@@ -0,0 +1,269 @@
+"""
+Recoleta periódica dos leilões, mais frequente quanto mais perto da data do leilão
+
+A data de cada leilão sai do card da listagem. Depois de cada coleta, a
+próxima é marcada conforme a distância até essa data (`faixas_recoleta`),
+com uma variação aleatória (`jitter_recoleta`) para as recoletas não
+vencerem todas juntas. O AgendadorRecoleta roda dentro da API e, a cada
+rodada, enfileira um job com os leilões vencidos (os mais próximos da data
+primeiro e, entre eles, os de comitentes com maior prioridade) e os
+comitentes cujo intervalo de coleta venceu.
+"""
+
+import logging
+import os
+import random
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+arquivo_agenda = os.path.join('dados', 'agenda_recoleta.sqlite3')
+# Fronteira própria dos jobs do agendador, para não apagar a de um scraping iniciado pela API
+arquivo_fronteira_recoleta = os.path.join('dados', 'fronteira_recoleta.sqlite3')
+
+# (distância até o leilão, intervalo entre coletas), da faixa mais próxima para a mais distante
+faixas_recoleta = (
+    (timedelta(days=1), timedelta(hours=1)),
+    (timedelta(days=3), timedelta(hours=3)),
+    (timedelta(days=7), timedelta(hours=12)),
+    (timedelta(days=30), timedelta(days=1)),
+)
+# Leilões mais distantes que a última faixa, ou sem data no card
+intervalo_distante = timedelta(days=3)
+
+# Variação relativa do intervalo (0.1 = ±10%)
+jitter_recoleta = 0.1
+
+# Depois da data, o leilão ainda é recoletado por esse tempo (resultado, praça do dia)
+margem_encerrado = timedelta(days=1)
+
+# Espera até a nova tentativa de um leilão cuja coleta falhou
+intervalo_falha = timedelta(minutes=15)
+
+# Segundos entre as rodadas do agendador e leilões por rodada (o orçamento de requisições)
+intervalo_verificacao = 60
+max_leiloes_por_rodada = 50
+
+
+def faixa_recoleta(data_leilao, agora=None):
+    """(índice da faixa, intervalo até a próxima coleta); (None, None) para leilões encerrados"""
+    agora = agora or datetime.now()
+    if data_leilao is None:
+        return len(faixas_recoleta), intervalo_distante
+    distancia = data_leilao - agora
+    if distancia < -margem_encerrado:
+        return None, None
+    for indice, (limite, intervalo) in enumerate(faixas_recoleta):
+        if distancia <= limite:
+            return indice, intervalo
+    return len(faixas_recoleta), intervalo_distante
+
+
+class AgendaRecoleta:
+    """Leilões conhecidos em SQLite, com a data, a última coleta e a próxima"""
+
+    def __init__(self, caminho=arquivo_agenda, jitter=jitter_recoleta, aleatorio=None):
+        self.caminho = caminho
+        self.jitter = jitter
+        self.aleatorio = aleatorio or random.Random()
+        diretorio = os.path.dirname(caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        self._conexao = sqlite3.connect(caminho, timeout=30, check_same_thread=False)
+        self._conexao.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conexao:
+            self._conexao.execute("PRAGMA journal_mode=WAL")
+            self._conexao.execute("""
+                CREATE TABLE IF NOT EXISTS leiloes (
+                    url TEXT PRIMARY KEY,
+                    banco TEXT NOT NULL,
+                    data_leilao TEXT,
+                    ultima_coleta TEXT,
+                    proxima_coleta TEXT
+                )
+            """)
+            self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_leiloes_proxima ON leiloes (proxima_coleta)")
+
+    def _executar(self, sql, parametros=()):
+        with self._lock, self._conexao:
+            return self._conexao.execute(sql, parametros)
+
+    def registrar(self, banco, leiloes):
+        """Grava os leilões [(url, data ou None)] vistos na listagem; a data de um card sem data é mantida"""
+        with self._lock, self._conexao:
+            self._conexao.executemany(
+                "INSERT INTO leiloes (url, banco, data_leilao) VALUES (?, ?, ?) "
+                "ON CONFLICT (url) DO UPDATE SET banco = excluded.banco, "
+                "data_leilao = COALESCE(excluded.data_leilao, data_leilao)",
+                [(url, banco, data and data.isoformat()) for url, data in leiloes]
+            )
+
+    def coletado(self, url, agora=None):
+        """Marca a coleta do leilão e agenda a próxima pela faixa da data dele"""
+        agora = agora or datetime.now()
+        with self._lock:
+            linha = self._conexao.execute("SELECT data_leilao FROM leiloes WHERE url = ?", (url,)).fetchone()
+        if linha is None:
+            return None
+        data_leilao = linha['data_leilao'] and datetime.fromisoformat(linha['data_leilao'])
+        _, intervalo = faixa_recoleta(data_leilao, agora)
+        proxima = None
+        if intervalo:
+            proxima = agora + intervalo * self.aleatorio.uniform(1 - self.jitter, 1 + self.jitter)
+        self._executar(
+            "UPDATE leiloes SET ultima_coleta = ?, proxima_coleta = ? WHERE url = ?",
+            (agora.isoformat(), proxima and proxima.isoformat(), url)
+        )
+        return proxima
+
+    def falhou(self, url, agora=None):
+        """Coleta do leilão falhou: a última coleta fica como estava e a próxima vem em `intervalo_falha`
+
+        Uma recoleta já marcada para antes disso é mantida; um leilão encerrado continua fora da agenda.
+        """
+        agora = agora or datetime.now()
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT data_leilao, proxima_coleta FROM leiloes WHERE url = ?", (url,)
+            ).fetchone()
+        if linha is None:
+            return None
+        data_leilao = linha['data_leilao'] and datetime.fromisoformat(linha['data_leilao'])
+        faixa, _ = faixa_recoleta(data_leilao, agora)
+        if faixa is None:
+            return None
+        proxima = agora + intervalo_falha
+        if linha['proxima_coleta'] and linha['proxima_coleta'] > agora.isoformat():
+            proxima = min(proxima, datetime.fromisoformat(linha['proxima_coleta']))
+        self._executar("UPDATE leiloes SET proxima_coleta = ? WHERE url = ?", (proxima.isoformat(), url))
+        return proxima
+
+    def devidos(self, agora=None, limite=max_leiloes_por_rodada, prioridades=None):
+        """Leilões com a recoleta vencida, como (url, banco)
+
+        Ordem: faixa da data (mais perto do leilão primeiro), prioridade do
+        comitente (`prioridades`: banco → prioridade), data da próxima coleta.
+        """
+        agora = agora or datetime.now()
+        prioridades = prioridades or {}
+        with self._lock:
+            linhas = self._conexao.execute(
+                "SELECT url, banco, data_leilao, proxima_coleta FROM leiloes "
+                "WHERE proxima_coleta IS NOT NULL AND proxima_coleta <= ?",
+                (agora.isoformat(),)
+            ).fetchall()
+
+        devidos = []
+        for linha in linhas:
+            data_leilao = linha['data_leilao'] and datetime.fromisoformat(linha['data_leilao'])
+            faixa, _ = faixa_recoleta(data_leilao, agora)
+            if faixa is None:
+                # Encerrado desde a última coleta: sai da agenda
+                self._executar("UPDATE leiloes SET proxima_coleta = NULL WHERE url = ?", (linha['url'],))
+                continue
+            devidos.append((faixa, -prioridades.get(linha['banco'], 1), linha['proxima_coleta'], linha['url'], linha['banco']))
+        devidos.sort()
+        return [(url, banco) for _, _, _, url, banco in devidos[:limite]]
+
+    def listar(self, limite=100):
+        """Próximas recoletas agendadas, da mais próxima para a mais distante"""
+        with self._lock:
+            linhas = self._conexao.execute(
+                "SELECT url, banco, data_leilao, ultima_coleta, proxima_coleta FROM leiloes "
+                "WHERE proxima_coleta IS NOT NULL ORDER BY proxima_coleta LIMIT ?",
+                (limite,)
+            ).fetchall()
+        return [dict(linha) for linha in linhas]
+
+    def contagem(self):
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT COUNT(*), COUNT(proxima_coleta) FROM leiloes"
+            ).fetchone()
+        return {'leiloes': linha[0], 'agendados': linha[1]}
+
+    def fechar(self):
+        with self._lock:
+            self._conexao.close()
+
+
+class AgendadorRecoleta:
+    """Thread que enfileira as recoletas vencidas no gerenciador de jobs
+
+    `criar_scraper(bancos, leiloes)` monta o scraper do job: `bancos` são os
+    comitentes com o intervalo de coleta vencido e `leiloes` os (url, banco)
+    com a recoleta vencida. Comitentes nunca coletados só entram com
+    `coletar_nunca_coletados`; sem isso, a primeira coleta é manual. Uma
+    rodada não enfileira nada enquanto o job da rodada anterior ainda está em
+    execução.
+    """
+
+    def __init__(self, gerenciador_jobs, comitentes, agenda, criar_scraper, intervalo=intervalo_verificacao,
+                 max_leiloes=max_leiloes_por_rodada, coletar_nunca_coletados=False):
+        self.gerenciador_jobs = gerenciador_jobs
+        self.comitentes = comitentes
+        self.coletar_nunca_coletados = coletar_nunca_coletados
+        self.agenda = agenda
+        self.criar_scraper = criar_scraper
+        self.intervalo = intervalo
+        self.max_leiloes = max_leiloes
+        self.ultimo_job = None
+        self.ultima_rodada = None
+        self._parar = threading.Event()
+        self._thread = None
+
+    def iniciar(self):
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name='agendador-recoleta', daemon=True)
+        self._thread.start()
+        logger.info(f"⏰ Agendador de recoletas iniciado (rodadas a cada {self.intervalo}s)")
+
+    def parar(self):
+        self._parar.set()
+        if self._thread:
+            self._thread.join()
+
+    def _executar(self):
+        while not self._parar.wait(self.intervalo):
+            try:
+                self.executar_rodada()
+            except Exception as e:
+                logger.error(f"❌ Erro na rodada do agendador de recoletas: {e}")
+
+    def executar_rodada(self, agora=None):
+        """Enfileira um job com o que venceu; retorna o job, ou None se não havia nada a fazer"""
+        self.ultima_rodada = agora or datetime.now()
+        if self.ultimo_job and self.ultimo_job.estado in ('pendente', 'executando'):
+            return None
+
+        bancos = [
+            comitente.nome for comitente in self.comitentes.devidos(self.ultima_rodada, self.coletar_nunca_coletados)
+        ]
+        prioridades = {comitente.nome: comitente.prioridade for comitente in self.comitentes}
+        # Leilões de comitentes que serão coletados inteiros já entram pela listagem
+        leiloes = [
+            (url, banco) for url, banco in self.agenda.devidos(self.ultima_rodada, self.max_leiloes, prioridades)
+            if banco not in bancos
+        ]
+        if not bancos and not leiloes:
+            return None
+
+        self.ultimo_job = self.gerenciador_jobs.submeter(self.criar_scraper(bancos, leiloes))
+        logger.info(
+            f"⏰ Recoleta enfileirada (job {self.ultimo_job.id}): {len(bancos)} comitentes, {len(leiloes)} leilões"
+        )
+        return self.ultimo_job
+
+    def estado(self):
+        return {
+            'ativo': bool(self._thread and self._thread.is_alive()),
+            'intervalo_segundos': self.intervalo,
+            'coletar_nunca_coletados': self.coletar_nunca_coletados,
+            'max_leiloes_por_rodada': self.max_leiloes,
+            'ultima_rodada': self.ultima_rodada and self.ultima_rodada.isoformat(),
+            'ultimo_job': self.ultimo_job and self.ultimo_job.id,
+            **self.agenda.contagem(),
+        }
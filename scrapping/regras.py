@@ -0,0 +1,126 @@
+import re
+
+
+class Regra:
+    """Lista de termos compilada em uma única regex
+
+    Sem `caixa=True` a busca ignora maiúsculas/minúsculas, como o
+    `termo in texto.lower()` que ela substitui.
+    """
+
+    def __init__(self, *termos, caixa=False):
+        self.termos = termos
+        self.caixa = caixa
+        self.regex = re.compile('|'.join(re.escape(termo) for termo in termos), 0 if caixa else re.IGNORECASE)
+
+    def casa(self, texto):
+        return bool(texto) and self.regex.search(texto) is not None
+
+    def primeiro_termo(self, texto):
+        """Índice do primeiro termo declarado que aparece no texto, ou None"""
+        if not self.casa(texto):
+            return None
+        comparavel = texto if self.caixa else texto.lower()
+        for indice, termo in enumerate(self.termos):
+            if (termo if self.caixa else termo.lower()) in comparavel:
+                return indice
+        return None
+
+
+class RegrasPagina:
+    """Padrões de link, exclusões e indicadores de contexto de um tipo de página"""
+
+    def __init__(self, links=None, contexto=None, excluir=None):
+        self.links = Regra(*links) if links else None
+        self.contexto = Regra(*contexto) if contexto else None
+        self.excluir = Regra(*excluir) if excluir else None
+
+    def link_candidato(self, href):
+        if self.links and not self.links.casa(href):
+            return False
+        return not (self.excluir and self.excluir.casa(href))
+
+    def contexto_valido(self, texto):
+        return self.contexto is None or self.contexto.casa(texto)
+
+
+# Listagem de leilões (resposta AJAX da agenda)
+regras_cards = RegrasPagina(
+    links=('/leilao', '/evento', '/detalhes'),
+    contexto=('leilão', 'lotes', 'extrajudicial', 'bradesco', 'r$', 'lance', 'imóvel'),
+)
+
+# Busca alternativa na página de agenda
+regras_alternativos = RegrasPagina(
+    links=('leilao', 'evento', 'detalhes'),
+    excluir=('facebook', 'twitter', 'instagram', 'youtube', 'tiktok', 'blog'),
+)
+
+# Paginação da listagem de leilões
+regra_paginacao = Regra('pagination', 'paginacao', 'paginação', 'pager')
+
+# Página do leilão / ofertas
+regra_ofertas = Regra('ofertas', 'lances')
+regras_lotes = RegrasPagina(links=('/lote', '/item', '/imovel'))
+regra_exemplos_lotes = Regra('/lote', '/item', '/imovel', '/anuncio')
+regra_ajax_lotes = Regra('lote', 'item', 'imovel', 'pesquisar')
+
+# Busca ampla por cards de lotes
+regra_classes_card = Regra('card', 'item', 'lote', 'imovel', 'property')
+regras_cards_lote = RegrasPagina(
+    contexto=('r$', 'lote', 'lance', 'm²', 'm2', 'casa', 'apartamento',
+              'terreno', 'sala', 'loja', 'galpão', 'local:', 'avaliação'),
+    excluir=('agenda', 'login', 'cadastro', 'blog', '#'),
+)
+
+
+class RegrasMatricula:
+    """Escolhe o link da matrícula em uma única passada pelos <a> da página
+
+    As prioridades reproduzem as estratégias sequenciais anteriores:
+    1. texto do link contém "matrícula" (qualquer caixa);
+    2. texto do link contém uma das variações, na ordem declarada;
+    3. href ou texto contém "matricula"/"matrícula";
+    4. href contém "pdf".
+    Em cada prioridade vence o primeiro link na ordem do documento.
+    """
+
+    texto = Regra('matrícula')
+    variacoes = Regra('matricula', 'Matricula', 'MATRICULA', 'matrícula', 'Matrícula', 'MATRÍCULA', caixa=True)
+    href_ou_texto = Regra('matricula', 'matrícula')
+    pdf = Regra('pdf')
+    documento = Regra('pdf', 'doc', 'matricula', 'download')
+
+    def classificar(self, link, href, texto):
+        """Retorna (estratégia, subprioridade) do link, ou None"""
+        string = link.string
+        if string is not None:
+            if self.texto.casa(string):
+                return (1, 0)
+            termo = self.variacoes.primeiro_termo(str(string))
+            if termo is not None:
+                return (2, termo)
+
+        if href is None:
+            return None
+        if self.href_ou_texto.casa(href) or self.href_ou_texto.casa(texto):
+            return (3, 0)
+        if self.pdf.casa(href):
+            return (4, 0)
+        return None
+
+    def melhor_link(self, links):
+        """Retorna (link, (estratégia, subprioridade)) ou (None, None)"""
+        melhor, melhor_rank = None, None
+        for link in links:
+            href = link.get('href')
+            texto = link.get_text(strip=True) if href is not None else ''
+            rank = self.classificar(link, href, texto)
+            if rank and (melhor_rank is None or rank < melhor_rank):
+                melhor, melhor_rank = link, rank
+                if rank == (1, 0):
+                    break  # Nenhum link posterior supera a estratégia 1
+        return melhor, melhor_rank
+
+
+regras_matricula = RegrasMatricula()
@@ -0,0 +1,152 @@
+import logging
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+
+from scrapping import metricas
+from scrapping.concorrencia import LimitadorConcorrencia
+from scrapping.limitador import LimitadorTaxa
+from scrapping.rastreamento import RastreadorInativo
+from scrapping.transporte import Disjuntor, PoliticaRetentativas, criar_adaptador, timeout_padrao
+
+logger = logging.getLogger(__name__)
+
+
+class ContadorRequisicoes:
+    """Requisições enviadas à rede por uma operação, de qualquer thread (hits de cache não contam)
+
+    Passado como `contador=` em cada chamada da sessão que faz parte da operação.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def somar(self):
+        with self._lock:
+            self.total += 1
+
+
+class SessaoScraper(requests.Session):
+    """Sessão HTTP compartilhada por todas as etapas do scraper
+
+    Cada tentativa passa pelo disjuntor do host, pelo limitador de taxa e
+    por uma vaga de concorrência; GETs que falham por conexão, timeout ou
+    status transitório são repetidos com backoff exponencial e jitter.
+    `adaptador` substitui o acesso direto à rede (gravação ou reprodução,
+    em `scrapping/gravacao.py`); com um `rastreador`, cada tentativa vira um span.
+    """
+
+    def __init__(self, concorrencia=None, limitador_taxa=None, cache=None, retentativas=None, disjuntor=None,
+                 timeout=timeout_padrao, adaptador=None, rastreador=None):
+        super().__init__()
+        self.concorrencia = concorrencia or LimitadorConcorrencia()
+        self.limitador_taxa = limitador_taxa or LimitadorTaxa()
+        self.cache = cache
+        self.retentativas = retentativas or PoliticaRetentativas()
+        self.disjuntor = disjuntor or Disjuntor()
+        self.rastreador = rastreador or RastreadorInativo()
+        # Sem timeout, uma conexão travada prende o worker para sempre
+        self.timeout = timeout
+
+        # Reproduzindo uma gravação não há servidor para poupar: sem limite de taxa nem esperas
+        self.sem_rede = getattr(adaptador, 'sem_rede', False)
+
+        # O pool de conexões precisa comportar todas as requisições simultâneas
+        adaptador = adaptador or criar_adaptador(self.concorrencia.max_global)
+        self.mount('http://', adaptador)
+        self.mount('https://', adaptador)
+
+    def request(self, method, url, *args, contador=None, **kwargs):
+        # Downloads em streaming (PDFs) não passam pelo cache
+        if self.cache is None or kwargs.get('stream') or args:
+            return self._enviar(method, url, *args, contador=contador, **kwargs)
+
+        chave = self.cache.chave(method, url, kwargs.get('params'), kwargs.get('data'))
+        entrada = self.cache.buscar(chave)
+
+        if entrada and self.cache.fresca(entrada):
+            self.cache.contar('hits')
+            return self.cache.resposta(entrada)
+
+        if entrada:
+            kwargs['headers'] = {**(kwargs.get('headers') or {}), **self.cache.headers_condicionais(entrada)}
+
+        response = self._enviar(method, url, contador=contador, **kwargs)
+
+        if entrada and response.status_code == 304:
+            self.cache.contar('revalidacoes')
+            self.cache.renovar(chave, entrada)
+            return self.cache.resposta(entrada, response.request)
+
+        self.cache.contar('misses')
+        if self.cache.cacheavel(response):
+            self.cache.salvar(chave, response)
+        return response
+
+    def _enviar(self, method, url, *args, contador=None, **kwargs):
+        if not args:
+            kwargs.setdefault('timeout', self.timeout)
+
+        tentativa = 1
+        while True:
+            try:
+                response = self._tentar(method, url, *args, contador=contador, **kwargs)
+            except requests.RequestException as e:
+                if not (self.retentativas.permite(method, tentativa) and self.retentativas.erro_retentavel(e)):
+                    raise
+                motivo = type(e).__name__
+            else:
+                if not (self.retentativas.permite(method, tentativa) and self.retentativas.status_retentavel(response.status_code)):
+                    return response
+                motivo = f"HTTP {response.status_code}"
+                response.close()
+
+            espera = 0 if self.sem_rede else self.retentativas.espera(tentativa)
+            logger.warning(f"🔁 {motivo} em {url}, nova tentativa ({tentativa + 1}/{self.retentativas.tentativas}) em {espera:.1f}s")
+            time.sleep(espera)
+            tentativa += 1
+
+    def _tentar(self, method, url, *args, contador=None, **kwargs):
+        """Uma tentativa: disjuntor, token do limitador e vaga de concorrência"""
+        teste = self.disjuntor.permitir(url)
+        try:
+            if not self.sem_rede:
+                self.limitador_taxa.adquirir(url)
+            if contador is not None:
+                contador.somar()
+
+            host = urlparse(url).netloc
+            with self.concorrencia.slot(url), self.rastreador.span('http', metodo=method.upper(), url=url) as span:
+                metricas.requisicoes_em_andamento.inc(host=host)
+                inicio = time.monotonic()
+                try:
+                    response = super().request(method, url, *args, **kwargs)
+                    span.atributos['status'] = response.status_code
+                except requests.RequestException:
+                    metricas.requisicoes_http.inc(host=host, status='erro')
+                    self.limitador_taxa.registrar_falha(url, time.monotonic() - inicio)
+                    self.disjuntor.registrar_falha(url)
+                    raise
+                finally:
+                    metricas.requisicoes_em_andamento.dec(host=host)
+
+            decorrido = time.monotonic() - inicio
+            metricas.requisicoes_http.inc(host=host, status=response.status_code)
+            metricas.latencia_busca.observar(decorrido, host=host)
+            self.limitador_taxa.registrar_resposta(
+                url, response.status_code, decorrido, response.headers.get('Retry-After')
+            )
+            if response.status_code >= 500:
+                self.disjuntor.registrar_falha(url)
+            else:
+                self.disjuntor.registrar_sucesso(url)
+            return response
+        except BaseException:
+            # O teste do disjuntor interrompido antes do resultado (limitador, vaga de concorrência, erro
+            # fora do requests) é liberado; senão o host ficaria com o circuito aberto até o fim do processo
+            if teste:
+                self.disjuntor.liberar_teste(url)
+            raise
@@ -0,0 +1,142 @@
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# (conexão, leitura) em segundos; a leitura vale por chunk, não pelo download inteiro
+timeout_padrao = (10, 30)
+
+# Só métodos idempotentes são repetidos automaticamente
+metodos_idempotentes = frozenset({'GET', 'HEAD', 'OPTIONS'})
+status_retentaveis = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitoAbertoError(requests.ConnectionError):
+    """O host falhou seguidamente e está em pausa; a requisição nem foi enviada"""
+
+
+def criar_adaptador(max_conexoes, hosts=10):
+    """Adaptador com um pool por host comportando todas as requisições simultâneas"""
+    return HTTPAdapter(pool_connections=hosts, pool_maxsize=max(10, max_conexoes))
+
+
+class PoliticaRetentativas:
+    """Quando e quanto esperar antes de repetir uma requisição
+
+    A espera cresce exponencialmente (`base` * 2^(tentativa-1), até `maximo`)
+    e é sorteada entre zero e esse valor (full jitter), para que workers que
+    falharam juntos não voltem todos no mesmo instante.
+    """
+
+    def __init__(self, tentativas=3, base=0.5, maximo=30.0, metodos=metodos_idempotentes, status=status_retentaveis):
+        self.tentativas = tentativas
+        self.base = base
+        self.maximo = maximo
+        self.metodos = metodos
+        self.status = status
+
+    def permite(self, method, tentativa):
+        return method.upper() in self.metodos and tentativa < self.tentativas
+
+    def erro_retentavel(self, erro):
+        if isinstance(erro, CircuitoAbertoError):
+            return False
+        return isinstance(erro, (requests.ConnectionError, requests.Timeout))
+
+    def status_retentavel(self, status_code):
+        return status_code in self.status
+
+    def espera(self, tentativa):
+        return random.uniform(0, min(self.maximo, self.base * 2 ** (tentativa - 1)))
+
+
+class CircuitoHost:
+    """Estado do disjuntor de um host"""
+
+    def __init__(self):
+        self.falhas = 0
+        self.aberto_ate = 0.0
+        self.pausa = 0.0
+        self.testando = False
+
+
+class Disjuntor:
+    """Disjuntor (circuit breaker) por host
+
+    Depois de `limiar_falhas` falhas seguidas (erros de conexão, timeouts ou
+    5xx) o host fica `pausa` segundos sem receber requisições: elas falham na
+    hora com CircuitoAbertoError. Passada a pausa, uma única requisição de
+    teste é liberada; se ela falhar, a pausa dobra (até `pausa_maxima`).
+    """
+
+    def __init__(self, limiar_falhas=5, pausa=30.0, pausa_maxima=300.0):
+        self.limiar_falhas = limiar_falhas
+        self.pausa_inicial = pausa
+        self.pausa_maxima = pausa_maxima
+        self._circuitos = {}
+        self._lock = threading.Lock()
+
+    def _circuito(self, url):
+        host = urlparse(url).netloc
+        circuito = self._circuitos.get(host)
+        if circuito is None:
+            circuito = self._circuitos[host] = CircuitoHost()
+        return host, circuito
+
+    def permitir(self, url):
+        """Levanta CircuitoAbertoError se o host estiver em pausa; retorna True para a requisição de teste
+
+        Quem recebe True precisa registrar o resultado (registrar_sucesso ou
+        registrar_falha) ou chamar liberar_teste; senão o host não é mais testado.
+        """
+        with self._lock:
+            host, circuito = self._circuito(url)
+            if circuito.falhas < self.limiar_falhas:
+                return False
+            restante = circuito.aberto_ate - time.monotonic()
+            if restante > 0 or circuito.testando:
+                raise CircuitoAbertoError(f"Circuito aberto para {host} ({max(restante, 0):.0f}s restantes)")
+            # Meio-aberto: esta requisição testa se o host voltou
+            circuito.testando = True
+            return True
+
+    def liberar_teste(self, url):
+        """A requisição de teste terminou sem resultado (interrompida antes da resposta): outra pode testar"""
+        with self._lock:
+            _, circuito = self._circuito(url)
+            circuito.testando = False
+
+    def registrar_sucesso(self, url):
+        with self._lock:
+            host, circuito = self._circuito(url)
+            if circuito.falhas >= self.limiar_falhas:
+                logger.info(f"🔌 Circuito fechado para {host}")
+            circuito.falhas = 0
+            circuito.pausa = 0.0
+            circuito.testando = False
+
+    def registrar_falha(self, url):
+        with self._lock:
+            host, circuito = self._circuito(url)
+            circuito.falhas += 1
+            if circuito.falhas < self.limiar_falhas:
+                return
+            circuito.pausa = min(self.pausa_maxima, circuito.pausa * 2 if circuito.pausa else self.pausa_inicial)
+            circuito.aberto_ate = time.monotonic() + circuito.pausa
+            circuito.testando = False
+            logger.warning(f"🔌 Circuito aberto para {host} por {circuito.pausa:.0f}s após {circuito.falhas} falhas seguidas")
+
+    def estado(self):
+        """Hosts com falhas recentes: falhas seguidas e segundos de pausa restantes"""
+        agora = time.monotonic()
+        with self._lock:
+            return {
+                host: {'falhas': circuito.falhas, 'aberto_por': round(max(0.0, circuito.aberto_ate - agora), 1)}
+                for host, circuito in self._circuitos.items() if circuito.falhas
+            }
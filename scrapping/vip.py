@@ -1,34 +1,189 @@
-import requests
-from bs4 import BeautifulSoup
 import time
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from urllib.parse import urljoin, urlparse
 import logging
 
+from scrapping.analise import (
+    analisar_cards_lotes, analisar_lote, analisar_leilao, analisar_links_ajax, detectar_total_paginas,
+    extrair_data_leilao, url_base
+)
+from scrapping.armazem import ArmazemPDFs
+from scrapping.cache_http import CacheHTTP
+from scrapping.catalogo import CatalogoPDFs
+from scrapping.comitentes import EscalonadorComitentes, RegistroComitentes
+from scrapping.concorrencia import LimitadorConcorrencia, concorrencia_por_host
+from scrapping.deduplicacao import ConjuntoImpressoes, impressao_url
+from scrapping.distribuicao import executar_trabalhadores_locais
+from scrapping.download import baixar_arquivo
+from scrapping.estrategias import MemoriaEstrategias
+from scrapping.eventos import BarramentoEventos
+from scrapping.filtro import FiltroPalavrasChave
+from scrapping.fronteira import FronteiraCrawl, duracao_lease
+from scrapping.indice import IndiceDownloads, diretorio_pdfs
+from scrapping.limitador import LimitadorTaxa
+from scrapping import metricas
+from scrapping.parser import criar_soup
+from scrapping.pipeline import Analise, Pipeline, executar_fluxo, para_download
+from scrapping.rastreamento import Rastreador, RastreadorInativo
+from scrapping.recoleta import AgendaRecoleta
+from scrapping.regras import regras_alternativos, regras_cards, regras_matricula
+from scrapping.sessao import ContadorRequisicoes, SessaoScraper
+
 # Configuração de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 palavra_chave = "Extrajudicial"
 
-# URLs dos bancos
-bancos = {
-    "bradesco": "https://www.leilaovip.com.br/agenda?Filtro.ComitenteId=8936579c-897d-425c-a252-b18c011710bf",
-    "banco_pan": "https://www.leilaovip.com.br/agenda?Filtro.ComitenteId=ddbba3da-1e3b-46f6-8f6c-b18e012f43d7",
-    "bv": "https://www.leilaovip.com.br/agenda?Filtro.ComitenteId=729ccab8-f1ba-4ce6-85ce-b18c0114503a"
-}
+# Limite de páginas da listagem de leilões de um comitente
+max_paginas_agenda = 50
+
+
+class ListagemIncompleta(Exception):
+    """Páginas da listagem que falharam; `links` traz os leilões das páginas que vieram"""
+    
+    def __init__(self, links, falhas):
+        descricao = ', '.join(f"{numero} ({erro})" for numero, erro in falhas)
+        super().__init__(f"{len(falhas)} páginas da listagem falharam: {descricao}")
+        self.links = links
+        self.falhas = falhas
 
 class LeilaoVipScraper:
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, max_workers=1, max_por_host=concorrencia_por_host, limitador_taxa=None, usar_cache=True,
+                 backend_html=None, filtro_palavras=None, eventos=None, fronteira=None, retomar=False,
+                 catalogo=None, processos_analise=0, memoria_estrategias=None, gravacao=None, rastreador=None,
+                 comitentes=None, bancos=None, trabalhadores=0, lease=duracao_lease, leiloes=None, agenda=None,
+                 vistos=None):
+        # max_workers > 1 ativa o motor concorrente em executar_scraping
+        self.max_workers = max_workers
+        # processos_analise > 0 ativa o pipeline: busca → análise em processos → download
+        self.processos_analise = processos_analise
+        self.estatisticas_pipeline = None
+        # trabalhadores > 0: processos que reivindicam unidades da fronteira com reservas de `lease` segundos
+        self.trabalhadores = trabalhadores
+        self.lease = lease
+        # 'lxml' (padrão) ou 'html.parser'
+        self.backend_html = backend_html
+        # Filtro dos lotes; por padrão, apenas a palavra_chave do módulo
+        self.filtro_palavras = filtro_palavras or FiltroPalavrasChave([palavra_chave])
+        # O limitador de taxa por host substitui as pausas fixas entre requisições
+        self.limitador_taxa = limitador_taxa or LimitadorTaxa()
+        # Cache em disco das páginas de listagem, leilões e lotes entre execuções
+        self.cache_http = CacheHTTP() if usar_cache else None
+        # Índice, armazém, fronteira, agenda e memória de estratégias leem o disco ao serem criados:
+        # ficam para o primeiro uso, já na thread do job (os recebidos prontos entram aqui)
+        self._recursos = {'memoria_estrategias': memoria_estrategias, 'agenda': agenda, 'fronteira': fronteira}
+        self._lock_recursos = threading.Lock()
+        # GravadorHTTP grava todas as trocas com o site; ReprodutorHTTP as serve de volta sem rede
+        self.gravacao = gravacao
+        # Rastreador(): spans de cada etapa, salvos em JSON (Chrome Trace) ao fim da execução
+        self.rastreador = rastreador or RastreadorInativo()
+        self.span_execucao = None
+        # Comitentes de comitentes.json; a execução coleta os nomes em `bancos` ou, sem eles, todos os ativos
+        self.comitentes = comitentes or RegistroComitentes()
+        self.bancos = bancos
+        self.bancos_execucao = []
+        self.escalonador = None
+        # Leilões (url, banco) coletados sem a listagem do comitente: as recoletas do agendador
+        self.leiloes = leiloes or []
+        self.datas_leiloes = {}
+        self.session = SessaoScraper(
+            LimitadorConcorrencia(max(1, max_workers), max_por_host), self.limitador_taxa, self.cache_http,
+            adaptador=gravacao, rastreador=self.rastreador
+        )
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
-        self.links_processados = set()  # Para evitar duplicatas
+        # Impressões das URLs canônicas já vistas, para evitar duplicatas: ConjuntoImpressoes (exato)
+        # ou FiltroBloom (memória fixa, salvo em disco ao fim da execução)
+        self.links_processados = vistos if vistos is not None else ConjuntoImpressoes()
+        # Metadados de cada PDF gravado, servidos pelo GET /pdfs
+        self.catalogo = catalogo or CatalogoPDFs()
         self.pdfs_baixados = []
+        # Contadores de andamento, lidos pela API enquanto o scraping roda
+        self.progresso = {'leiloes': 0, 'lotes': 0, 'lotes_processados': 0, 'pdfs': 0}
+        self._lock = threading.Lock()
+        # Eventos estruturados da execução (leilões, lotes, PDFs), transmitidos pela API
+        self.eventos = eventos or BarramentoEventos()
+        self.retomar = retomar
+    
+    def _recurso(self, nome, criar):
+        """Recurso criado no primeiro uso; o lock evita duas instâncias quando várias threads chegam juntas"""
+        recurso = self._recursos.get(nome)
+        if recurso is None:
+            with self._lock_recursos:
+                recurso = self._recursos.get(nome)
+                if recurso is None:
+                    recurso = self._recursos[nome] = criar()
+        return recurso
+    
+    @property
+    def indice_downloads(self):
+        return self._recurso(
+            'indice_downloads', lambda: IndiceDownloads(diretorio_pdfs, bancos_conhecidos=self.comitentes.urls())
+        )
+    
+    @property
+    def armazem(self):
+        return self._recurso('armazem', lambda: ArmazemPDFs(diretorio_pdfs))
+    
+    @property
+    def fronteira(self):
+        """Fronteira persistente: retomar=True continua de onde a última execução parou"""
+        return self._recurso('fronteira', FronteiraCrawl)
+    
+    @property
+    def agenda(self):
+        """Data de cada leilão (do card) e próxima recoleta, usadas pelo AgendadorRecoleta"""
+        return self._recurso('agenda', AgendaRecoleta)
+    
+    @property
+    def memoria_estrategias(self):
+        """Estratégia de listagem que funcionou por host/comitente, testada primeiro"""
+        return self._recurso('memoria_estrategias', MemoriaEstrategias)
         
+    def emitir(self, tipo, **dados):
+        """Publica um evento de andamento"""
+        self.eventos.publicar(tipo, **dados)
+    
+    def registrar_falha(self, url, erro):
+        """Marca a unidade como falha na fronteira, para ser repetida ao retomar"""
+        self.fronteira.falhar(url, erro)
+    
+    def contar(self, campo, quantidade=1):
+        """Atualiza um contador de progresso"""
+        with self._lock:
+            self.progresso[campo] += quantidade
+    
+    def registrar_link(self, link):
+        """Marca o link como processado; retorna False se ele (ou uma variante da mesma URL) já era conhecido"""
+        impressao = impressao_url(link)
+        with self._lock:
+            return self.links_processados.adicionar(impressao)
+    
+    def link_novo(self, link, vistos):
+        """Se o link é novo para a unidade em andamento; `vistos` guarda as impressões já achadas nela
+        
+        Não consulta os links processados: os já conhecidos de outras unidades
+        saem em fluxo_unidade, com registrar_link. Assim uma unidade repetida
+        percorre de novo as páginas que já tinham sido vistas.
+        """
+        impressao = impressao_url(link)
+        if impressao in vistos:
+            return False
+        vistos.add(impressao)
+        return True
+    
+    def criar_soup(self, conteudo, filtro=None):
+        """Faz o parsing com o backend configurado, montando só o que a etapa precisa"""
+        tipo = filtro or 'listagem'
+        with metricas.tempo_analise.cronometrar(tipo=tipo), self.rastreador.span('montar_soup', tipo=tipo):
+            return criar_soup(conteudo, filtro, self.backend_html)
+    
     def aguardar_entre_requests(self, segundos=2):
-        """Evita sobrecarregar o servidor"""
+        """Pausa fixa para scripts de teste (o scraper usa o limitador de taxa)"""
         time.sleep(segundos)
     
     def extrair_cards_leiloes(self, url):
@@ -36,7 +191,7 @@ class LeilaoVipScraper:
         try:
             response = self.session.get(url)
             response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = self.criar_soup(response.content, 'agenda')
             
             links_leiloes = []
             base_url = '/'.join(url.split('/')[:3])  # https://www.leilaovip.com.br
@@ -61,28 +216,127 @@ class LeilaoVipScraper:
                     self.try_direct_search
                 ]
                 
+                # A estratégia que funcionou da última vez para o host/comitente vai na frente
+                chave_estrategia = f"{parsed_url.netloc}|{params.get('Filtro.ComitenteId', [''])[0]}"
+                preferida = self.memoria_estrategias.preferida(chave_estrategia)
+                if preferida:
+                    strategies.sort(key=lambda strategy: strategy.__name__ != preferida)
+                
+                # Requisições gastas em estratégias que não funcionaram
+                requisicoes_alternativas = 0
+                # Páginas que falharam na estratégia que funcionou
+                incompleta = None
+                
                 for strategy in strategies:
-                    try:
-                        links_leiloes = strategy(base_url, ajax_url, params)
-                        if links_leiloes:
-                            logger.info(f"✅ Estratégia {strategy.__name__} funcionou!")
-                            break
-                    except Exception as e:
-                        logger.warning(f"⚠️  Estratégia {strategy.__name__} falhou: {e}")
+                    # Conta as requisições da estratégia em qualquer thread (as páginas vêm em paralelo)
+                    contador = ContadorRequisicoes()
+                    with self.rastreador.span('estrategia_listagem', estrategia=strategy.__name__) as span:
+                        try:
+                            links_leiloes = strategy(base_url, ajax_url, params, contador, set())
+                            resultado = 'sucesso' if links_leiloes else 'sem_leiloes'
+                        except ListagemIncompleta as e:
+                            # A estratégia serve; as páginas que faltaram ficam para a repetição da unidade
+                            logger.warning(f"⚠️  Estratégia {strategy.__name__} incompleta: {e}")
+                            links_leiloes = e.links
+                            incompleta = e
+                            resultado = 'incompleta'
+                        except Exception as e:
+                            logger.warning(f"⚠️  Estratégia {strategy.__name__} falhou: {e}")
+                            resultado = 'erro'
+                        span.atributos['resultado'] = resultado
+                    metricas.estrategias_listagem.inc(estrategia=strategy.__name__, resultado=resultado)
+                    
+                    if links_leiloes:
+                        logger.info(f"✅ Estratégia {strategy.__name__} funcionou!")
+                        if strategy.__name__ == preferida:
+                            economizadas = self.memoria_estrategias.acertou(chave_estrategia)
+                            logger.info(f"🧠 Estratégia memorizada acertou, {economizadas} requisições economizadas")
+                        else:
+                            self.memoria_estrategias.registrar(chave_estrategia, strategy.__name__, requisicoes_alternativas)
+                        break
+                    
+                    if strategy.__name__ == preferida:
+                        logger.info(f"🧠 Estratégia memorizada {preferida} não trouxe leilões, voltando às alternativas")
+                        self.memoria_estrategias.errou(chave_estrategia)
+                    else:
+                        requisicoes_alternativas += contador.total
             
             # Se não encontrou via AJAX, tenta buscar padrões específicos
             if not links_leiloes:
                 logger.info("🔎 Tentando buscar padrões específicos...")
-                links_leiloes = self.buscar_links_alternativos(soup, base_url)
+                links_leiloes = self.buscar_links_alternativos(self.criar_soup(response.content), base_url, set())
             
+            if incompleta:
+                # Os leilões achados seguem; a fronteira repete a agenda para buscar as páginas que faltaram
+                self.registrar_falha(url, incompleta)
+            
+            self.contar('leiloes', len(links_leiloes))
             return links_leiloes
             
         except Exception as e:
             logger.error(f"Erro ao extrair cards de leilões: {e}")
+            self.registrar_falha(url, e)
             return []
 
-    def try_ajax_get_with_params(self, base_url, ajax_url, params):
+    def paginar_cards(self, buscar_pagina, base_url, vistos):
+        """Cards de todas as páginas da listagem, buscando as páginas 2 em diante em paralelo
+        
+        `buscar_pagina(numero)` retorna o soup da página e `vistos` as impressões
+        dos cards já achados. Com a paginação
+        detectada na página 1, as demais são buscadas de uma vez; sem ela, em
+        janelas do tamanho da concorrência. Para na primeira página sem cards novos;
+        uma página que falhou não para a busca e, no fim, vira ListagemIncompleta.
+        """
+        soup_primeira = buscar_pagina(1)
+        links_leiloes = self.processar_cards_html(soup_primeira, base_url, vistos)
+        if not links_leiloes:
+            return links_leiloes
+        
+        total_paginas = detectar_total_paginas(soup_primeira)
+        if total_paginas is not None and total_paginas <= 1:
+            return links_leiloes
+        
+        ultima = min(total_paginas or max_paginas_agenda, max_paginas_agenda)
+        janela = ultima - 1 if total_paginas else max(2, self.session.concorrencia.max_global)
+        descricao_total = f"{total_paginas} páginas" if total_paginas else "total de páginas desconhecido"
+        logger.info(f"📚 Listagem paginada ({descricao_total}), buscando {janela} páginas por vez")
+        
+        proxima = 2
+        falhas = []
+        with ThreadPoolExecutor(max_workers=max(2, self.session.concorrencia.max_global)) as executor:
+            while proxima <= ultima:
+                paginas = list(range(proxima, min(proxima + janela, ultima + 1)))
+                futuros = [executor.submit(buscar_pagina, numero) for numero in paginas]
+                
+                fim = False
+                for numero, futuro in zip(paginas, futuros):
+                    try:
+                        novos = self.processar_cards_html(futuro.result(), base_url, vistos)
+                    except Exception as e:
+                        logger.warning(f"⚠️  Página {numero} da listagem falhou: {e}")
+                        falhas.append((numero, e))
+                        continue
+                    
+                    logger.info(f"📄 Página {numero}: {len(novos)} leilões novos")
+                    if not novos:
+                        # As páginas seguintes já buscadas são descartadas
+                        for pendente in futuros:
+                            pendente.cancel()
+                        fim = True
+                        break
+                    links_leiloes.extend(novos)
+                
+                if fim:
+                    break
+                proxima = paginas[-1] + 1
+        
+        if falhas:
+            raise ListagemIncompleta(links_leiloes, falhas)
+        return links_leiloes
+    
+    def try_ajax_get_with_params(self, base_url, ajax_url, params, contador=None, vistos=None):
         """Estratégia 1: GET com parâmetros"""
+        vistos = set() if vistos is None else vistos
         ajax_full_url = urljoin(base_url, ajax_url)
         if params:
             import urllib.parse
@@ -91,15 +345,18 @@ class LeilaoVipScraper:
         
         logger.info(f"📡 Estratégia GET: {ajax_full_url}")
         
-        ajax_response = self.session.get(ajax_full_url)
-        ajax_response.raise_for_status()
-        ajax_soup = BeautifulSoup(ajax_response.content, 'html.parser')
+        def buscar_pagina(numero):
+            url_pagina = ajax_full_url if numero == 1 else f"{ajax_full_url}&Filtro.CurrentPage={numero}"
+            ajax_response = self.session.get(url_pagina, contador=contador)
+            ajax_response.raise_for_status()
+            logger.info(f"✅ Resposta recebida (página {numero}): {len(ajax_response.content)} bytes")
+            return self.criar_soup(ajax_response.content)
         
-        logger.info(f"✅ Resposta recebida: {len(ajax_response.content)} bytes")
-        return self.processar_cards_html(ajax_soup, base_url)
+        return self.paginar_cards(buscar_pagina, base_url, vistos)
 
-    def try_ajax_post_form(self, base_url, ajax_url, params):
+    def try_ajax_post_form(self, base_url, ajax_url, params, contador=None, vistos=None):
         """Estratégia 2: POST simulando formulário"""
+        vistos = set() if vistos is None else vistos
         ajax_full_url = urljoin(base_url, ajax_url)
         
         # Dados do formulário baseados na estrutura HTML
@@ -120,16 +377,19 @@ class LeilaoVipScraper:
         logger.info(f"📡 Estratégia POST: {ajax_full_url}")
         logger.info(f"📊 Dados do formulário: {form_data}")
         
-        ajax_response = self.session.post(ajax_full_url, data=form_data)
-        ajax_response.raise_for_status()
-        ajax_soup = BeautifulSoup(ajax_response.content, 'html.parser')
+        def buscar_pagina(numero):
+            ajax_response = self.session.post(
+                ajax_full_url, data={**form_data, 'Filtro.CurrentPage': str(numero)}, contador=contador
+            )
+            ajax_response.raise_for_status()
+            logger.info(f"✅ Resposta POST recebida (página {numero}): {len(ajax_response.content)} bytes")
+            return self.criar_soup(ajax_response.content)
         
-        logger.info(f"✅ Resposta POST recebida: {len(ajax_response.content)} bytes")
-        
-        return self.processar_cards_html(ajax_soup, base_url)
+        return self.paginar_cards(buscar_pagina, base_url, vistos)
 
-    def try_direct_search(self, base_url, ajax_url, params):
+    def try_direct_search(self, base_url, ajax_url, params, contador=None, vistos=None):
         """Estratégia 3: Busca direta por URLs conhecidas"""
+        vistos = set() if vistos is None else vistos
         logger.info("📡 Estratégia busca direta")
         
         # Tenta URLs diretas baseadas em padrões conhecidos
@@ -150,11 +410,11 @@ class LeilaoVipScraper:
         for url_direta in urls_diretas:
             try:
                 logger.info(f"� Tentando URL direta: {url_direta}")
-                response = self.session.get(url_direta)
+                response = self.session.get(url_direta, contador=contador)
                 response.raise_for_status()
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = self.criar_soup(response.content)
                 
-                links = self.processar_cards_html(soup, base_url)
+                links = self.processar_cards_html(soup, base_url, vistos)
                 if links:
                     logger.info(f"✅ URL direta funcionou: {url_direta}")
                     return links
@@ -164,7 +424,7 @@ class LeilaoVipScraper:
         
         return []
     
-    def buscar_links_alternativos(self, soup, base_url):
+    def buscar_links_alternativos(self, soup, base_url, vistos):
         """Busca alternativa quando não encontra cards de leilões"""
         links_leiloes = []
         
@@ -172,24 +432,18 @@ class LeilaoVipScraper:
         
         # Estratégia 1: Procurar por qualquer link que contenha "leilao" e não seja rede social
         todos_links = soup.find_all('a', href=True)
-        termos_excluir = ['facebook', 'twitter', 'instagram', 'youtube', 'tiktok', 'blog']
         
         for link in todos_links:
             href = link.get('href', '').lower()
-            texto = link.get_text(strip=True)
             
-            # Filtra redes sociais e links de navegação
-            if any(termo in href for termo in termos_excluir):
-                continue
-                
-            # Procura por padrões que podem indicar leilões
-            if any(padrao in href for padrao in ['leilao', 'evento', 'detalhes']):
+            # Procura por padrões que podem indicar leilões, fora de redes sociais e links de navegação
+            if regras_alternativos.link_candidato(href):
                 # Verifica se tem ID ou parâmetros que indicam leilão específico
                 if '=' in href or len(href.split('/')) > 2:
+                    texto = link.get_text(strip=True)
                     link_completo = urljoin(base_url, href)
-                    if link_completo not in self.links_processados:
+                    if self.link_novo(link_completo, vistos):
                         links_leiloes.append(link_completo)
-                        self.links_processados.add(link_completo)
                         logger.info(f"🔗 Link alternativo encontrado: {texto[:30]} -> {href}")
         
         # Estratégia 2: Procurar por scripts ou dados JSON que podem conter URLs
@@ -225,7 +479,7 @@ class LeilaoVipScraper:
         logger.info(f"🔍 Busca alternativa encontrou {len(links_leiloes)} possíveis links")
         return links_leiloes
 
-    def processar_cards_html(self, soup, base_url):
+    def processar_cards_html(self, soup, base_url, vistos):
         """Processa HTML buscando cards de leilões"""
         links_leiloes = []
         
@@ -240,27 +494,33 @@ class LeilaoVipScraper:
             texto = link.get_text(strip=True)[:30]
             logger.info(f"  {i}. {href} - '{texto}'")
         
+        # Texto de cada elemento pai é extraído uma única vez, mesmo com vários links no mesmo card
+        textos_pais = {}
+        
         for link in todos_links:
             href = link.get('href', '')
-            texto = link.get_text(strip=True)
             
             # Verifica se é um link de leilão (mais flexível)
-            if any(padrao in href.lower() for padrao in ['/leilao', '/evento', '/detalhes']):
+            if regras_cards.link_candidato(href):
+                texto = link.get_text(strip=True)
+                
                 # Verifica se contém indicadores de leilão válido no contexto
                 contexto_pai = ""
                 if link.parent:
-                    contexto_pai = link.parent.get_text()
+                    chave_pai = id(link.parent)
+                    if chave_pai not in textos_pais:
+                        textos_pais[chave_pai] = link.parent.get_text()
+                    contexto_pai = textos_pais[chave_pai]
                 
-                contexto_completo = (texto + " " + contexto_pai).lower()
-                
-                if any(indicador in contexto_completo for indicador in [
-                    'leilão', 'lotes', 'extrajudicial', 'bradesco', 'r$', 'lance', 'imóvel'
-                ]):
+                if regras_cards.contexto_valido(texto) or regras_cards.contexto_valido(contexto_pai):
                     link_completo = urljoin(base_url, href)
                     
-                    if link_completo not in self.links_processados:
+                    if self.link_novo(link_completo, vistos):
                         links_leiloes.append(link_completo)
-                        self.links_processados.add(link_completo)
+                        data_leilao = extrair_data_leilao(contexto_pai or texto)
+                        if data_leilao:
+                            with self._lock:
+                                self.datas_leiloes[link_completo] = data_leilao
                         logger.info(f"🏠 Card de leilão encontrado: {texto[:50]} -> {href}")
         
         logger.info(f"🏠 Total de cards de leilões encontrados: {len(links_leiloes)}")
@@ -268,328 +528,507 @@ class LeilaoVipScraper:
     
     def extrair_lotes_do_leilao(self, url_leilao):
         """Etapa 2: Extrai lotes individuais de um leilão (segunda imagem do usuário)"""
+        return executar_fluxo(self.fluxo_lotes_do_leilao(url_leilao))
+    
+    def fluxo_lotes_do_leilao(self, url_leilao):
+        """Requisições da etapa 2; o parsing de cada página é pedido ao motor com `yield Analise(...)`"""
         try:
             response = self.session.get(url_leilao)
             response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
+            # A busca ampla por cards monta a página inteira só se precisar
+            conteudo_pagina = response.content
             
             links_lotes = []
-            base_url = '/'.join(url_leilao.split('/')[:3])
+            vistos = set()
+            base_url = url_base(url_leilao)
             
             logger.info(f"📦 Extraindo lotes do leilão: {url_leilao}")
             
-            # Estratégia 1: Procura por link de "aberto para ofertas" ou similar
-            link_ofertas = soup.find('a', href=lambda x: x and ('ofertas' in x.lower() or 'lances' in x.lower()))
+            analise = yield Analise(analisar_leilao, conteudo_pagina, url_leilao, True, self.backend_html)
             
-            if link_ofertas:
-                url_ofertas = urljoin(base_url, link_ofertas.get('href'))
+            # Estratégia 1: Procura por link de "aberto para ofertas" ou similar
+            if analise['ofertas']:
+                url_ofertas = analise['ofertas']
                 logger.info(f"🔗 Encontrado link de ofertas/lances: {url_ofertas}")
                 
                 # Segue o link para a página com os lotes
-                self.aguardar_entre_requests(1)
-                response_ofertas = self.session.get(url_ofertas, allow_redirects=True)
-                response_ofertas.raise_for_status()
+                with self.rastreador.span('ofertas', url=url_ofertas):
+                    response_ofertas = self.session.get(url_ofertas, allow_redirects=True)
+                    response_ofertas.raise_for_status()
                 
                 # URL final após redirecionamentos
                 url_final = response_ofertas.url
                 logger.info(f"🔗 URL final após redirecionamento: {url_final}")
                 
-                soup = BeautifulSoup(response_ofertas.content, 'html.parser')
+                conteudo_pagina = response_ofertas.content
+                analise = yield Analise(analisar_leilao, conteudo_pagina, url_leilao, False, self.backend_html)
             
-            # Busca por links de lotes individuais
-            todos_links = soup.find_all('a', href=True)
-            logger.info(f"🔗 Total de links na página: {len(todos_links)}")
+            logger.info(f"🔗 Total de links na página: {analise['total_links']}")
+            if analise['opcoes'] is not None:
+                logger.info(f"✅ Encontrado dropdown com {analise['opcoes']} opções")
             
-            # Estratégia principal: Busca por <select> com options de lotes
-            select_lotes = soup.find('select')
-            if select_lotes:
-                options = select_lotes.find_all('option')
-                logger.info(f"✅ Encontrado dropdown com {len(options)} opções")
-                
-                for option in options:
-                    value = option.get('value', '')
-                    if value and value != '#':  # Ignora valores vazios ou #
-                        # O value geralmente é o slug do lote (ex: apartamento-com-7275-m-imbui-12667)
-                        # Monta a URL completa
-                        link_lote = urljoin(base_url, f'/evento/anuncio/{value}')
-                        
-                        if link_lote not in self.links_processados:
-                            links_lotes.append(link_lote)
-                            self.links_processados.add(link_lote)
-                            texto_lote = option.get_text(strip=True)
-                            logger.info(f"  📦 Lote #{texto_lote}: {value}")
+            # Lotes do <select> e links diretos, na ordem da página
+            for link_lote, descricao in analise['lotes']:
+                if self.link_novo(link_lote, vistos):
+                    links_lotes.append(link_lote)
+                    logger.info(f"  📦 {descricao}")
             
-            # Se ainda não tem lotes, tenta buscar por links diretos
-            if not links_lotes:
-                # Conta quantos links parecem ser de lotes
-                links_com_lote = [l for l in todos_links if any(p in l.get('href', '').lower() for p in ['/lote', '/item', '/imovel', '/anuncio'])]
-                logger.info(f"🔗 Links que contêm '/lote', '/item', '/imovel' ou '/anuncio': {len(links_com_lote)}")
+            exemplos = analise['exemplos']
+            if exemplos is not None:
+                logger.info(f"🔗 Links que contêm '/lote', '/item', '/imovel' ou '/anuncio': {len(exemplos)}")
                 
                 # Mostra alguns exemplos para debug
-                if links_com_lote:
+                if exemplos:
                     logger.info("🔍 Exemplos de links de lotes encontrados:")
-                    for i, link in enumerate(links_com_lote[:5], 1):
-                        href = link.get('href', '')
-                        texto = link.get_text(strip=True)[:40]
+                    for i, (href, texto) in enumerate(exemplos[:5], 1):
                         logger.info(f"  {i}. {href} - '{texto}'")
             
-            for link in todos_links:
-                href = link.get('href', '')
-                texto = link.get_text(strip=True)
-                
-                # Verifica se é um link de lote individual
-                # Padrões: /lote/, /item/, /imovel/, ou links com IDs de lote
-                if any(padrao in href.lower() for padrao in ['/lote', '/item', '/imovel']):
-                    # Evita links do próprio evento/leilão (queremos lotes específicos)
-                    if '/evento/' not in href or '/lote' in href:
-                        link_completo = urljoin(base_url, href)
-                        
-                        if link_completo not in self.links_processados and link_completo != url_leilao:
-                            links_lotes.append(link_completo)
-                            self.links_processados.add(link_completo)
-                            logger.info(f"  📦 Lote encontrado: {texto[:30]} -> {href}")
-            
             # Se não encontrou lotes com padrões específicos, tenta busca por AJAX
             if not links_lotes:
                 logger.info("⚠️  Nenhum lote encontrado com padrões de URL, tentando buscar via AJAX...")
                 
-                # Procura por elementos com data-ajax que podem carregar lotes
-                ajax_elements = soup.find_all(attrs={'data-ajax-url': True})
-                
-                for elem in ajax_elements:
-                    ajax_url = elem.get('data-ajax-url')
-                    if any(termo in ajax_url.lower() for termo in ['lote', 'item', 'imovel', 'pesquisar']):
-                        logger.info(f"🔄 Tentando URL AJAX: {ajax_url}")
-                        
-                        try:
-                            ajax_full_url = urljoin(base_url, ajax_url)
-                            ajax_response = self.session.get(ajax_full_url)
-                            ajax_response.raise_for_status()
-                            ajax_soup = BeautifulSoup(ajax_response.content, 'html.parser')
-                            
-                            # Procura lotes no conteúdo AJAX
-                            ajax_links = ajax_soup.find_all('a', href=True)
-                            for link in ajax_links:
-                                href = link.get('href', '')
-                                if any(padrao in href.lower() for padrao in ['/lote', '/item', '/imovel']):
-                                    link_completo = urljoin(base_url, href)
-                                    
-                                    if link_completo not in self.links_processados:
-                                        links_lotes.append(link_completo)
-                                        self.links_processados.add(link_completo)
-                                        logger.info(f"  📦 Lote (AJAX) encontrado: {href}")
+                for ajax_url in analise['ajax']:
+                    logger.info(f"🔄 Tentando URL AJAX: {ajax_url}")
+                    
+                    try:
+                        ajax_full_url = urljoin(base_url, ajax_url)
+                        ajax_response = self.session.get(ajax_full_url)
+                        ajax_response.raise_for_status()
                         
-                        except Exception as e:
-                            logger.warning(f"⚠️  Erro ao processar AJAX {ajax_url}: {e}")
+                        # Procura lotes no conteúdo AJAX
+                        candidatos = yield Analise(analisar_links_ajax, ajax_response.content, base_url, self.backend_html)
+                        for link_completo, href in candidatos:
+                            if self.link_novo(link_completo, vistos):
+                                links_lotes.append(link_completo)
+                                logger.info(f"  📦 Lote (AJAX) encontrado: {href}")
+                    
+                    except Exception as e:
+                        logger.warning(f"⚠️  Erro ao processar AJAX {ajax_url}: {e}")
             
             # Se ainda não encontrou, tenta busca ampla por cards/elementos
             if not links_lotes:
                 logger.info("⚠️  Ainda sem lotes, tentando busca ampla por elementos...")
                 
-                # Procura por elementos que parecem ser cards de lotes
-                cards_possiveis = soup.find_all(['div', 'article', 'section'], class_=lambda x: x and any(
-                    termo in str(x).lower() for termo in ['card', 'item', 'lote', 'imovel', 'property']
-                ))
+                total_cards, candidatos = yield Analise(analisar_cards_lotes, conteudo_pagina, url_leilao, self.backend_html)
+                logger.info(f"🔍 Encontrados {total_cards} elementos que podem ser cards")
                 
-                logger.info(f"🔍 Encontrados {len(cards_possiveis)} elementos que podem ser cards")
-                
-                for card in cards_possiveis:
-                    links_no_card = card.find_all('a', href=True)
-                    
-                    for link in links_no_card:
-                        href = link.get('href', '')
-                        texto = link.get_text(strip=True).lower()
-                        contexto = card.get_text().lower()
-                        
-                        # Indicadores de lotes: valores, metragem, endereços
-                        indicadores_lote = ['r$', 'lote', 'lance', 'm²', 'm2', 'casa', 'apartamento', 
-                                           'terreno', 'sala', 'loja', 'galpão', 'local:', 'avaliação']
-                        
-                        if any(ind in (texto + contexto) for ind in indicadores_lote):
-                            # Evita links de navegação
-                            if not any(nav in href.lower() for nav in ['agenda', 'login', 'cadastro', 'blog', '#']):
-                                link_completo = urljoin(base_url, href)
-                                
-                                if link_completo not in self.links_processados and link_completo != url_leilao and link_completo != url_leilao.replace('/detalhes/', '/detalhe/'):
-                                    links_lotes.append(link_completo)
-                                    self.links_processados.add(link_completo)
-                                    logger.info(f"  📦 Lote (card) encontrado: {texto[:30]} -> {href}")
+                for link_completo, texto, href in candidatos:
+                    if self.link_novo(link_completo, vistos):
+                        links_lotes.append(link_completo)
+                        logger.info(f"  📦 Lote (card) encontrado: {texto[:30]} -> {href}")
             
             logger.info(f"📦 Total de lotes encontrados: {len(links_lotes)}")
+            self.contar('lotes', len(links_lotes))
             return links_lotes
             
         except Exception as e:
             logger.error(f"Erro ao extrair lotes de {url_leilao}: {e}")
+            self.registrar_falha(url_leilao, e)
             return []
     
     def verificar_palavra_chave(self, soup):
         """Verifica se a página contém a palavra-chave"""
-        texto_pagina = soup.get_text().lower()
-        return palavra_chave.lower() in texto_pagina
+        return self.filtro_palavras.verificar_texto(soup.get_text())
     
     def baixar_pdf_matricula(self, url_lote, nome_banco):
         """Etapa 3: Baixa o PDF da matrícula de um lote específico"""
+        return executar_fluxo(self.fluxo_pdf_matricula(url_lote, nome_banco))
+    
+    def fluxo_pdf_matricula(self, url_lote, nome_banco):
+        """Requisições da etapa 3: página do lote, análise e, por fim, o download do PDF"""
+        self.contar('lotes_processados')
         try:
+            lote_id = urlparse(url_lote).path.split('/')[-1] or 'lote'
+            
+            # Lotes já baixados em execuções anteriores não geram nenhuma requisição
+            if self.indice_downloads.contem(nome_banco, lote_id):
+                logger.info(f"⏭️  Lote já baixado, pulando: {nome_banco}_{lote_id}")
+                self.emitir('lote_ja_baixado', banco=nome_banco, lote=lote_id, url=url_lote)
+                return False
+            
             response = self.session.get(url_lote)
             response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
             
             logger.info(f"🔍 Processando lote: {url_lote}")
             
-            lote_id = urlparse(url_lote).path.split('/')[-1] or 'lote'
+            analise = yield Analise(
+                analisar_lote, response.content, response.encoding, url_lote, self.filtro_palavras, self.backend_html
+            )
             
-            # Verifica se contém a palavra-chave
-            if not self.verificar_palavra_chave(soup):
-                logger.info(f"⚠️  Palavra-chave '{palavra_chave}' não encontrada em {url_lote}")
+            if not analise['palavra_chave']:
+                logger.info(f"⚠️  Palavra-chave {self.filtro_palavras.descricao()} não encontrada em {url_lote}")
+                self.emitir('palavra_chave_ausente', banco=nome_banco, lote=lote_id, url=url_lote)
+                metricas.lotes_sem_palavra_chave.inc(banco=nome_banco)
                 return False
             
-            logger.info(f"✅ Palavra-chave '{palavra_chave}' encontrada!")
-            
-            # Procura link da matrícula com múltiplas estratégias
-            link_matricula = None
+            logger.info(f"✅ Palavra-chave {self.filtro_palavras.descricao()} encontrada!")
             
-            # Lista todos os links do lote para debug
-            todos_links = soup.find_all('a', href=True)
-            logger.info(f"🔗 Total de links no lote: {len(todos_links)}")
-            
-            # Mostra links que podem ser PDFs
+            # Lista os links do lote para debug
+            logger.info(f"🔗 Total de links no lote: {analise['total_links']}")
             logger.info("📋 Links que podem ser documentos:")
-            for link in todos_links[:15]:  # Mostra os primeiros 15
-                href = link.get('href', '')
-                texto = link.get_text(strip=True)
-                if any(termo in href.lower() or termo in texto.lower() for termo in ['pdf', 'doc', 'matricula', 'download']):
-                    logger.info(f"  - {texto[:40]} -> {href}")
-            
-            # Estratégia 1: Texto contém "Matrícula"
-            link_matricula = soup.find('a', string=lambda text: text and 'matrícula' in text.lower())
-            if link_matricula:
-                logger.info(f"🎯 Estratégia 1: Encontrado por texto 'Matrícula'")
-            
-            # Estratégia 2: Diferentes variações
-            if not link_matricula:
-                termos_matricula = ['matricula', 'Matricula', 'MATRICULA', 'matrícula', 'Matrícula', 'MATRÍCULA']
-                for termo in termos_matricula:
-                    link_matricula = soup.find('a', string=lambda text: text and termo in str(text))
-                    if link_matricula:
-                        logger.info(f"🎯 Estratégia 2: Encontrado por termo '{termo}'")
-                        break
+            for texto, href in analise['documentos']:
+                logger.info(f"  - {texto} -> {href}")
             
-            # Estratégia 3: Por href que contenha "matricula" ou extensões de documento
-            if not link_matricula:
-                for link in todos_links:
-                    href = link.get('href', '').lower()
-                    texto = link.get_text(strip=True).lower()
-                    
-                    if any(termo in href or termo in texto for termo in ['matricula', 'matrícula']):
-                        link_matricula = link
-                        logger.info(f"🎯 Estratégia 3: Encontrado por href/texto com 'matricula'")
-                        break
-            
-            # Estratégia 4: Procura por qualquer PDF
-            if not link_matricula:
-                logger.info("⚠️  Matrícula não encontrada, procurando qualquer PDF...")
-                for link in todos_links:
-                    href = link.get('href', '').lower()
-                    if '.pdf' in href or 'pdf' in href:
-                        link_matricula = link
-                        logger.info(f"🎯 Estratégia 4: Encontrado PDF genérico")
-                        break
+            # Link da matrícula: todas as estratégias avaliadas em uma passada
+            rank = analise['rank']
+            if rank:
+                estrategia, subprioridade = rank
+                if estrategia == 1:
+                    logger.info(f"🎯 Estratégia 1: Encontrado por texto 'Matrícula'")
+                elif estrategia == 2:
+                    logger.info(f"🎯 Estratégia 2: Encontrado por termo '{regras_matricula.variacoes.termos[subprioridade]}'")
+                elif estrategia == 3:
+                    logger.info(f"🎯 Estratégia 3: Encontrado por href/texto com 'matricula'")
+                else:
+                    logger.info("⚠️  Matrícula não encontrada, procurando qualquer PDF...")
+                    logger.info(f"🎯 Estratégia 4: Encontrado PDF genérico")
             
-            if link_matricula and link_matricula.get('href'):
-                pdf_url = urljoin(url_lote, link_matricula['href'])
-                texto_link = link_matricula.get_text(strip=True)
+            if analise['pdf_url']:
+                pdf_url = analise['pdf_url']
+                texto_link = analise['texto_link']
                 
                 logger.info(f"📄 Link encontrado: '{texto_link}' -> {pdf_url}")
                 
-                # Baixa o PDF
-                logger.info(f"⬇️  Baixando PDF...")
-                pdf_response = self.session.get(pdf_url)
-                pdf_response.raise_for_status()
-                
-                # Verifica se é realmente um PDF
-                content_type = pdf_response.headers.get('Content-Type', '')
-                if 'pdf' not in content_type.lower() and len(pdf_response.content) < 1000:
-                    logger.warning(f"⚠️  Conteúdo pode não ser um PDF válido. Content-Type: {content_type}")
-                
                 # Cria nome do arquivo e diretório específico
                 nome_arquivo = f"{nome_banco}_{lote_id}.pdf"
-                diretorio_pdfs = os.path.join('pdfs', 'leilao_vip')
                 caminho_arquivo = os.path.join(diretorio_pdfs, nome_arquivo)
                 
-                # Verifica se o PDF já existe
+                # Verifica se o PDF já existe (só arquivos completos recebem o nome final)
                 if os.path.exists(caminho_arquivo):
                     logger.info(f"⏭️  PDF já existe, pulando: {caminho_arquivo}")
                     return False
                 
-                # Cria diretório se não existir
-                os.makedirs(diretorio_pdfs, exist_ok=True)
+                # Daqui em diante o fluxo roda na etapa de download
+                yield para_download
                 
-                # Salva o PDF
-                with open(caminho_arquivo, 'wb') as f:
-                    f.write(pdf_response.content)
+                # Matrícula já armazenada (mesma URL em outro lote) não é baixada de novo
+                inicio = time.monotonic()
+                sha256 = self.armazem.sha_da_url(pdf_url)
+                reaproveitado = sha256 is not None
+                if sha256:
+                    logger.info(f"♻️  Matrícula já armazenada ({sha256[:12]}), reaproveitando")
+                    caminho_objeto = self.armazem.caminho_objeto(sha256)
+                    tamanho = os.path.getsize(caminho_objeto)
+                else:
+                    # Baixa o PDF em streaming, retomando downloads interrompidos
+                    logger.info(f"⬇️  Baixando PDF...")
+                    caminho_recebimento = self.armazem.caminho_recebimento(nome_arquivo)
+                    with metricas.duracao_download.cronometrar(banco=nome_banco), \
+                            self.rastreador.span('download_pdf', url=pdf_url) as span:
+                        tamanho, content_type, sha256 = baixar_arquivo(self.session, pdf_url, caminho_recebimento)
+                        span.atributos['bytes'] = tamanho
+                    metricas.pdf_bytes.inc(tamanho, banco=nome_banco)
+                    
+                    # Verifica se é realmente um PDF
+                    if 'pdf' not in content_type.lower() and tamanho < 1000:
+                        logger.warning(f"⚠️  Conteúdo pode não ser um PDF válido. Content-Type: {content_type}")
+                    
+                    with self.rastreador.span('armazenar_pdf'):
+                        caminho_objeto = self.armazem.armazenar(caminho_recebimento, sha256, pdf_url)
                 
-                tamanho_kb = len(pdf_response.content) / 1024
-                self.pdfs_baixados.append(caminho_arquivo)
+                with self.rastreador.span('registrar_pdf'):
+                    # O nome do lote aponta para o objeto; sem hardlink, fica só no manifesto
+                    if not self.armazem.vincular(sha256, caminho_arquivo):
+                        caminho_arquivo = caminho_objeto
+                    
+                    self.indice_downloads.registrar(nome_banco, lote_id, caminho_arquivo, sha256, caminho_objeto)
+                    self.catalogo.registrar(nome_banco, lote_id, caminho_arquivo, pdf_url, tamanho, sha256)
+                
+                tamanho_kb = tamanho / 1024
+                with self._lock:
+                    self.pdfs_baixados.append(caminho_arquivo)
+                    self.progresso['pdfs'] += 1
                 logger.info(f"✅ PDF baixado: {caminho_arquivo} ({tamanho_kb:.2f} KB)")
+                self.emitir(
+                    'pdf_baixado', banco=nome_banco, lote=lote_id, url=pdf_url, arquivo=caminho_arquivo,
+                    bytes=tamanho, segundos=round(time.monotonic() - inicio, 3), reaproveitado=reaproveitado
+                )
                 return True
             else:
                 logger.warning(f"❌ Nenhum link de matrícula/PDF encontrado em {url_lote}")
+                self.emitir('matricula_ausente', banco=nome_banco, lote=lote_id, url=url_lote)
             
             return False
             
         except Exception as e:
             logger.error(f"❌ Erro ao processar {url_lote}: {e}")
+            self.emitir('erro_lote', banco=nome_banco, url=url_lote, erro=str(e))
+            self.registrar_falha(url_lote, e)
             return False
-            return False
+    
+    def selecionar_bancos(self):
+        """Comitentes desta execução: os pedidos em `bancos` ou todos os ativos"""
+        if self.bancos is None:
+            return list(self.comitentes)
+        desconhecidos = [nome for nome in self.bancos if nome not in self.comitentes]
+        if desconhecidos:
+            raise ValueError(f"Comitentes desconhecidos: {', '.join(desconhecidos)}")
+        return [self.comitentes.obter(nome) for nome in self.bancos]
+    
+    def unidades_iniciais(self):
+        """Unidades da execução: os bancos, numa execução do zero, ou o que ficou pendente na fronteira"""
+        if not self.retomar:
+            self.fronteira.limpar()
+            self.links_processados.limpar()
+        for comitente in self.selecionar_bancos():
+            self.fronteira.adicionar(comitente.url, 'banco', comitente.nome)
+            self.bancos_execucao.append(comitente.nome)
+        for url_leilao, nome_banco in self.leiloes:
+            self.fronteira.adicionar(url_leilao, 'leilao', nome_banco)
+        if self.retomar:
+            self.fronteira.retomar()
+        return self.fronteira.pendentes()
+    
+    def processar_unidade(self, tipo, url, nome_banco):
+        """Processa uma unidade da fronteira (banco, leilão ou lote) e retorna as unidades filhas novas"""
+        return executar_fluxo(self.criar_fluxo_unidade(tipo, url, nome_banco))
+    
+    def criar_fluxo_unidade(self, tipo, url, nome_banco):
+        """Fluxo da unidade dentro de um span filho do span de quem a descobriu"""
+        return self.rastreador.rastrear_fluxo(
+            self.fluxo_unidade(tipo, url, nome_banco), tipo,
+            pai=self.rastreador.pai_de(url, self.span_execucao and self.span_execucao.id), url=url, banco=nome_banco
+        )
+    
+    def fluxo_unidade(self, tipo, url, nome_banco):
+        """Fluxo de uma unidade da fronteira; o retorno são as unidades filhas novas"""
+        self.fronteira.iniciar(url)
+        filhos = []
+        
+        if tipo == 'banco':
+            # Etapa 1: Extrai cards de leilões
+            logger.info(f"🏦 Processando {nome_banco}...")
+            links_leiloes = self.extrair_cards_leiloes(url)
+            logger.info(f"🏠 Encontrados {len(links_leiloes)} leilões em {nome_banco}")
+            self.agenda.registrar(nome_banco, [(link, self.datas_leiloes.get(link)) for link in links_leiloes])
+            filhos.extend(('leilao', link_leilao) for link_leilao in links_leiloes)
+        elif tipo == 'leilao':
+            # Etapa 2: Extrai os lotes do leilão
+            links_lotes = yield from self.fluxo_lotes_do_leilao(url)
+            # Um leilão que falhou (registrar_falha) não conta como coletado: volta logo para a recoleta
+            if self.fronteira.estado(url) == 'falhou':
+                self.agenda.falhou(url)
+            else:
+                self.agenda.coletado(url)
+            filhos.extend(('lote', link_lote) for link_lote in links_lotes)
+        else:
+            # Etapa 3: Baixa o PDF da matrícula do lote
+            yield from self.fluxo_pdf_matricula(url, nome_banco)
+        
+        # Os filhos entram na fronteira antes de o pai ser concluído, e nos links processados junto com ela:
+        # os já conhecidos (de outra unidade ou de antes da retomada) ficam de fora, e os de uma unidade que
+        # falhou sem filhos não são registrados e voltam a ser achados quando ela é repetida
+        novos = [
+            (tipo_filho, url_filho, nome_banco) for tipo_filho, url_filho in filhos
+            if self.registrar_link(url_filho) and self.fronteira.adicionar(url_filho, tipo_filho, nome_banco, origem=url)
+        ]
+        for tipo_filho, url_filho, _ in novos:
+            self.rastreador.vincular(url_filho)
+            if tipo_filho == 'leilao':
+                self.emitir('leilao_encontrado', banco=nome_banco, url=url_filho)
+            else:
+                self.emitir('lote_enfileirado', banco=nome_banco, leilao=url, url=url_filho)
+        self.fronteira.concluir(url)
+        return novos
+    
+    def limites_comitentes(self):
+        """banco → (prioridade, max_concorrencia), para as reservas dos trabalhadores distribuídos"""
+        return {comitente.nome: (comitente.prioridade, comitente.max_concorrencia) for comitente in self.comitentes}
+    
+    def criar_escalonador(self, unidades):
+        """Fila justa entre comitentes com as unidades iniciais"""
+        self.escalonador = EscalonadorComitentes(self.comitentes)
+        self.escalonador.adicionar(unidades)
+        return self.escalonador
+    
+    def processar_escalonado(self, unidades):
+        """Processa as unidades em sequência, alternando entre os comitentes"""
+        escalonador = self.criar_escalonador(unidades)
+        while escalonador:
+            unidade = escalonador.proxima()
+            filhas = self.processar_unidade(*unidade)
+            escalonador.concluir(unidade)
+            escalonador.adicionar(filhas)
+    
+    def processar_em_profundidade(self, unidades):
+        """Processa as unidades em sequência, cada leilão seguido dos seus lotes"""
+        pilha = list(reversed(unidades))
+        while pilha:
+            pilha.extend(reversed(self.processar_unidade(*pilha.pop())))
     
     def processar_banco(self, nome_banco, url_banco):
         """Processa um banco seguindo o fluxo completo: Leilões → Lotes → PDFs"""
-        logger.info(f"🏦 Processando {nome_banco}...")
+        pdfs_antes = len(self.pdfs_baixados)
+        self.fronteira.adicionar(url_banco, 'banco', nome_banco)
+        self.processar_em_profundidade([('banco', url_banco, nome_banco)])
+        logger.info(f"✅ {nome_banco} concluído: {len(self.pdfs_baixados) - pdfs_antes} PDFs baixados")
+    
+    def registrar_coletas(self):
+        """Registra a coleta dos comitentes cuja listagem não falhou (registrar_falha a marca na fronteira)"""
+        concluidos = set(self.fronteira.bancos_concluidos())
+        coletados = [nome for nome in self.bancos_execucao if nome in concluidos]
+        self.comitentes.registrar_coleta(coletados)
+        return coletados
+    
+    def executar_scraping(self):
+        """Executa o scraping completo de todos os bancos, no motor escolhido pelos parâmetros"""
+        try:
+            with self.rastreador.span('scraping', max_workers=self.max_workers, processos_analise=self.processos_analise) as span:
+                # Pai dos spans das unidades iniciais, que rodam em outras threads nos motores paralelos
+                self.span_execucao = span
+                if self.trabalhadores:
+                    pdfs = self.executar_scraping_distribuido()
+                elif self.processos_analise:
+                    pdfs = self.executar_scraping_pipeline()
+                elif self.max_workers > 1:
+                    pdfs = self.executar_scraping_concorrente()
+                else:
+                    pdfs = self.executar_scraping_sequencial()
+        finally:
+            # Salvo também numa execução interrompida: tem os links das unidades concluídas na fronteira
+            if hasattr(self.links_processados, 'salvar'):
+                self.links_processados.salvar()
         
-        # Etapa 1: Extrai cards de leilões
-        links_leiloes = self.extrair_cards_leiloes(url_banco)
-        logger.info(f"🏠 Encontrados {len(links_leiloes)} leilões em {nome_banco}")
+        self.registrar_coletas()
+        self.rastreador.salvar()
+        return pdfs
+    
+    def executar_scraping_sequencial(self):
+        """Executa o scraping em sequência, um leilão e seus lotes de cada vez"""
+        logger.info("🚀 Iniciando scraping do LeilaoVip...")
+        unidades = self.unidades_iniciais()
+        self.emitir('scraping_iniciado', bancos=self.bancos_execucao, max_workers=self.max_workers)
         
-        if not links_leiloes:
-            logger.warning(f"⚠️  Nenhum leilão encontrado para {nome_banco}")
-            return
+        self.processar_escalonado(unidades)
         
-        total_pdfs_banco = 0
+        logger.info(f"🎉 Scraping concluído! {len(self.pdfs_baixados)} PDFs baixados no total.")
+        self.emitir('scraping_concluido', total_pdfs=len(self.pdfs_baixados), progresso=dict(self.progresso))
+        self.registrar_estatisticas()
+        return self.pdfs_baixados
+    
+    def executar_scraping_concorrente(self):
+        """Executa o scraping com leilões, lotes e PDFs buscados em paralelo"""
+        logger.info(f"🚀 Iniciando scraping concorrente do LeilaoVip ({self.max_workers} workers)...")
+        escalonador = self.criar_escalonador(self.unidades_iniciais())
+        self.emitir('scraping_iniciado', bancos=self.bancos_execucao, max_workers=self.max_workers)
         
-        # Etapa 2: Para cada leilão, extrai os lotes
-        for i, link_leilao in enumerate(links_leiloes, 1):
-            logger.info(f"🔄 Processando leilão {i}/{len(links_leiloes)}")
-            
-            self.aguardar_entre_requests()
-            
-            # Extrai lotes do leilão
-            links_lotes = self.extrair_lotes_do_leilao(link_leilao)
-            
-            # Etapa 3: Para cada lote, tenta baixar o PDF da matrícula
-            for j, link_lote in enumerate(links_lotes, 1):
-                logger.info(f"  📦 Processando lote {j}/{len(links_lotes)}")
+        # Só max_workers unidades em execução: as demais esperam no escalonador, que escolhe a próxima
+        # entre os comitentes; cada unidade concluída devolve as filhas, que voltam para ele
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pendentes = {}
+            while escalonador or pendentes:
+                while len(pendentes) < self.max_workers:
+                    unidade = escalonador.proxima()
+                    if unidade is None:
+                        break
+                    pendentes[executor.submit(self.processar_unidade, *unidade)] = unidade
                 
-                self.aguardar_entre_requests(1)  # Pausa menor entre lotes
+                concluidos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
                 
-                if self.baixar_pdf_matricula(link_lote, nome_banco):
-                    total_pdfs_banco += 1
+                for futuro in concluidos:
+                    escalonador.concluir(pendentes.pop(futuro))
+                    escalonador.adicionar(futuro.result())
         
-        logger.info(f"✅ {nome_banco} concluído: {total_pdfs_banco} PDFs baixados")
+        logger.info(f"🎉 Scraping concluído! {len(self.pdfs_baixados)} PDFs baixados no total.")
+        self.emitir('scraping_concluido', total_pdfs=len(self.pdfs_baixados), progresso=dict(self.progresso))
+        self.registrar_estatisticas()
+        return self.pdfs_baixados
     
-    def executar_scraping(self):
-        """Executa o scraping completo de todos os bancos"""
-        logger.info("🚀 Iniciando scraping do LeilaoVip...")
+    def executar_scraping_pipeline(self):
+        """Executa o scraping em etapas: buscas em threads, parsing em processos e downloads em threads"""
+        logger.info(
+            f"🚀 Iniciando scraping do LeilaoVip em pipeline ({self.max_workers} workers, "
+            f"{self.processos_analise} processos de análise)..."
+        )
+        escalonador = self.criar_escalonador(self.unidades_iniciais())
+        self.emitir('scraping_iniciado', bancos=self.bancos_execucao, max_workers=self.max_workers)
         
-        for nome_banco, url_banco in bancos.items():
-            self.processar_banco(nome_banco, url_banco)
-            self.aguardar_entre_requests(3)  # Pausa maior entre bancos
+        pipeline = Pipeline(
+            trabalhadores_busca=self.max_workers,
+            processos_analise=self.processos_analise,
+            trabalhadores_download=self.max_workers
+        )
+        self.estatisticas_pipeline = pipeline.executar(
+            escalonador,
+            lambda unidade: self.criar_fluxo_unidade(*unidade),
+            ao_reportar=lambda estatisticas: self.emitir('estatisticas_pipeline', etapas=estatisticas)
+        )
         
         logger.info(f"🎉 Scraping concluído! {len(self.pdfs_baixados)} PDFs baixados no total.")
+        self.emitir('scraping_concluido', total_pdfs=len(self.pdfs_baixados), progresso=dict(self.progresso))
+        pipeline.registrar_estatisticas()
+        self.registrar_estatisticas()
         return self.pdfs_baixados
+    
+    def executar_scraping_distribuido(self):
+        """Executa o scraping em processos trabalhadores que reivindicam as unidades da fronteira"""
+        logger.info(
+            f"🚀 Iniciando scraping distribuído do LeilaoVip ({self.trabalhadores} trabalhadores "
+            f"com {self.max_workers} workers cada)..."
+        )
+        self.unidades_iniciais()
+        self.emitir('scraping_iniciado', bancos=self.bancos_execucao, max_workers=self.max_workers)
+        
+        # Cada trabalhador monta o próprio scraper (sessão, cache, índice) sobre a mesma fronteira,
+        # com uma fração da taxa por host: somados, os processos respeitam o limite de um só
+        opcoes = {
+            'limitador_taxa': self.limitador_taxa.dividir(self.trabalhadores),
+            'usar_cache': self.cache_http is not None,
+            'backend_html': self.backend_html,
+            'filtro_palavras': self.filtro_palavras,
+            'rastreador': isinstance(self.rastreador, Rastreador),
+        }
+        # Eventos, progresso, métricas e spans dos trabalhadores chegam a este scraper durante a coleta
+        pdfs = executar_trabalhadores_locais(
+            self.trabalhadores, self.fronteira.caminho, self.max_workers, self.lease, self.limites_comitentes(), opcoes,
+            scraper=self
+        )
+        with self._lock:
+            self.pdfs_baixados.extend(pdfs)
+        
+        logger.info(f"🎉 Scraping concluído! {len(self.pdfs_baixados)} PDFs baixados no total.")
+        self.emitir('scraping_concluido', total_pdfs=len(self.pdfs_baixados), progresso=dict(self.progresso))
+        self.registrar_estatisticas()
+        return self.pdfs_baixados
+    
+    def registrar_estatisticas(self):
+        """Registra no log a taxa atual por host e o uso do cache HTTP"""
+        for host, estado in self.limitador_taxa.estado().items():
+            logger.info(f"📈 Taxa atual para {host}: {estado['taxa']} req/s")
+        
+        if self.cache_http:
+            estatisticas = self.cache_http.estatisticas
+            logger.info(
+                f"💾 Cache HTTP: {estatisticas['hits']} hits, {estatisticas['misses']} misses, "
+                f"{estatisticas['revalidacoes']} revalidações"
+            )
+        
+        estatisticas = self.memoria_estrategias.estatisticas
+        logger.info(
+            f"🧠 Estratégias de listagem: {estatisticas['acertos']} acertos da memorizada, {estatisticas['erros']} erros, "
+            f"{estatisticas['requisicoes_economizadas']} requisições economizadas"
+        )
+        
+        for host, estado in self.session.disjuntor.estado().items():
+            logger.info(f"🔌 {host}: {estado['falhas']} falhas seguidas, circuito aberto por mais {estado['aberto_por']}s")
+        
+        if self.escalonador:
+            self.escalonador.registrar_estatisticas()
+        
+        logger.info(
+            f"🔗 Links vistos: {len(self.links_processados)} "
+            f"({self.links_processados.memoria() / 1024:.0f} KiB)"
+        )
+        
+        contagem = self.fronteira.contagem()
+        logger.info(
+            f"🧭 Fronteira: {contagem['concluido']} concluídas, {contagem['falhou']} com falha, "
+            f"{contagem['pendente'] + contagem['em_andamento']} pendentes"
+        )
 
-def iniciar_scraping_vip():
+def iniciar_scraping_vip(max_workers=1, retomar=False):
     """Função principal para iniciar o scraping do LeilaoVip"""
-    scraper = LeilaoVipScraper()
+    scraper = LeilaoVipScraper(max_workers=max_workers, retomar=retomar)
     pdfs = scraper.executar_scraping()
     
     print(f"\n📄 PDFs baixados ({len(pdfs)}):")
@@ -598,16 +1037,17 @@ def iniciar_scraping_vip():
     
     return pdfs
 
-def testar_um_banco(nome_banco="bradesco"):
+def testar_um_banco(nome_banco="bradesco", comitentes=None):
     """Função para testar apenas um banco com debug"""
     logger.info(f"🧪 TESTE: Analisando apenas o banco {nome_banco}")
     
-    scraper = LeilaoVipScraper()
-    url_banco = bancos.get(nome_banco)
+    scraper = LeilaoVipScraper(comitentes=comitentes)
+    comitente = scraper.comitentes.obter(nome_banco)
     
-    if not url_banco:
+    if not comitente:
         logger.error(f"Banco '{nome_banco}' não encontrado!")
         return []
+    url_banco = comitente.url
     
     # Testa apenas a extração de cards de leilões
     links = scraper.extrair_cards_leiloes(url_banco)
@@ -5,6 +5,7 @@ Script para testar a API de Scraping de Leilões
 
 import requests
 import json
+import time
 from datetime import datetime
 
 # URL base da API
@@ -48,6 +49,16 @@ def test_scraping():
     response = requests.post(f"{BASE_URL}/scraping/vip")
     print(f"Status: {response.status_code}")
     print(f"Response: {json.dumps(response.json(), indent=2)}")
+    
+    job_id = response.json()["job_id"]
+    while True:
+        job = requests.get(f"{BASE_URL}/jobs/{job_id}").json()
+        print(f"Estado: {job['estado']} | Progresso: {job['progresso']}")
+        if job["estado"] in ("concluido", "erro"):
+            break
+        time.sleep(5)
+    
+    print(f"Job: {json.dumps(job, indent=2, ensure_ascii=False)}")
     print("-" * 50)
 
 def main():
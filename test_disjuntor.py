@@ -0,0 +1,45 @@
+"""
+Testes do disjuntor por host e da requisição de teste no estado meio-aberto
+"""
+
+import pytest
+
+from scrapping.sessao import SessaoScraper
+from scrapping.transporte import CircuitoAbertoError, Disjuntor
+
+url = 'http://servidor.local/pagina'
+
+
+def abrir(disjuntor):
+    """Abre o circuito com pausa zero: a próxima requisição já é a de teste"""
+    for _ in range(disjuntor.limiar_falhas):
+        disjuntor.registrar_falha(url)
+
+
+def test_meio_aberto_libera_uma_requisicao_de_teste():
+    disjuntor = Disjuntor(limiar_falhas=2, pausa=0.0)
+    abrir(disjuntor)
+
+    assert disjuntor.permitir(url) is True
+    with pytest.raises(CircuitoAbertoError):
+        disjuntor.permitir(url)
+
+    disjuntor.registrar_sucesso(url)
+    assert disjuntor.permitir(url) is False
+
+
+class LimitadorQuebrado:
+    def adquirir(self, url):
+        raise RuntimeError("limitador indisponível")
+
+
+def test_teste_interrompido_antes_da_resposta_e_liberado():
+    disjuntor = Disjuntor(limiar_falhas=2, pausa=0.0)
+    abrir(disjuntor)
+    sessao = SessaoScraper(disjuntor=disjuntor, limitador_taxa=LimitadorQuebrado())
+
+    with pytest.raises(RuntimeError):
+        sessao.get(url)
+
+    # Sem resultado registrado, o host continua podendo ser testado
+    assert disjuntor.permitir(url) is True
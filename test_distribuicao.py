@@ -0,0 +1,127 @@
+"""
+Testes da coleta distribuída: trabalhadores em processos contra o servidor local
+"""
+
+import sqlite3
+import time
+
+import pytest
+
+from benchmarks.servidor_local import ConfiguracaoServidor, iniciar_servidor
+from scrapping import metricas
+from scrapping.comitentes import RegistroComitentes
+from scrapping.distribuicao import executar_trabalhadores_locais
+from scrapping.fronteira import FronteiraCrawl
+from scrapping.limitador import LimitadorTaxa
+from scrapping.vip import LeilaoVipScraper
+
+url_site = 'https://www.leilaovip.com.br'
+
+tamanho_pdf = 4096
+
+
+@pytest.fixture
+def servidor(tmp_path, monkeypatch):
+    # Os trabalhadores herdam o diretório: PDFs, catálogo e fronteira ficam no tmp_path
+    monkeypatch.chdir(tmp_path)
+    servidor = iniciar_servidor(ConfiguracaoServidor(leiloes=2, lotes=3, tamanho_pdf=tamanho_pdf, recheio=1))
+    yield servidor
+    servidor.shutdown()
+
+
+def criar_scraper(servidor, caminho_fronteira, **opcoes):
+    comitentes = RegistroComitentes(arquivo_coletas='coletas.json')
+    for comitente in comitentes:
+        comitente.url = comitente.url.replace(url_site, servidor.url_base)
+    return LeilaoVipScraper(
+        comitentes=comitentes, fronteira=FronteiraCrawl(str(caminho_fronteira)), usar_cache=False,
+        limitador_taxa=LimitadorTaxa(taxa_inicial=1000.0, taxa_maxima=1000.0, capacidade=10), **opcoes
+    )
+
+
+def tentativas_por_url(caminho_fronteira):
+    with sqlite3.connect(caminho_fronteira) as conexao:
+        return {url: (estado, tentativas) for url, estado, tentativas in conexao.execute(
+            "SELECT url, estado, tentativas FROM urls"
+        )}
+
+
+def total_pdf_bytes():
+    return sum(metricas.pdf_bytes.series().values())
+
+
+def test_cada_unidade_processada_uma_vez_com_relatos(servidor, tmp_path):
+    caminho = tmp_path / 'fronteira.sqlite3'
+    scraper = criar_scraper(servidor, caminho, max_workers=2, trabalhadores=2, lease=5)
+    bytes_antes = total_pdf_bytes()
+
+    pdfs = scraper.executar_scraping()
+
+    unidades = tentativas_por_url(caminho)
+    # 3 comitentes × (agenda + 2 leilões + 6 lotes)
+    assert len(unidades) == 27
+    assert set(unidades.values()) == {('concluido', 1)}
+    estatisticas = servidor.estatisticas()
+    assert estatisticas['lote'] == 18
+    assert estatisticas['pdf'] == len(pdfs) > 0
+
+    # Eventos, progresso e métricas dos trabalhadores chegaram ao processo principal
+    tipos = [evento['tipo'] for evento in scraper.eventos.eventos_desde(0)]
+    assert tipos.count('pdf_baixado') == len(pdfs)
+    assert tipos.count('leilao_encontrado') == 6
+    assert scraper.progresso['pdfs'] == len(pdfs)
+    assert scraper.progresso['lotes'] == 18
+    assert total_pdf_bytes() - bytes_antes == len(pdfs) * tamanho_pdf
+
+
+def test_reserva_vencida_volta_para_a_fila_uma_vez(servidor, tmp_path):
+    caminho = tmp_path / 'fronteira.sqlite3'
+    scraper = criar_scraper(servidor, caminho)
+    scraper.unidades_iniciais()
+
+    # Um trabalhador reserva e começa uma agenda e morre sem renovar a reserva
+    (_, url_morta, _), = scraper.fronteira.reivindicar('morto', 1, lease=0.5)
+    scraper.fronteira.iniciar(url_morta)
+
+    pdfs = executar_trabalhadores_locais(
+        2, str(caminho), max_workers=2, lease=5, opcoes={'usar_cache': False}
+    )
+
+    unidades = tentativas_por_url(caminho)
+    assert unidades.pop(url_morta) == ('concluido', 2)
+    assert len(unidades) == 26
+    assert set(unidades.values()) == {('concluido', 1)}
+    assert servidor.estatisticas()['lote'] == 18
+    assert len(pdfs) == servidor.estatisticas()['pdf']
+
+
+def test_falha_volta_para_a_fila_depois_da_espera(tmp_path):
+    fila = FronteiraCrawl(str(tmp_path / 'fronteira.sqlite3'))
+    fila.adicionar('http://servidor.local/leilao', 'leilao', 'banco')
+
+    def tentar(trabalhador):
+        unidades = fila.reivindicar(trabalhador, 1, lease=60, espera=0.3)
+        for _, url, _ in unidades:
+            fila.iniciar(url)
+            fila.falhar(url, "503")
+            # Até o fim da unidade a falha segue com o dono, mesmo passada a espera
+            time.sleep(0.4)
+            assert not fila.reivindicar('outro', 1, espera=0.3)
+            fila.concluir(url)
+        return unidades
+
+    assert tentar('a')
+    # Ainda na espera: ninguém reserva, mas os trabalhadores não encerram
+    time.sleep(0.15)
+    assert not tentar('b')
+    assert fila.ativas() == 1
+
+    time.sleep(0.2)
+    assert tentar('b')
+    time.sleep(0.7)
+    assert tentar('c')
+    # Três tentativas gastas: fica como falha e a fila acaba
+    time.sleep(1.3)
+    assert not tentar('d')
+    assert fila.ativas() == 0
+    assert tentativas_por_url(tmp_path / 'fronteira.sqlite3') == {'http://servidor.local/leilao': ('falhou', 3)}
@@ -0,0 +1,25 @@
+"""
+Testes da memória de estratégias de listagem
+"""
+
+import time
+
+from scrapping import metricas
+from scrapping.estrategias import MemoriaEstrategias
+
+chave = 'servidor.local|42'
+
+
+def test_acerto_conta_economia_e_renova_o_ttl(tmp_path):
+    memoria = MemoriaEstrategias(caminho=str(tmp_path / 'estrategias.json'), ttl=60)
+    memoria.registrar(chave, 'post', requisicoes_alternativas=3)
+    # Registrada há quase um TTL: sem o acerto, expiraria em seguida
+    memoria._entradas[chave]['registrada_em'] = time.time() - 59
+    antes = metricas.requisicoes_economizadas.series().get(('servidor.local', '42'), 0)
+
+    assert memoria.acertou(chave) == 3
+
+    assert metricas.requisicoes_economizadas.series()[('servidor.local', '42')] - antes == 3
+    recarregada = MemoriaEstrategias(caminho=str(tmp_path / 'estrategias.json'), ttl=60)
+    assert time.time() - recarregada._entradas[chave]['registrada_em'] < 5
+    assert recarregada.preferida(chave) == 'post'
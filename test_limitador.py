@@ -0,0 +1,92 @@
+"""
+Testes do limitador de taxa adaptativo, com um relógio simulado
+"""
+
+import random
+
+import pytest
+
+from scrapping import limitador
+from scrapping.limitador import LimitadorTaxa
+
+url = 'http://servidor.local/pagina'
+
+
+class RelogioSimulado:
+    """Substitui o módulo time do limitador: o tempo só anda quando o teste manda"""
+
+    def __init__(self):
+        self.agora = 1000.0
+
+    def monotonic(self):
+        return self.agora
+
+    def time(self):
+        return self.agora
+
+    def sleep(self, segundos):
+        self.agora += segundos
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    relogio = RelogioSimulado()
+    monkeypatch.setattr(limitador, 'time', relogio)
+    return relogio
+
+
+def simular(taxa, relogio, segundos, taxa_erro, latencia=0.05, semente=1):
+    """Uma requisição por token, com `taxa_erro` de respostas 503; retorna a taxa a cada segundo simulado"""
+    aleatorio = random.Random(semente)
+    fim = relogio.agora + segundos
+    amostras = []
+    proxima_amostra = relogio.agora
+    while relogio.agora < fim:
+        taxa.adquirir(url)
+        enviada = relogio.agora
+        relogio.agora += latencia
+        status = 503 if aleatorio.random() < taxa_erro else 200
+        taxa.registrar_resposta(url, status, latencia)
+        relogio.agora = enviada
+        if relogio.agora >= proxima_amostra:
+            amostras.append(taxa.taxa_atual('servidor.local'))
+            proxima_amostra += 1
+    return amostras
+
+
+def test_taxa_estabiliza_com_erro_constante(relogio):
+    taxa = LimitadorTaxa(taxa_inicial=1000.0, taxa_maxima=1000.0, taxa_minima=0.1)
+    amostras = simular(taxa, relogio, 600, taxa_erro=0.2)
+
+    # Depois da queda inicial a taxa oscila em volta do equilíbrio (√(2 × incremento / taxa_erro) ≈ 3 req/s),
+    # longe do mínimo e do máximo
+    estaveis = sorted(amostras[120:])
+    media = sum(estaveis) / len(estaveis)
+    assert 2.0 < media < 6.0
+    assert estaveis[len(estaveis) // 10] > 1.0
+
+
+def test_taxa_sobe_ate_o_maximo_sem_erros(relogio):
+    taxa = LimitadorTaxa(taxa_inicial=1.0, taxa_maxima=10.0)
+    amostras = simular(taxa, relogio, 30, taxa_erro=0.0)
+    assert amostras[-1] == pytest.approx(10.0)
+
+
+def test_erros_da_mesma_rajada_reduzem_uma_vez(relogio):
+    taxa = LimitadorTaxa(taxa_inicial=8.0)
+    # Quatro requisições em andamento ao mesmo tempo, todas respondidas com 503
+    relogio.agora += 0.5
+    for _ in range(4):
+        taxa.registrar_resposta(url, 503, latencia=0.5)
+    assert taxa.taxa_atual('servidor.local') == pytest.approx(4.0)
+
+    # Passada a janela, um erro de uma requisição nova reduz de novo
+    relogio.agora += 1.5
+    taxa.registrar_resposta(url, 503, latencia=0.1)
+    assert taxa.taxa_atual('servidor.local') == pytest.approx(2.0)
+
+
+def test_dividir_mantem_o_crescimento_da_soma():
+    parametros = LimitadorTaxa(taxa_inicial=4.0, incremento=1.0).dividir(4)
+    assert parametros['taxa_inicial'] == pytest.approx(1.0)
+    assert parametros['incremento'] == pytest.approx(0.25)
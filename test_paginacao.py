@@ -0,0 +1,65 @@
+"""
+Testes da paginação da agenda contra o servidor local
+"""
+
+import pytest
+import requests
+
+from benchmarks.servidor_local import ConfiguracaoServidor, iniciar_servidor
+from scrapping.comitentes import RegistroComitentes
+from scrapping.fronteira import FronteiraCrawl
+from scrapping.limitador import LimitadorTaxa
+from scrapping.vip import LeilaoVipScraper
+
+url_site = 'https://www.leilaovip.com.br'
+
+
+@pytest.fixture
+def servidor(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # 12 leilões em 4 páginas de 3
+    servidor = iniciar_servidor(ConfiguracaoServidor(leiloes=12, cards_por_pagina=3, recheio=1))
+    yield servidor
+    servidor.shutdown()
+
+
+@pytest.fixture
+def scraper(servidor, tmp_path):
+    comitentes = RegistroComitentes(arquivo_coletas='coletas.json')
+    for comitente in comitentes:
+        comitente.url = comitente.url.replace(url_site, servidor.url_base)
+    return LeilaoVipScraper(
+        comitentes=comitentes, fronteira=FronteiraCrawl(str(tmp_path / 'fronteira.sqlite3')), usar_cache=False,
+        limitador_taxa=LimitadorTaxa(taxa_inicial=1000.0, taxa_maxima=1000.0, capacidade=10)
+    )
+
+
+def falhar_pagina(scraper, numero):
+    """Faz a página `numero` da listagem falhar, em GET e em POST"""
+    enviar = scraper.session.request
+
+    def request(method, url, *args, **kwargs):
+        pagina = (kwargs.get('data') or {}).get('Filtro.CurrentPage')
+        if f'CurrentPage={numero}' in url or pagina == str(numero):
+            raise requests.ConnectionError(f"página {numero} indisponível")
+        return enviar(method, url, *args, **kwargs)
+
+    scraper.session.request = request
+
+
+def test_listagem_completa(scraper):
+    comitente = next(iter(scraper.comitentes))
+    assert len(scraper.extrair_cards_leiloes(comitente.url)) == 12
+
+
+def test_pagina_que_falha_nao_corta_a_listagem(scraper):
+    comitente = next(iter(scraper.comitentes))
+    scraper.fronteira.adicionar(comitente.url, 'banco', comitente.nome)
+    scraper.fronteira.iniciar(comitente.url)
+    falhar_pagina(scraper, 2)
+
+    links = scraper.extrair_cards_leiloes(comitente.url)
+
+    # As páginas 3 e 4 vieram mesmo com a 2 fora, e a agenda fica para ser repetida
+    assert len(links) == 9
+    assert scraper.fronteira.estado(comitente.url) == 'falhou'
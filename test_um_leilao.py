@@ -7,7 +7,7 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from scrapping.vip import LeilaoVipScraper, bancos
+from scrapping.vip import LeilaoVipScraper
 
 def testar_um_leilao_completo():
     """Testa o fluxo completo de um único leilão"""
@@ -15,7 +15,7 @@ def testar_um_leilao_completo():
     print("=" * 60)
     
     scraper = LeilaoVipScraper()
-    url_banco = bancos["bradesco"]
+    url_banco = scraper.comitentes.obter("bradesco").url
     
     # Etapa 1: Extrair cards de leilões
     print("\n📋 ETAPA 1: Extraindo cards de leilões...")